@@ -12,9 +12,10 @@ setup(
     url="https://github.com/Erpokk/project-PyMaster.git",
     author="Group-8",
     author_email="dontwriteme@gmail.com",
-    packages=find_namespace_packages(),
+    packages=find_namespace_packages(exclude=["tests", "tests.*"]),
     entry_points={'console_scripts': ['bot = src.main:main']},
     install_requires=["prompt_toolkit"],
+    extras_require={'stats': ["numpy"]},
     keywords='cli bot console assistant contacts notes',
     python_requires='>=3.7',
     project_urls={
@@ -0,0 +1,57 @@
+import pickle
+import sys
+import time
+import tracemalloc
+from objects.Record import Record
+
+
+def make_rows(count):
+    """
+    Builds the arguments of synthetic contacts.
+
+    Args:
+        count (int): The number of contacts.
+
+    Returns:
+        list of tuple: Name, phones, birthday, address and email of each contact.
+    """
+    return [(f"contact{i}", [f"{5550000000 + i:010d}", f"{6660000000 + i:010d}"],
+             f"{i % 28 + 1:02d}.{i % 12 + 1:02d}.{1950 + i % 60}",
+             f"{i % 500} Main Street, City {i % 50}", f"contact{i}@example.com")
+            for i in range(count)]
+
+
+def run(count):
+    """
+    Measures the memory per contact, the construction throughput and the pickled size.
+
+    Args:
+        count (int): The number of contacts to build.
+
+    Returns:
+        dict: The measurements.
+    """
+    rows = make_rows(count)
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = [Record(name, phones=phones, birthday=birthday, address=address, email=email)
+               for name, phones, birthday, address, email in rows]
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    pickled = len(pickle.dumps(records))
+    return {
+        "contacts": count,
+        "bytes per contact": memory / count,
+        "contacts per second": count / elapsed,
+        "pickled bytes per contact": pickled / count,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and not sys.argv[1].isdigit()):
+        print("Usage: python -m benchmarks.RecordBenchmark [contact_count]")
+        sys.exit(1)
+    results = run(int(sys.argv[1]) if len(sys.argv) == 2 else 100000)
+    for key, value in results.items():
+        print(f"{key}: {value:,.0f}")
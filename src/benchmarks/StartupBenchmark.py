@@ -0,0 +1,89 @@
+import os
+import os.path
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module="main"):
+    """
+    Imports a module in a fresh interpreter with -X importtime and parses the report.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        list of tuple: The cumulative and self import time in microseconds and the name
+        of every imported module, slowest first.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=SRC, capture_output=True, text=True, check=True)
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if own.isdigit():
+            times.append((int(cumulative), int(own), name))
+    return sorted(times, reverse=True)
+
+
+def one_shot_times(argv, runs):
+    """
+    Measures the wall-clock time of one-shot invocations, from interpreter start to exit.
+
+    The bot runs in an empty temporary directory, so no saved data is read or changed.
+
+    Args:
+        argv (list of str): The command and its arguments, e.g. ["hello"].
+        runs (int): The number of invocations.
+
+    Returns:
+        list of float: The time of each invocation in seconds.
+    """
+    env = dict(os.environ, PYTHONPATH=SRC)
+    code = f"import sys, main; sys.exit(main.main({argv!r}))"
+    times = []
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=directory, env=env,
+                           stdout=subprocess.DEVNULL, check=True)
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def run(argv, runs=10, top=15):
+    """
+    Reports the slowest imports of main and the time of a one-shot command.
+
+    Args:
+        argv (list of str): The one-shot command and its arguments.
+        runs (int): The number of invocations to take the median of.
+        top (int): The number of slowest imports listed.
+
+    Returns:
+        tuple: The report lines and the median one-shot time in milliseconds.
+    """
+    times = import_times()
+    lines = [f"{'cumulative ms':>14} {'self ms':>8}  module"]
+    lines += [f"{cumulative / 1000:14.1f} {own / 1000:8.1f}  {name}" for cumulative, own, name in times[:top]]
+    median = statistics.median(one_shot_times(argv, runs)) * 1000
+    lines.append(f"one-shot 'bot {' '.join(argv)}': {median:.0f} ms (median of {runs} runs)")
+    return lines, median
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+        print("Usage: python -m benchmarks.StartupBenchmark [budget_ms] [command [args ...]]")
+        sys.exit(1)
+    budget = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    report, median = run(sys.argv[2:] or ["hello"])
+    print("\n".join(report))
+    if budget is not None and median > budget:
+        print(f"Over the startup budget of {budget} ms.")
+        sys.exit(1)
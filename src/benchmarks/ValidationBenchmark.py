@@ -0,0 +1,82 @@
+import sys
+import time
+from datetime import datetime
+from objects.Phone import Phone
+from objects.Email import Email
+from objects.Birthday import Birthday
+from servises.ValidationService import validate_columns
+
+
+def make_columns(count):
+    """
+    Builds columns of synthetic raw values, one in a hundred of them invalid.
+
+    Args:
+        count (int): The number of values per column.
+
+    Returns:
+        dict: Lists of raw phone, email and birthday values.
+    """
+    return {
+        "phone": [f"{5550000000 + i:010d}" if i % 100 else "555-0100" for i in range(count)],
+        "email": [f"contact{i}@example.com" if i % 100 else f"contact{i}" for i in range(count)],
+        "birthday": [f"{i % 28 + 1:02d}.{i % 12 + 1:02d}.{1950 + i % 60}" if i % 100 else "31.02.1990"
+                     for i in range(count)],
+    }
+
+
+def per_object(columns):
+    """Validates every value by constructing its Field object, as the add command does."""
+    for kind, field in (("phone", Phone), ("email", Email), ("birthday", Birthday)):
+        for value in columns[kind]:
+            try:
+                field(value)
+            except ValueError:
+                pass
+
+
+def strptime_dates(columns):
+    """Parses the birthdays with datetime.strptime, the parser Birthday used before."""
+    for value in columns["birthday"]:
+        try:
+            datetime.strptime(value, "%d.%m.%Y")
+        except ValueError:
+            pass
+
+
+def run(count, workers):
+    """
+    Measures the fields validated per second one object at a time and in batches.
+
+    Args:
+        count (int): The number of values per column.
+        workers (int): The number of processes of the pooled batch run.
+
+    Returns:
+        dict: The measurements.
+    """
+    columns = make_columns(count)
+    fields = 3 * count
+    results = {"fields": fields}
+    runs = [
+        ("strptime dates per second", lambda: strptime_dates(columns), count),
+        ("per-object fields per second", lambda: per_object(columns), fields),
+        ("batch fields per second", lambda: validate_columns(columns, workers=0), fields),
+        (f"batch fields per second ({workers} processes)",
+         lambda: validate_columns(columns, workers=workers, chunk_size=count // workers + 1), fields),
+    ]
+    for label, function, values in runs:
+        start = time.perf_counter()
+        function()
+        results[label] = values / (time.perf_counter() - start)
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3 or not all(arg.isdigit() for arg in sys.argv[1:]):
+        print("Usage: python -m benchmarks.ValidationBenchmark [values_per_column] [processes]")
+        sys.exit(1)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    for key, value in run(count, max(workers, 1)).items():
+        print(f"{key}: {value:,.0f}")
@@ -1,7 +1,17 @@
+from __future__ import annotations
+
+import functools
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 from objects.Record import Record
-from objects.AddressBook import AddressBook
-from objects.Notes import Notes
+from servises.ValidationService import parse_date
+from servises.OutputService import CommandError, StreamedOutput
+
+if TYPE_CHECKING:
+    from objects.AddressBook import AddressBook
+    from objects.Notes import Notes
+
+PAGE_SIZE = 20
 
 
 def input_error(func):
@@ -14,11 +24,12 @@ def input_error(func):
     Returns:
         callable: Decorated function.
     """
+    @functools.wraps(func)
     def inner(*args, **kwargs):
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            return str(e)
+            return CommandError(e)
     return inner
 
 @input_error
@@ -34,6 +45,7 @@ def add_contact_command(args, book: AddressBook):
         raise ValueError("Not enough arguments. Usage: add [name] [phone phone] [address (optional)] [email (optional)] [birthday (optional)]")
 
     name, *other_args = args  # Разделение аргументов на имя и остальные аргументы
+    name = name.lower()
 
     phones = []
     email = None
@@ -47,7 +59,7 @@ def add_contact_command(args, book: AddressBook):
             email = arg
         elif '.' in arg and len(arg.split('.')) == 3:  # Проверка на дату
             try:
-                datetime.strptime(arg, '%d.%m.%Y')  # Проверка формата даты
+                parse_date(arg)  # Проверка формата даты
                 birthday = arg
             except ValueError:
                 print(f"Invalid date format for birthday: {arg}. Expected DD.MM.YYYY.")
@@ -62,6 +74,7 @@ def add_contact_command(args, book: AddressBook):
     book.add_record(record)
     return "Contact added."
 
+@input_error
 def birthdays_command(args, book: AddressBook):
     """
     Get upcoming birthdays from the address book.
@@ -71,7 +84,7 @@ def birthdays_command(args, book: AddressBook):
         str: Formatted list of upcoming birthdays or a message indicating no birthdays in the specified days.
     """
     if not args or not args[0].isdigit():
-        return "Usage: birthdays [number_of_days]"
+        return CommandError("Usage: birthdays [number_of_days]")
     days = int(args[0])
     birthdays_list = book.get_birthdays_in_next_days(days)
     if birthdays_list:
@@ -80,19 +93,134 @@ def birthdays_command(args, book: AddressBook):
     else:
         return "No birthdays in the next specified days."
 
-def search_contacts_command(args, book: AddressBook):
+def parse_paging(args, default_limit=PAGE_SIZE):
     """
-    Search for contacts in the address book.
+    Split "--limit N" and "--offset N" options off a list of arguments.
     Args:
-        args (list): List of arguments. Expected format: [search_term]
+        args (list): List of arguments.
+        default_limit (int): Page size used when no --limit is given.
     Returns:
-        str: Result of the search.
+        tuple: The remaining arguments, the limit and the offset.
+    Raises:
+        ValueError: If an option has no non-negative integer value.
+    """
+    rest = []
+    paging = {"--limit": default_limit, "--offset": 0}
+    args = iter(args)
+    for arg in args:
+        if arg in paging:
+            value = next(args, "")
+            if not value.isdigit():
+                raise ValueError(f"{arg} expects a non-negative number.")
+            paging[arg] = int(value)
+        else:
+            rest.append(arg)
+    return rest, paging["--limit"], paging["--offset"]
+
+def page_footer(offset, shown, total):
     """
+    Describe which part of the results is shown and how to see more.
+    Args:
+        offset (int): The number of skipped results.
+        shown (int): The number of shown results.
+        total (int): The total number of results.
+    Returns:
+        str: The footer, or an empty string if everything is shown.
+    """
+    if offset == 0 and shown >= total:
+        return ""
+    footer = f"Showing {offset + 1}-{offset + shown} of {total}." if shown else f"No results after {offset} of {total}."
+    if offset + shown < total:
+        footer += f" Use --offset {offset + shown} to see more."
+    return footer
+
+def parse_output(args):
+    """
+    Split the "--compact" and "--pager" options off a list of arguments.
+    Args:
+        args (list): List of arguments.
+    Returns:
+        tuple: The remaining arguments, whether to show one line per contact and whether to use a pager.
+    """
+    rest = [arg for arg in args if arg not in ("--compact", "--pager")]
+    return rest, "--compact" in args, "--pager" in args
+
+def stream_lines(lines, separator, footer=""):
+    """
+    Yield output lines one at a time, followed by the page footer.
+    Args:
+        lines (iterable of str): The lines, rendered lazily.
+        separator (str): The text between two lines.
+        footer (str): The page footer, if any.
+    Yields:
+        str: Pieces of the output.
+    """
+    shown = False
+    for line in lines:
+        yield separator + line if shown else line
+        shown = True
+    if footer:
+        yield "\n\n" + footer if shown else footer
+
+def stream_records(records, compact, footer=""):
+    """
+    Stream contacts with their details, or one line per contact if compact.
+    Args:
+        records (iterable of Record): The records, looked up lazily.
+        compact (bool): Whether to show one line per contact.
+        footer (str): The page footer, if any.
+    Returns:
+        iterator: Pieces of the output.
+    """
+    if compact:
+        return stream_lines((record.get_summary() for record in records), "\n", footer)
+    return stream_lines((record.get_details() for record in records), "\n\n", footer)
+
+@input_error
+def search_contacts_command(args, book: AddressBook):
+    """
+    Search for contacts in the address book. Best matches come first: name, then phone, email, address and birthday.
+    Use "--phone" to look up contacts by phone number: exact, prefix, suffix (e.g. last 4 digits) or infix (default).
+    "--compact" shows one line per contact; "--pager" shows all matches in a pager unless --limit is given.
+    Args:
+        args (list): List of arguments. Expected format: [search_term] [--limit N (optional)] [--offset N (optional)]
+            [--compact (optional)] [--pager (optional)] or [--phone] [digits] [mode (optional)]
+    Returns:
+        str or StreamedOutput: Result of the search.
+    """
+    if args and args[0] == "--phone":
+        if len(args) not in (2, 3) or not args[1].isdigit():
+            return CommandError("Usage: search --phone [digits] [exact | prefix | suffix | infix]")
+        mode = args[2] if len(args) == 3 else "infix"
+        records = book.find_by_phone(args[1], mode)
+        return "\n\n".join(record.get_details() for record in records) if records else "No matching contacts found."
+    args, compact, pager = parse_output(args)
+    args, limit, offset = parse_paging(args, None if pager else PAGE_SIZE)
     if len(args) != 1:
-        return "Usage: search [search_term]"
-    search_term = args[0]
-    return book.search_contacts(search_term)
+        return CommandError("Usage: search [search_term] [--limit N] [--offset N] [--compact] [--pager]")
+    names, total = book.search_names(args[0], limit, offset)
+    if not total:
+        return "No matching contacts found."
+    records = (book.get_record(name) for name in names)
+    return StreamedOutput(stream_records(records, compact, page_footer(offset, len(names), total)), pager)
+
+def fuzzy_search_command(args, book: AddressBook):
+    """
+    Search for contacts by a name that may contain typos.
+    Args:
+        args (list): List of arguments. Expected format: [name] [max_typos (optional, default 2)]
+    Returns:
+        str: Matching contact names ranked by the number of typos.
+    """
+    if len(args) not in (1, 2) or (len(args) == 2 and not args[1].isdigit()):
+        return CommandError("Usage: fuzzy [name] [max_typos (optional)]")
+    max_distance = int(args[1]) if len(args) == 2 else 2
+    matches = book.find_similar_names(args[0].lower(), max_distance)
+    if not matches:
+        return "No similar names found."
+    return "\n".join(f"{name} ({distance} typos)" for distance, name in matches)
 
+@input_error
 def edit_contact_command(args, book: AddressBook):
     """
     Edit an existing contact in the address book.
@@ -102,9 +230,10 @@ def edit_contact_command(args, book: AddressBook):
         str: Confirmation message indicating that the contact has been edited.
     """
     if len(args) < 1:
-        return "Usage: edit [name] [phone (optional)] [address (optional)] [email (optional)] [birthday (optional)]"
+        return CommandError("Usage: edit [name] [phone (optional)] [address (optional)] [email (optional)] [birthday (optional)]")
     
     name, *other_args = args
+    name = name.lower()
     phones = []
     email = None
     address = None
@@ -117,7 +246,7 @@ def edit_contact_command(args, book: AddressBook):
             email = arg
         elif '.' in arg and len(arg.split('.')) == 3:  # Проверка на дату
             try:
-                datetime.strptime(arg, '%d.%m.%Y')  # Проверка формата даты
+                parse_date(arg)  # Проверка формата даты
                 birthday = arg
             except ValueError:
                 print(f"Invalid date format for birthday: {arg}. Expected DD.MM.YYYY.")
@@ -139,8 +268,8 @@ def remove_contact_command(args, book: AddressBook):
         str: Confirmation message indicating that the contact has been removed.
     """
     if len(args) != 1:
-        return "Usage: remove [name]"
-    name = args[0]
+        return CommandError("Usage: remove [name]")
+    name = args[0].lower()
     return book.remove_record(name)
 
 def hello_command(args):
@@ -153,15 +282,168 @@ def hello_command(args):
     """
     return "Hello! How can I assist you today?"
 
+@input_error
 def show_all_contacts_command(args, book: AddressBook):
     """
-    Returns a list of all contacts in the address book.
+    Returns a page of the contacts in the address book, streamed as they are rendered.
+    "--compact" shows one line per contact; "--pager" shows all contacts in a pager unless --limit is given.
+    Args:
+        args (list): List of arguments. Expected format: [--limit N (optional)] [--offset N (optional)]
+            [--compact (optional)] [--pager (optional)]
+    Returns:
+        str or StreamedOutput: List of contacts.
+    """
+    args, compact, pager = parse_output(args)
+    args, limit, offset = parse_paging(args, None if pager else PAGE_SIZE)
+    if args:
+        return CommandError("Usage: all [--limit N] [--offset N] [--compact] [--pager]")
+    total = len(book)
+    if not total:
+        return "No contacts available."
+    shown = max(0, total - offset if limit is None else min(limit, total - offset))
+    return StreamedOutput(stream_records(book.iter_contacts(limit, offset), compact,
+                                         page_footer(offset, shown, total)), pager)
+
+
+@input_error
+def import_contacts_command(args, book: AddressBook):
+    """
+    Imports contacts from a CSV, vCard (.vcf) or JSONL file.
+    Args:
+        args (list): List of arguments. Expected format [file_path].
+    Returns:
+        str: Number of imported contacts and the rows that were skipped.
+    """
+    if len(args) != 1:
+        return CommandError("Usage: import [file.csv | file.vcf | file.jsonl]")
+    from servises.ImportExportService import read_rows
+    added, errors = book.bulk_add(read_rows(args[0]))
+    lines = [f"Imported {added} contacts."]
+    if errors:
+        lines.append(f"Skipped {len(errors)} rows:")
+        lines.extend(f"Line {line_number}: {message}" for line_number, message in errors[:20])
+        if len(errors) > 20:
+            lines.append(f"... and {len(errors) - 20} more.")
+    return "\n".join(lines)
+
+
+@input_error
+def export_contacts_command(args, book: AddressBook):
+    """
+    Exports all contacts to a CSV, vCard (.vcf) or JSONL file.
+    Args:
+        args (list): List of arguments. Expected format [file_path].
+    Returns:
+        str: Number of exported contacts.
+    """
+    if len(args) != 1:
+        return CommandError("Usage: export [file.csv | file.vcf | file.jsonl]")
+    from servises.ImportExportService import write_records
+    count = write_records(book.iter_records(), args[0])
+    return f"Exported {count} contacts."
+
+
+@input_error
+def stats_command(args, book: AddressBook):
+    """
+    Shows birthdays per month, the age distribution and the share of contacts missing a field.
+    Args:
+        args: Function arguments (not used).
+    Returns:
+        str: The statistics of the address book.
+    """
+    if args:
+        return CommandError("Usage: stats")
+    from servises.StatsService import format_stats
+    return format_stats(book.get_columns(), datetime.now().date())
+
+
+def lookup_command(args, book: AddressBook):
+    """
+    Finds the contacts that have a phone number or email. Non-digits in phone numbers and the case of emails are ignored.
+    Args:
+        args (list): List of arguments. Expected format: [phone | email]
+    Returns:
+        str: The matching contacts.
+    """
+    if len(args) != 1:
+        return CommandError("Usage: lookup [phone | email]")
+    records = book.find_owners(args[0])
+    return "\n\n".join(record.get_details() for record in records) if records else "No matching contacts found."
+
+
+def duplicates_command(args, book: AddressBook):
+    """
+    Lists the phone numbers and emails that belong to more than one contact.
     Args:
         args: Function arguments (not used).
     Returns:
-        str: List of all contacts.
+        str: The shared phone numbers and emails with the contacts sharing them.
+    """
+    if args:
+        return CommandError("Usage: duplicates")
+    duplicates = book.find_duplicates()
+    if not duplicates:
+        return "No shared phone numbers or emails."
+    return "\n".join(f"{field} {value}: {', '.join(names)}" for field, value, names in duplicates)
+
+
+def check_indexes_command(args, book: AddressBook):
+    """
+    Checks the phone and email indexes against the contacts.
+    Args:
+        args: Function arguments (not used).
+    Returns:
+        str: The differences found, or a message that the indexes are consistent.
+    """
+    if args:
+        return CommandError("Usage: check-indexes")
+    problems = book.verify_indexes()
+    if not problems:
+        return "Indexes are consistent."
+    return "\n".join([f"Found {len(problems)} index problems:"] + problems)
+
+
+@input_error
+def add_phone_command(args, book: AddressBook):
+    """
+    Adds a phone number to a contact.
+    Args:
+        args (list): List of arguments. Expected format [name, phone].
+    Returns:
+        str: Message indicating the phone number has been added.
     """
-    return book.get_all_contacts()
+    if len(args) != 2:
+        return CommandError("Usage: add-phone [name] [phone]")
+    return book.add_phone(args[0].lower(), args[1])
+
+
+@input_error
+def edit_phone_command(args, book: AddressBook):
+    """
+    Replaces a phone number of a contact.
+    Args:
+        args (list): List of arguments. Expected format [name, old_phone, new_phone].
+    Returns:
+        str: Message indicating the phone number has been updated.
+    """
+    if len(args) != 3:
+        return CommandError("Usage: edit-phone [name] [old_phone] [new_phone]")
+    return book.edit_phone(args[0].lower(), args[1], args[2])
+
+
+@input_error
+def remove_phone_command(args, book: AddressBook):
+    """
+    Removes a phone number from a contact.
+    Args:
+        args (list): List of arguments. Expected format [name, phone].
+    Returns:
+        str: Message indicating the phone number has been removed.
+    """
+    if len(args) != 2:
+        return CommandError("Usage: remove-phone [name] [phone]")
+    return book.remove_phone(args[0].lower(), args[1])
 
 
 def add_comment_command(args, book: AddressBook):
@@ -173,8 +455,8 @@ def add_comment_command(args, book: AddressBook):
         str: Message indicating the comment has been added.
     """
     if len(args) < 2:
-        return "Usage: add_note [name] [comment_text]"
-    name, note_text = args[0], " ".join(args[1:])
+        return CommandError("Usage: add_note [name] [comment_text]")
+    name, note_text = args[0].lower(), " ".join(args[1:])
     return book.add_comment(name, note_text)
   
 
@@ -187,8 +469,8 @@ def remove_comment_command(args, book: AddressBook):
         str: Message indicating the comment has been removed.
     """
     if len(args) != 1:
-        return "Usage: remove-note [name]"
-    name = args[0]
+        return CommandError("Usage: remove-note [name]")
+    name = args[0].lower()
     return book.remove_comment(name)
     
 
@@ -201,8 +483,8 @@ def add_notes_command(args, notes_dif: Notes):
         str: Message indicating the note has been added.
     """
     note_text = " ".join(args)
-    notes_dif.add_notes(note_text)
-    return "Note added."
+    note_id = notes_dif.add_notes(note_text)
+    return f"Note {note_id} added."
 
 def edit_notes_command(args, notes_dif: Notes):
     """
@@ -213,14 +495,14 @@ def edit_notes_command(args, notes_dif: Notes):
         str: Message indicating the note has been edited.
     """
     if len(args) < 2:
-        return "Usage: edit-notes [note_id] [new_note]"
+        return CommandError("Usage: edit-notes [note_id] [new_note]")
 
     try:
-        note_id = int(args[0]) - 1  # Перетворення в індекс Python
+        note_id = int(args[0])
         new_note = " ".join(args[1:])
         return notes_dif.edit_notes(note_id, new_note)
     except ValueError:
-        return "Invalid note ID."
+        return CommandError("Invalid note ID.")
     
 def remove_notes_command(args, notes_dif: Notes):
     """
@@ -230,33 +512,123 @@ def remove_notes_command(args, notes_dif: Notes):
     Returns:
         str: Message indicating the note has been removed.
     """
+    if len(args) != 1:
+        return CommandError("Usage: remove-note [note_id]")
     try:
-        note_id = int(args[0]) - 1  # Перетворення в індекс Python
+        note_id = int(args[0])
         return notes_dif.remove_notes(note_id)
     except ValueError:
-        return "Invalid note ID."
+        return CommandError("Invalid note ID.")
 
 
+@input_error
 def list_notes_command(args, notes_dif: Notes):
     """
-    Returns a list of all notes.
+    Returns the notes, streamed one line per note. "--pager" shows them in a pager.
     Args:
-        args: Function arguments (not used).
+        args (list): List of arguments. Expected format: [--limit N (optional)] [--offset N (optional)]
+            [--pager (optional)]
+    Returns:
+        str or StreamedOutput: List of notes.
+    """
+    args, compact, pager = parse_output(args)
+    args, limit, offset = parse_paging(args, None)
+    if args:
+        return CommandError("Usage: notes [--limit N] [--offset N] [--pager]")
+    total = len(notes_dif.notes)
+    if not total:
+        return "No notes available."
+    shown = max(0, total - offset if limit is None else min(limit, total - offset))
+    lines = (f"{note_id}: {note.preview()}" for note_id, note in notes_dif.iter_notes(limit, offset))
+    return StreamedOutput(stream_lines(lines, "\n", page_footer(offset, shown, total)), pager)
+
+def show_note_command(args, notes_dif: Notes):
+    """
+    Shows the full text of a note.
+    Args:
+        args (list): List of arguments. Expected format [note_id].
     Returns:
-        str: List of all notes.
+        str: The note with its tags and timestamps.
     """
-    return notes_dif.list_notes_command()
+    if len(args) != 1 or not args[0].isdigit():
+        return CommandError("Usage: show-note [note_id]")
+    return notes_dif.show_note_command(int(args[0]))
 
+@input_error
 def find_notes_command(args, notes_dif: Notes):
     """
-    Searches for notes containing the specified text.
+    Searches notes, best matches first. Words must all appear, "OR" separates alternatives
+    and "quoted text" is matched as a phrase. Shows note IDs for edit-note and remove-note.
     Args:
-        args (list): List of arguments. Expected search text.
+        args (list): List of arguments. Expected format: [query] [--limit N (optional)] [--offset N (optional)]
     Returns:
         str: List of found notes.
     """
+    args, limit, offset = parse_paging(args)
     search_text = " ".join(args)
-    return notes_dif.find_notes_command(search_text)
+    found_notes, total = notes_dif.search(search_text, limit, offset)
+    if not total:
+        return "No matching notes found."
+    lines = notes_dif.format_found(found_notes, search_text)
+    return "\n".join(lines + [page_footer(offset, len(found_notes), total)]).strip()
+
+@input_error
+def add_tag_command(args, notes_dif: Notes):
+    """
+    Adds tags to a note.
+    Args:
+        args (list): List of arguments. Expected format: [note_id] [tag ...]
+    Returns:
+        str: Message indicating the tags have been added.
+    """
+    if len(args) < 2 or not args[0].isdigit():
+        return CommandError("Usage: add-tag [note_id] [tag ...]")
+    return notes_dif.add_tags(int(args[0]), args[1:])
+
+@input_error
+def remove_tag_command(args, notes_dif: Notes):
+    """
+    Removes tags from a note.
+    Args:
+        args (list): List of arguments. Expected format: [note_id] [tag ...]
+    Returns:
+        str: Message indicating the tags have been removed.
+    """
+    if len(args) < 2 or not args[0].isdigit():
+        return CommandError("Usage: remove-tag [note_id] [tag ...]")
+    return notes_dif.remove_tags(int(args[0]), args[1:])
+
+@input_error
+def find_tag_command(args, notes_dif: Notes):
+    """
+    Finds notes by tags. Tags next to each other must all be present; "and", "or", "not"
+    and parentheses combine them, e.g. find-tag work and urgent not done.
+    Args:
+        args (list): List of arguments. Expected format: [expression] [--limit N (optional)] [--offset N (optional)]
+    Returns:
+        str: List of found notes.
+    """
+    args, limit, offset = parse_paging(args)
+    if not args:
+        return CommandError("Usage: find-tag [expression] [--limit N] [--offset N]")
+    found_notes, total = notes_dif.find_by_tags(" ".join(args), limit, offset)
+    if not total:
+        return "No matching notes found."
+    lines = [f"{note_id}: {note.preview()}" for note_id, note in found_notes]
+    return "\n".join(lines + [page_footer(offset, len(found_notes), total)]).strip()
+
+def tags_command(args, notes_dif: Notes):
+    """
+    Shows every tag with the number of notes carrying it, most used first.
+    Args:
+        args: Function arguments (not used).
+    Returns:
+        str: The tags and their counts.
+    """
+    counts = notes_dif.tag_counts()
+    if not counts:
+        return "No tags available."
+    return "\n".join(f"#{tag}: {count}" for tag, count in counts)
 
 def help(commands_dict):
     """
@@ -276,13 +648,28 @@ def help(commands_dict):
     "hello": hello_command,
     "all": show_all_contacts_command,
     "search": search_contacts_command,
+    "fuzzy": fuzzy_search_command,
+    "import": import_contacts_command,
+    "export": export_contacts_command,
+    "stats": stats_command,
+    "lookup": lookup_command,
+    "duplicates": duplicates_command,
+    "check-indexes": check_indexes_command,
+    "add-phone": add_phone_command,
+    "edit-phone": edit_phone_command,
+    "remove-phone": remove_phone_command,
     "add-comment": add_comment_command,
     "remove-comment": remove_comment_command,
     "add-note": add_notes_command,
     "remove-note": remove_notes_command,
     "edit-note": edit_notes_command,
     "notes": list_notes_command,
-    "find-notes": find_notes_command
+    "show-note": show_note_command,
+    "find-notes": find_notes_command,
+    "add-tag": add_tag_command,
+    "remove-tag": remove_tag_command,
+    "find-tag": find_tag_command,
+    "tags": tags_command
 }
     for command, func in commands_dict.items():
         if hasattr(func, "__doc__") and func.__doc__:
@@ -1,50 +1,228 @@
-from objects.AddressBook import AddressBook
-from objects.Notes import Notes
+import os
+import re
+import signal
+import sys
+import time
 from servises.SaveService import SaveService
+from servises.OutputService import CommandError, StreamedOutput, show
 import bot_functions
-from prompt_toolkit import prompt
-from servises.CompleterService import MyCompleter
 
 
 
-def main():
+ARGUMENT = re.compile(r"""(?<!\S)"([^"]*)"(?!\S)|(?<!\S)'([^']*)'(?!\S)|\S+""")
+
+
+def split_input(line):
     """
-    Main function to run the console bot assistant.
+    Splits a command line into the command name and its arguments.
+
+    The command name is lowercased; arguments keep their case. A whole
+    argument can be quoted with "..." or '...' to keep spaces in it, e.g. a
+    file path. Quotes and backslashes inside a word are kept as they are, so
+    note texts like "don't" and Windows paths pass through unchanged.
 
-    This function initializes the necessary objects, such as the SaveService, AddressBook, and Notes.
-    It also defines a dictionary of commands mapped to their corresponding functions.
-    The user is prompted to enter a command, and the appropriate handler function is called based on the input.
-    The loop continues until the user enters either 'exit' or 'close'.
+    Args:
+        line (str): The command line.
 
     Returns:
-        None
+        list of str: The command name followed by its arguments; empty for a blank line.
     """
-    save_service = SaveService()
-    book = AddressBook(save_service)
-    notes = Notes(save_service)
+    words = [match.group(1) if match.group(1) is not None else
+             match.group(2) if match.group(2) is not None else match.group(0)
+             for match in ARGUMENT.finditer(line)]
+    if words:
+        words[0] = words[0].lower()
+    return words
+
+
+def create_commands(save_service):
+    """
+    Creates the table of commands, loading the address book and the notes only when a command needs them.
+
+    Args:
+        save_service (SaveService): The service the address book and the notes are loaded with.
+
+    Returns:
+        tuple: The dict mapping command names to handlers and a function returning the notes.
+    """
+    loaded = {}
+
+    def book():
+        if "book" not in loaded:
+            from objects.AddressBook import AddressBook
+            unique = [field.strip() for field in os.environ.get("BOT_UNIQUE", "").split(",") if field.strip()]
+            loaded["book"] = AddressBook(save_service, unique=unique)
+        return loaded["book"]
+
+    def notes():
+        if "notes" not in loaded:
+            from objects.Notes import Notes
+            from servises.BlobStore import BlobStore
+            loaded["notes"] = Notes(save_service, BlobStore(threshold=int(os.environ.get("BOT_NOTE_COMPRESS", "4096"))))
+        return loaded["notes"]
 
     commands = {
-        "add": lambda args: bot_functions.add_contact_command(args, book),
-        "edit": lambda args: bot_functions.edit_contact_command(args, book),
-        "remove": lambda args: bot_functions.remove_contact_command(args, book),       
-        "birthdays": lambda args: bot_functions.birthdays_command(args, book),        
+        "add": lambda args: bot_functions.add_contact_command(args, book()),
+        "edit": lambda args: bot_functions.edit_contact_command(args, book()),
+        "remove": lambda args: bot_functions.remove_contact_command(args, book()),
+        "birthdays": lambda args: bot_functions.birthdays_command(args, book()),
         "hello": lambda args: bot_functions.hello_command(args),
-        "all": lambda args: bot_functions.show_all_contacts_command(args, book),
-        "search": lambda args: bot_functions.search_contacts_command(args, book),
-        "add-comment": lambda args: bot_functions.add_comment_command(args, book),
-        "remove-comment": lambda args: bot_functions.remove_comment_command(args, book),
-        "add-note": lambda args: bot_functions.add_notes_command(args, notes),
-        "remove-note": lambda args: bot_functions.remove_notes_command(args, notes),
-        "edit-note": lambda args: bot_functions.edit_notes_command(args, notes),
-        "notes": lambda args: bot_functions.list_notes_command(args, notes),
-        "find-notes": lambda args: bot_functions.find_notes_command(args, notes),
-        "help": lambda args: bot_functions.help(commands),
+        "all": lambda args: bot_functions.show_all_contacts_command(args, book()),
+        "search": lambda args: bot_functions.search_contacts_command(args, book()),
+        "fuzzy": lambda args: bot_functions.fuzzy_search_command(args, book()),
+        "import": lambda args: bot_functions.import_contacts_command(args, book()),
+        "export": lambda args: bot_functions.export_contacts_command(args, book()),
+        "stats": lambda args: bot_functions.stats_command(args, book()),
+        "lookup": lambda args: bot_functions.lookup_command(args, book()),
+        "duplicates": lambda args: bot_functions.duplicates_command(args, book()),
+        "check-indexes": lambda args: bot_functions.check_indexes_command(args, book()),
+        "add-phone": lambda args: bot_functions.add_phone_command(args, book()),
+        "edit-phone": lambda args: bot_functions.edit_phone_command(args, book()),
+        "remove-phone": lambda args: bot_functions.remove_phone_command(args, book()),
+        "add-comment": lambda args: bot_functions.add_comment_command(args, book()),
+        "remove-comment": lambda args: bot_functions.remove_comment_command(args, book()),
+        "add-note": lambda args: bot_functions.add_notes_command(args, notes()),
+        "remove-note": lambda args: bot_functions.remove_notes_command(args, notes()),
+        "edit-note": lambda args: bot_functions.edit_notes_command(args, notes()),
+        "notes": lambda args: bot_functions.list_notes_command(args, notes()),
+        "show-note": lambda args: bot_functions.show_note_command(args, notes()),
+        "find-notes": lambda args: bot_functions.find_notes_command(args, notes()),
+        "add-tag": lambda args: bot_functions.add_tag_command(args, notes()),
+        "remove-tag": lambda args: bot_functions.remove_tag_command(args, notes()),
+        "find-tag": lambda args: bot_functions.find_tag_command(args, notes()),
+        "tags": lambda args: bot_functions.tags_command(args, notes()),
         }
-    
+    commands["help"] = lambda args: bot_functions.help(commands)
+    return commands, notes
+
+
+def run_once(commands, argv):
+    """
+    Runs a single command given on the command line.
+
+    Args:
+        commands (dict): The commands, as returned by create_commands.
+        argv (list of str): The command name followed by its arguments.
+
+    Returns:
+        int: The exit status: 0 on success, 2 for an unknown command.
+    """
+    command, args = argv[0].lower(), argv[1:]
+    handler = commands.get(command)
+    if not handler:
+        print(f"Invalid command: {command}. Run \"bot help\" to list the commands.", file=sys.stderr)
+        return 2
+    result = handler(args)
+    if result:
+        show(result)
+    return 0
+
+
+def run_batch(commands, save_service, lines, atomic=False):
+    """
+    Runs a stream of commands, one per line, as a single transaction.
+
+    Every change stays in memory and is written once when the bot exits. Blank lines and lines
+    starting with "#" are skipped, and "exit" or "close" ends the batch. A line fails when its
+    command is unknown, raises an error or reports one. Without atomic the remaining lines still
+    run and everything that succeeded is saved; with atomic the batch stops at the first failed
+    line and no change is saved.
+
+    Args:
+        commands (dict): The commands, as returned by create_commands.
+        save_service (SaveService): The service the changes are kept in until the final save.
+        lines (iterable of str): The commands, one per line.
+        atomic (bool): Whether to roll back every change if a line fails.
+
+    Returns:
+        int: The exit status: 0 if every line succeeded, 1 otherwise.
+    """
+    start = time.perf_counter()
+    succeeded = failed = 0
+    try:
+        for line_number, line in enumerate(lines, 1):
+            user_input = split_input(line)
+            if not user_input or user_input[0].startswith("#"):
+                continue
+            command, args = user_input[0], user_input[1:]
+            if command in ["exit", "close"]:
+                break
+
+            handler = commands.get(command)
+            try:
+                if not handler:
+                    raise ValueError(f"Invalid command: {command}.")
+                result = handler(args)
+            except Exception as e:
+                result = CommandError(e)
+            if isinstance(result, CommandError):
+                failed += 1
+                print(f"{line_number}: error: {result}")
+                if atomic:
+                    break
+                continue
+
+            succeeded += 1
+            if isinstance(result, StreamedOutput):
+                result.pager = False
+            print(f"{line_number}:", end=" ")
+            show(result or "")
+    except BaseException:
+        if atomic:
+            save_service.discard()
+        raise
+
+    elapsed = time.perf_counter() - start
+    total = succeeded + failed
+    if atomic and failed:
+        save_service.discard()
+        outcome = "changes rolled back"
+    else:
+        outcome = "changes saved"
+    print(f"Ran {total} commands in {elapsed:.2f} s ({total / elapsed if elapsed else 0:.0f} commands/s): "
+          f"{succeeded} succeeded, {failed} failed; {outcome}.")
+    return 1 if failed else 0
+
+
+def parse_batch(argv):
+    """
+    Parses the arguments of batch mode: "--batch [file | -] [--atomic]".
+
+    Args:
+        argv (list of str): The command line arguments after "--batch".
+
+    Returns:
+        tuple: The path of the command file (None or "-" for stdin) and whether the batch is atomic.
+
+    Raises:
+        ValueError: If the arguments are invalid.
+    """
+    atomic = "--atomic" in argv
+    paths = [arg for arg in argv if arg != "--atomic"]
+    if len(paths) > 1:
+        raise ValueError("Usage: bot --batch [file | -] [--atomic]")
+    return (paths[0] if paths else None), atomic
+
+
+def run_interactive(commands, notes):
+    """
+    Prompts for commands until the user enters 'exit' or 'close'.
+
+    prompt_toolkit is only imported here, so one-shot commands don't pay for it.
+
+    Args:
+        commands (dict): The commands, as returned by create_commands.
+        notes (callable): Returns the notes, used to complete tags.
+    """
+    from prompt_toolkit import prompt
+    from servises.CompleterService import MyCompleter
+
     autocommand = list(commands.keys()) + ["close", "exit"]
-    
+    completer = MyCompleter(autocommand, lambda prefix: notes().complete_tag(prefix))
     while True:
-        user_input = prompt("Enter a command: ", completer=MyCompleter(autocommand)).lower().split()
+        user_input = split_input(prompt("Enter a command: ", completer=completer))
+        if not user_input:
+            continue
         command, args = user_input[0], user_input[1:]
 
         if command in ["exit", "close"]:
@@ -58,9 +236,65 @@ def main():
 
         result = handler(args)
         if result:
-            print(result)
-        
+            show(result)
+
+
+def main(argv=None):
+    """
+    Main function to run the console bot assistant.
+
+    With arguments, the bot runs them as a single command and exits, e.g. "bot search anna" or
+    "bot birthdays 7"; "bot --batch [file] [--atomic]" runs the commands of a file (or stdin), one per line,
+    with a single save at the end; without arguments it prompts for commands until the user enters 'exit' or 'close'.
+    The address book and the notes are loaded when the first command that needs them runs.
+    The storage engine is chosen with the BOT_STORAGE environment variable ("pickle", "journal", "snapshot", "columnar", "sharded" or "sqlite")
+    and the durability policy with BOT_DURABILITY ("always", "batched(ms)" or "on-exit"; batch mode always saves on exit).
+    BOT_UNIQUE ("phone", "email" or "phone,email") makes phone numbers and/or emails unique across contacts.
+
+    Args:
+        argv (list of str, optional): The command line arguments; sys.argv[1:] if None.
+
+    Returns:
+        int: The exit status.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    batch = argv[:1] == ["--batch"]
+    if batch:
+        try:
+            path, atomic = parse_batch(argv[1:])
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+    save_service = SaveService.create(os.environ.get("BOT_STORAGE", "journal"),
+                                      durability="on-exit" if batch else os.environ.get("BOT_DURABILITY", "always"),
+                                      shards=int(os.environ.get("BOT_SHARDS", "16")),
+                                      cache_size=int(os.environ.get("BOT_CACHE_SIZE", "1024")))
+    commands, notes = create_commands(save_service)
+
+    for signal_name in ("SIGTERM", "SIGHUP"):
+        if hasattr(signal, signal_name):
+            signal.signal(getattr(signal, signal_name), lambda signum, frame: sys.exit(128 + signum))
+
+    try:
+        if batch:
+            if path in (None, "-"):
+                return run_batch(commands, save_service, sys.stdin, atomic)
+            try:
+                lines = open(path, encoding="utf-8")
+            except OSError as e:
+                print(f"Can't read {path}: {e.strerror}", file=sys.stderr)
+                return 2
+            with lines:
+                return run_batch(commands, save_service, lines, atomic)
+        if argv:
+            return run_once(commands, argv)
+        run_interactive(commands, notes)
+    except (KeyboardInterrupt, EOFError):
+        print("Good bye!")
+    finally:
+        save_service.close()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -7,4 +7,4 @@ class Address(Field):
     This class inherits from the Field class and represents a field
     that stores an address.
     """
-    pass
\ No newline at end of file
+    __slots__ = ()
\ No newline at end of file
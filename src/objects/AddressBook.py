@@ -1,9 +1,19 @@
-from datetime import datetime
+import heapq
+from datetime import date, datetime
+from itertools import islice
 from objects.Phone import Phone
 from objects.Birthday import Birthday
 from objects.Address import Address
 from objects.Email import Email
 from servises.SaveService import SaveService
+from servises.OutputService import CommandError
+from servises.LRUCache import LRUCache
+from servises.LazyRecords import LazyRecords
+from objects.TrigramIndex import TrigramIndex
+from objects.PhoneIndex import PhoneIndex
+from objects.DeleteIndex import DeleteIndex
+from objects.BirthdayIndex import BirthdayIndex
+from objects.HashIndex import HashIndex, normalize_phone, normalize_email
 
 class AddressBook:
     """
@@ -11,20 +21,42 @@ class AddressBook:
 
     This class manages a collection of records, each representing a contact.
     It provides methods for adding, retrieving, updating, and removing contacts.
+
+    Phone numbers and emails can be made unique: a contact can then not be
+    given a phone number or email that another contact already has.
     """
 
     name_for_save = "book"
+    search_weights = {
+        "name_exact": 100,
+        "name_prefix": 80,
+        "name": 60,
+        "phone": 40,
+        "email": 30,
+        "address": 20,
+        "birthday": 10,
+    }
     
-    def __init__(self, save_service: SaveService):
+    unique_fields = ("phone", "email")
+
+    def __init__(self, save_service: SaveService, unique=()):
         """
         Initialize an AddressBook instance.
 
         Args:
             save_service (SaveService): The service used for saving and loading data.
+            unique (iterable of str): The fields that must not repeat across contacts: "phone" and/or "email".
 
         Returns:
             None
+
+        Raises:
+            ValueError: If a unique field is not "phone" or "email".
         """
+        self.unique = frozenset(unique)
+        unknown = self.unique - set(self.unique_fields)
+        if unknown:
+            raise ValueError(f"Unknown unique field: {', '.join(sorted(unknown))}")
         self._save_service = save_service
         
         loaded_data = save_service.load(AddressBook.name_for_save)
@@ -32,6 +64,19 @@ class AddressBook:
             self._records = {}
         else:
             self._records = loaded_data
+        if isinstance(self._records, LazyRecords):
+            self._records.lock = save_service.lock
+        self._search_index = None
+        self._phone_index = None
+        self._name_index = None
+        self._birthday_index = None
+        self._columns = None
+        self._columns_version = None
+        self._email_owners = None
+        self._version = 0
+        self._query_cache = LRUCache(128)
+        if self.unique:
+            self._owner_indexes()
 
     def get_record(self, name):
         """
@@ -54,66 +99,551 @@ class AddressBook:
 
         Returns:
             None
+
+        Raises:
+            ValueError: If a unique phone number or email belongs to another contact.
+        """
+        with self._save_service.lock:
+            self._check_unique(record.name.value, record.phone_numbers, record.email.value if record.email else None)
+            self._records[record.name.value] = record
+            self._save_changes([("set", record.name.value, record)])
+
+    def bulk_add(self, rows, workers=None, chunk_size=1000):
+        """
+        Add many contacts at once and save them with a single commit.
+
+        Rows are validated in chunks, in a process pool for large inputs.
+        Invalid rows, and rows whose phone or email is taken when those are
+        unique, are reported and skipped instead of aborting the import.
+
+        Args:
+            rows (iterable of tuple): Pairs of line number and row dict with the keys
+                name, phones, birthday, address, email and comment.
+            workers (int, optional): The number of validation processes; 0 validates in this process.
+            chunk_size (int): The number of rows validated per task.
+
+        Returns:
+            tuple: The number of added contacts and a list of (line number, error message) pairs.
+        """
+        from servises.ImportExportService import validate_rows
+        changes = []
+        errors = []
+        with self._save_service.lock:
+            for records, chunk_errors in validate_rows(rows, workers, chunk_size):
+                errors.extend(chunk_errors)
+                for line_number, record in records:
+                    name = record.name.value
+                    if self.unique:
+                        try:
+                            self._check_unique(name, record.phone_numbers, record.email.value if record.email else None)
+                        except ValueError as e:
+                            errors.append((line_number, str(e)))
+                            continue
+                        self._update_owners(name, record.as_row())
+                    self._records[name] = record
+                    changes.append(("set", name, record))
+            if changes:
+                self._save_changes(changes)
+        errors.sort(key=lambda error: error[0])
+        return len(changes), errors
+
+    def _save_changes(self, changes):
+        """
+        Persist changes made to the records through the save service.
+
+        Records changed in place are stored back first, so lazily loaded
+        records keep the change even after they leave the record cache.
+        Bumping the version invalidates all cached query results.
+
+        Args:
+            changes (list of tuple): The changes, e.g. ("set", name, record) or ("del", name).
+
+        Returns:
+            None
+        """
+        for change in changes:
+            if change[0] == "set":
+                self._records[change[1]] = change[2]
+        self._version += 1
+        self._update_indexes(changes)
+        self._save_service.update(AddressBook.name_for_save, self._records, changes)
+
+    def _update_indexes(self, changes):
+        """
+        Keep the search indexes in sync with changes made to the records.
+
+        Args:
+            changes (list of tuple): The changes, e.g. ("set", name, record) or ("del", name).
+
+        Returns:
+            None
+        """
+        for change in changes:
+            if change[0] == "set":
+                row = change[2].as_row()
+                if self._search_index is not None:
+                    self._search_index.add(change[1], self._search_texts(row))
+                if self._name_index is not None:
+                    self._name_index.add(change[1])
+                if self._birthday_index is not None:
+                    self._birthday_index.add(change[1], date.fromordinal(row[4]) if row[4] else None)
+                self._update_owners(change[1], row)
+            else:
+                if self._search_index is not None:
+                    self._search_index.remove(change[1])
+                if self._phone_index is not None:
+                    self._phone_index.remove(change[1])
+                if self._name_index is not None:
+                    self._name_index.remove(change[1])
+                if self._birthday_index is not None:
+                    self._birthday_index.remove(change[1])
+                if self._email_owners is not None:
+                    self._email_owners.remove(change[1])
+
+    def _phones(self):
+        """
+        Get the phone index, building it on the first use.
+
+        It is kept up to date by every change saved afterwards (add_phone,
+        edit_phone and remove_phone change phone numbers this way).
+
+        Returns:
+            PhoneIndex: The index from phone numbers to the contacts that have them.
+        """
+        if self._phone_index is None:
+            self._phone_index = PhoneIndex.build((row[0], list(row[1])) for row in self._rows())
+        return self._phone_index
+
+    def _owner_indexes(self):
+        """
+        Get the indexes from phone numbers and emails to the contacts that have them.
+
+        Phone owners are exact lookups in the phone index; emails have a
+        hash index of their own. Both are built at load when a field is
+        unique and otherwise on the first lookup, and are kept up to date
+        by every change saved afterwards.
+
+        Returns:
+            tuple: The phone index and the email index.
+        """
+        if self._email_owners is None:
+            self._email_owners = HashIndex.build(
+                normalize_email, ((row[0], (row[3],)) for row in self._rows() if row[3]))
+        return self._phones(), self._email_owners
+
+    def _update_owners(self, name, row):
+        """
+        Re-index the phone numbers and email of a contact in the owner indexes, if they are built.
+
+        Args:
+            name (str): The name of the contact.
+            row (tuple): The fields of the contact, in the format of Record.as_row.
+        """
+        if self._phone_index is not None:
+            self._phone_index.add(name, list(row[1]))
+        if self._email_owners is not None:
+            self._email_owners.add(name, (row[3],) if row[3] else ())
+
+    def _check_unique(self, name, phones, email):
+        """
+        Check that the phone numbers and email a contact would get do not belong to another contact.
+
+        Only the fields listed in unique are checked.
+
+        Args:
+            name (str): The name of the contact.
+            phones (iterable of str): The phone numbers the contact would have.
+            email (str or None): The email the contact would have.
+
+        Raises:
+            ValueError: If a unique phone number or email belongs to another contact.
+        """
+        if not self.unique:
+            return
+        phone_owners, email_owners = self._owner_indexes()
+        if "phone" in self.unique:
+            for phone in phones:
+                others = phone_owners.find(phone, "exact") - {name}
+                if others:
+                    raise ValueError(f"Phone number {phone} already belongs to {', '.join(sorted(others))}.")
+        if "email" in self.unique and email:
+            for value, others in email_owners.conflicts(name, (email,)):
+                raise ValueError(f"Email {value} already belongs to {', '.join(others)}.")
+
+    def find_owners(self, value):
+        """
+        Find the contacts with a phone number or email, using the phone and email indexes.
+
+        Args:
+            value (str): A phone number (non-digits are ignored) or an email (case is ignored).
+
+        Returns:
+            list: The records of the contacts, ordered by name.
+        """
+        phone_owners, email_owners = self._owner_indexes()
+        if "@" in value:
+            names = email_owners.find(value)
+        else:
+            names = sorted(phone_owners.find(normalize_phone(value), "exact"))
+        return [self._records[name] for name in names]
+
+    def find_duplicates(self):
+        """
+        Find phone numbers and emails shared by more than one contact.
+
+        Returns:
+            list: Tuples of field ("phone" or "email"), normalized value and the sorted names sharing it.
+        """
+        phone_owners, email_owners = self._owner_indexes()
+        return ([("phone", key, names) for key, names in phone_owners.duplicates()]
+                + [("email", key, names) for key, names in email_owners.duplicates()])
+
+    def verify_indexes(self):
+        """
+        Check the phone and email indexes against the records.
+
+        Returns:
+            list of str: The differences found; empty if the indexes are consistent.
+        """
+        phone_owners, email_owners = self._owner_indexes()
+        rows = list(self._rows())
+        problems = [f"phone {problem}" for problem in phone_owners.verify((row[0], list(row[1])) for row in rows)]
+        problems += [f"email {problem}" for problem in
+                     email_owners.verify((row[0], (row[3],) if row[3] else ()) for row in rows)]
+        return problems
+
+    def _rows(self, names=None):
+        """
+        Scan the searchable fields of the contacts as plain values.
+
+        A columnar book is scanned column by column; other books read
+        the fields of each record without building Field objects.
+
+        Args:
+            names (iterable of str, optional): The names of the contacts to read; all contacts if None.
+
+        Returns:
+            iterable: Tuples in the format of Record.as_row.
+        """
+        rows = getattr(self._records, "rows", None)
+        if rows is not None:
+            return rows(names)
+        if names is None:
+            return (record.as_row() for record in self._records.values())
+        return (self._records[name].as_row() for name in names)
+
+    @staticmethod
+    def _search_texts(row):
+        """
+        Get the texts of a contact that search_contacts looks at.
+
+        Args:
+            row (tuple): The fields of the contact, in the format of Record.as_row.
+
+        Returns:
+            list: The name, phone numbers, address, email and birthday of the contact.
+        """
+        name, phones, address, email, birthday = row
+        texts = [name] + list(phones)
+        if address:
+            texts.append(address)
+        if email:
+            texts.append(email)
+        if birthday:
+            texts.append(Birthday.format_ordinal(birthday))
+        return texts
+
+    def _search_candidates(self, search_term):
+        """
+        Get the names of the contacts that may match a search term, using the trigram index.
+
+        The index is built on the first search and kept up to date afterwards.
+        Terms shorter than three characters fall back to a full scan.
+
+        Args:
+            search_term (str): The term to search for.
+
+        Returns:
+            set or None: The names to check against the term, or None if all contacts must be checked.
         """
-        self._records[record.name.value] = record
-        self._save_service.save(AddressBook.name_for_save, self._records)
+        if self._search_index is None:
+            self._search_index = TrigramIndex()
+            for row in self._rows():
+                self._search_index.add(row[0], self._search_texts(row))
+        return self._search_index.candidates(search_term)
 
-    def get_all_contacts(self):
+    def iter_records(self):
+        """
+        Iterate over all records without building a list of them.
+
+        Returns:
+            iterator: The records of the address book.
+        """
+        return iter(self._records.values())
+
+    def get_all_contacts(self, limit=None, offset=0):
         """
         Get details of all contacts in the address book.
 
+        Args:
+            limit (int, optional): The maximum number of contacts returned; all if None.
+            offset (int): The number of contacts to skip.
+
         Returns:
             str: A formatted string containing details of all contacts.
         """
-        return "\n\n".join([record.get_details() for name, record in self._records.items()])
+        return "\n\n".join(record.get_details() for record in self.iter_contacts(limit, offset))
+
+    def iter_contacts(self, limit=None, offset=0):
+        """
+        Iterate over one page of the records without building a list of them.
+
+        Args:
+            limit (int, optional): The maximum number of records; all if None.
+            offset (int): The number of records to skip.
+
+        Returns:
+            iterator: The records on the page, in insertion order.
+        """
+        stop = None if limit is None else offset + limit
+        return islice(self._records.values(), offset, stop)
+
+    def __len__(self):
+        """
+        Get the number of contacts in the address book.
+
+        Returns:
+            int: The number of contacts.
+        """
+        return len(self._records)
 
     def get_birthdays_in_next_days(self, days):
         """
         Get upcoming birthdays within a specified number of days.
 
+        The birthday index is built on the first query and kept up to date afterwards.
+        Birthdays on 29 February fall on 28 February in other years.
+
         Args:
             days (int): The number of days to consider for upcoming birthdays.
 
         Returns:
-            list: A list of tuples containing names and birthday dates of contacts with upcoming birthdays.
+            list: A list of tuples containing names and birthday dates of contacts with upcoming birthdays,
+            ordered by date.
         """
         today = datetime.now().date()
-        upcoming_birthdays = []
-        for record in self._records.values():
-            if record.birthday:
-                birthday_date = record.birthday.date
-                next_birthday = birthday_date.replace(year=today.year)
-                if next_birthday < today:
-                    next_birthday = next_birthday.replace(year=today.year + 1)
-                days_until_birthday = (next_birthday - today).days
-                if 0 <= days_until_birthday <= days:
-                    upcoming_birthdays.append((record.name.value, next_birthday))
-                
-        return upcoming_birthdays
-    
-    def search_contacts(self, search_term):
+        key = ("birthdays", self._version, today, days)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        if self._birthday_index is None:
+            birthdays = getattr(self._records, "birthdays", None)
+            if birthdays is not None:
+                birthdays = birthdays()
+            else:
+                birthdays = ((row[0], row[4]) for row in self._rows() if row[4])
+            self._birthday_index = BirthdayIndex.build(
+                (name, date.fromordinal(ordinal)) for name, ordinal in birthdays)
+        upcoming_birthdays = self._birthday_index.upcoming(today, days)
+        self._query_cache.put(key, upcoming_birthdays)
+        return list(upcoming_birthdays)
+
+    def get_columns(self):
+        """
+        Get the contacts as NumPy column arrays for aggregate statistics.
+
+        The columns are extracted on the first call and reused until the address book changes.
+        A columnar book hands over its columns directly; other books are scanned as plain values.
+
+        Returns:
+            ContactColumns: The columns.
+
+        Raises:
+            RuntimeError: If NumPy is not installed.
+        """
+        from servises.StatsService import ContactColumns
+        if self._columns is None or self._columns_version != self._version:
+            columns = getattr(self._records, "columns", None)
+            if columns is not None:
+                self._columns = ContactColumns.from_columnar(columns())
+            else:
+                self._columns = ContactColumns.from_rows(self._rows())
+            self._columns_version = self._version
+        return self._columns
+
+    def find_similar_names(self, name, max_distance=2, limit=10):
+        """
+        Find contact names within an edit distance of a possibly misspelled name.
+
+        The name index (a symmetric-delete index) is built on the first lookup and kept up to date afterwards.
+
+        Args:
+            name (str): The name to look for.
+            max_distance (int): The largest number of typos accepted.
+            limit (int): The maximum number of names returned.
+
+        Returns:
+            list: Pairs of edit distance and contact name, closest first.
+        """
+        if self._name_index is None:
+            self._name_index = DeleteIndex()
+            for known_name in self._records:
+                self._name_index.add(known_name)
+        return self._name_index.find(name, max_distance, limit)
+
+    def _not_found(self, name):
+        """
+        Build the "Record not found." message, with suggestions for a misspelled name.
+
+        Args:
+            name (str): The name that was not found.
+
+        Returns:
+            CommandError: The message.
+        """
+        suggestions = [similar for distance, similar in self.find_similar_names(name, limit=3)]
+        if suggestions:
+            return CommandError(f"Record not found. Did you mean: {', '.join(suggestions)}?")
+        return CommandError("Record not found.")
+
+    def find_by_phone(self, digits, mode="infix"):
+        """
+        Find contacts by a full or partial phone number.
+
+        The phone index is built on the first lookup and kept up to date afterwards.
+
+        Args:
+            digits (str): The digits to look for.
+            mode (str): "exact", "prefix", "suffix" (e.g. the last 4 digits) or "infix".
+
+        Returns:
+            list: The matching records, ordered by name.
+        """
+        return [self._records[name] for name in sorted(self._phones().find(digits, mode))]
+
+    def _match_score(self, row, search_term):
+        """
+        Score how well a contact matches a search term.
+
+        A name match ranks highest (exact above prefix above substring),
+        followed by phone, email, address and birthday matches, as given
+        by search_weights.
+
+        Args:
+            row (tuple): The fields of the contact, in the format of Record.as_row.
+            search_term (str): The term to search for.
+
+        Returns:
+            int: The score of the best matching field, or 0 if nothing matches.
+        """
+        name, phones, address, email, birthday = row
+        term = search_term.lower()
+        lowered = name.lower()
+        if lowered == term:
+            return self.search_weights["name_exact"]
+        if lowered.startswith(term):
+            return self.search_weights["name_prefix"]
+        if term in lowered:
+            return self.search_weights["name"]
+        if any(search_term in phone for phone in phones):
+            return self.search_weights["phone"]
+        if email and term in email.lower():
+            return self.search_weights["email"]
+        if address and term in address.lower():
+            return self.search_weights["address"]
+        if birthday and search_term in Birthday.format_ordinal(birthday):
+            return self.search_weights["birthday"]
+        return 0
+
+    def iter_search(self, search_term):
+        """
+        Lazily find the contacts matching a search term, each contact once.
+
+        Args:
+            search_term (str): The term to search for in contact names, phone numbers, emails, addresses and birthdays.
+
+        Yields:
+            tuple: The score and name of each matching contact, unordered.
+        """
+        candidates = self._search_candidates(search_term)
+        scores = getattr(self._records, "scores", None)
+        if scores is not None:
+            yield from scores(search_term, self.search_weights, candidates)
+            return
+        for row in self._rows(candidates):
+            score = self._match_score(row, search_term)
+            if score:
+                yield score, row[0]
+
+    def search_names(self, search_term, limit=None, offset=0):
+        """
+        Find the names of one page of contacts matching a search term, best matches first.
+
+        Only the first offset + limit matches are kept in a heap while the
+        matches are scanned, instead of sorting all of them. Results are
+        cached until the address book changes.
+
+        Args:
+            search_term (str): The term to search for.
+            limit (int, optional): The maximum number of names returned; all if None.
+            offset (int): The number of best matches to skip.
+
+        Returns:
+            tuple: The list of names on the page and the total number of matches.
+        """
+        key = ("search", self._version, search_term.lower(), limit, offset)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            return list(cached[0]), cached[1]
+        total = 0
+
+        def counted(matches):
+            nonlocal total
+            for match in matches:
+                total += 1
+                yield match
+
+        def rank(match):
+            return -match[0], match[1]
+
+        matches = counted(self.iter_search(search_term))
+        if limit is None:
+            ranked = sorted(matches, key=rank)
+        else:
+            ranked = heapq.nsmallest(offset + limit, matches, key=rank)
+        names = [name for score, name in ranked[offset:]]
+        self._query_cache.put(key, (names, total))
+        return list(names), total
+
+    def search(self, search_term, limit=None, offset=0):
+        """
+        Find one page of contacts matching a search term, best matches first.
+
+        Args:
+            search_term (str): The term to search for.
+            limit (int, optional): The maximum number of records returned; all if None.
+            offset (int): The number of best matches to skip.
+
+        Returns:
+            tuple: The list of records on the page and the total number of matches.
+        """
+        names, total = self.search_names(search_term, limit, offset)
+        return [self._records[name] for name in names], total
+
+    def search_contacts(self, search_term, limit=None, offset=0):
         """
         Search for contacts based on a search term.
 
         Args:
             search_term (str): The term to search for in contact names, phone numbers, addresses, and emails.
+            limit (int, optional): The maximum number of contacts returned; all if None.
+            offset (int): The number of best matches to skip.
 
         Returns:
             str: A formatted string containing details of contacts matching the search term.
         """
-        results = []
-        for name, record in self._records.items():
-            if (search_term.lower() in name.lower() or
-                any(search_term in phone.value for phone in record.phones) or
-                (record.address and search_term.lower() in record.address.value.lower()) or
-                (record.email and search_term.lower() in record.email.value.lower())):
-                
-                results.append(record.get_details())
-            if record.birthday:
-                if search_term in record.birthday.str_data:
-                    results.append(record.get_details())
-            
-        return "\n\n".join(results) if results else "No matching contacts found."
+        records, total = self.search(search_term, limit, offset)
+        return "\n\n".join(record.get_details() for record in records) if records else "No matching contacts found."
 
     def edit_record(self, name, phones=[], address=None, email=None, birthday=None):
         """
@@ -128,22 +658,106 @@ class AddressBook:
 
         Returns:
             str: A message indicating the result of the edit operation.
+
+        Raises:
+            ValueError: If a value is invalid or a unique phone number or email belongs to another
+                contact; the record is left unchanged.
         """
-        if name in self._records:
-            record = self._records[name]
-            if len(phones) > 0:
-                record.phones = [Phone(phone) for phone in phones]
-            if address:
-                record.address = Address(address)
-            if email:
-                record.email = Email(email)
-            if birthday:
-                record.birthday = Birthday(birthday)
-                
-            self._save_service.save(AddressBook.name_for_save, self._records)
-            return f"Record for {name} has been updated."
-        else:
-            return "Record not found."
+        with self._save_service.lock:
+            if name in self._records:
+                record = self._records[name]
+                new_phones = [Phone(phone) for phone in phones]
+                new_address = Address(address) if address else None
+                new_email = Email(email) if email else None
+                new_birthday = Birthday(birthday) if birthday else None
+                self._check_unique(name, phones if len(phones) > 0 else record.phone_numbers,
+                                   email if email else record.email.value if record.email else None)
+                if new_phones:
+                    record.phones = new_phones
+                if new_address:
+                    record.address = new_address
+                if new_email:
+                    record.email = new_email
+                if new_birthday:
+                    record.birthday = new_birthday
+
+                self._save_changes([("set", name, record)])
+                return f"Record for {name} has been updated."
+            else:
+                return self._not_found(name)
+
+    def add_phone(self, name, phone):
+        """
+        Add a phone number to a record, keeping the phone index up to date.
+
+        Args:
+            name (str): The name of the contact.
+            phone (str): The phone number to add.
+
+        Returns:
+            str: A message indicating the result of the operation.
+
+        Raises:
+            ValueError: If the phone number is invalid, the contact already has it,
+                or it is unique and belongs to another contact.
+        """
+        with self._save_service.lock:
+            record = self.get_record(name)
+            if not record:
+                return self._not_found(name)
+            phone = Phone(phone).value
+            self._check_unique(name, list(record.phone_numbers) + [phone], None)
+            record.add_phone(phone)
+            self._save_changes([("set", name, record)])
+            return "Phone number added."
+
+    def remove_phone(self, name, phone):
+        """
+        Remove a phone number from a record, keeping the phone index up to date.
+
+        Args:
+            name (str): The name of the contact.
+            phone (str): The phone number to remove.
+
+        Returns:
+            str: A message indicating the result of the operation.
+        """
+        with self._save_service.lock:
+            record = self.get_record(name)
+            if not record:
+                return self._not_found(name)
+            if phone not in record.phone_numbers:
+                return CommandError("Phone not found.")
+            record.remove_phone(phone)
+            self._save_changes([("set", name, record)])
+            return "Phone number removed."
+
+    def edit_phone(self, name, old_phone, new_phone):
+        """
+        Replace a phone number of a record, keeping the phone index up to date.
+
+        Args:
+            name (str): The name of the contact.
+            old_phone (str): The phone number to replace.
+            new_phone (str): The new phone number.
+
+        Returns:
+            str: A message indicating the result of the operation.
+
+        Raises:
+            ValueError: If the new phone number is invalid, or it is unique and belongs to another contact.
+        """
+        with self._save_service.lock:
+            record = self.get_record(name)
+            if not record:
+                return self._not_found(name)
+            if old_phone not in record.phone_numbers:
+                return CommandError("Phone not found.")
+            new_phone = Phone(new_phone).value
+            self._check_unique(name, [new_phone if phone == old_phone else phone for phone in record.phone_numbers], None)
+            message = record.edit_phone(old_phone, new_phone)
+            self._save_changes([("set", name, record)])
+            return message
 
     def remove_record(self, name):
         """
@@ -155,12 +769,13 @@ class AddressBook:
         Returns:
             str: A message indicating the result of the removal operation.
         """
-        if name in self._records:
-            del self._records[name]
-            self._save_service.save(AddressBook.name_for_save, self._records)
-            return f"Record for {name} has been removed."
-        else:
-            return "Record not found."
+        with self._save_service.lock:
+            if name in self._records:
+                del self._records[name]
+                self._save_changes([("del", name)])
+                return f"Record for {name} has been removed."
+            else:
+                return self._not_found(name)
         
     def add_comment(self, name, comment):
         """
@@ -173,13 +788,14 @@ class AddressBook:
         Returns:
             str: A message indicating the result of the comment addition operation.
         """
-        record = self.get_record(name)
-        if record:
-            record.add_comment(comment)
-            self._save_service.save(AddressBook.name_for_save, self._records)
-            return "Comment added."
-        else:
-            return "Record not found."
+        with self._save_service.lock:
+            record = self.get_record(name)
+            if record:
+                record.add_comment(comment)
+                self._save_changes([("set", name, record)])
+                return "Comment added."
+            else:
+                return self._not_found(name)
         
     def remove_comment(self, name):
         """
@@ -191,10 +807,11 @@ class AddressBook:
         Returns:
             str: A message indicating whether the comment was successfully removed or if the record was not found.
         """
-        record = self.get_record(name)
-        if record:
-            record.remove_comment()
-            self._save_service.save(AddressBook.name_for_save, self._records)
-            return "Comment removed."
-        else:
-            return "Record not found."
+        with self._save_service.lock:
+            record = self.get_record(name)
+            if record:
+                record.remove_comment()
+                self._save_changes([("set", name, record)])
+                return "Comment removed."
+            else:
+                return self._not_found(name)
@@ -1,20 +1,29 @@
 from objects.Field import Field
-from datetime import datetime
+from datetime import date, datetime
+from servises.ValidationService import parse_date
 
 class Birthday(Field):
     """
     Represents the birthday of a contact.
 
+    The date is held as its proleptic Gregorian ordinal, a single int;
+    value, date and str_data are derived from it.
+
     Args:
         value (str): The string representation of the birthday in the format 'DD.MM.YYYY'.
 
     Attributes:
+        ordinal (int): The ordinal of the birthday date.
+        value (datetime): The birthday at midnight.
         str_data (str): The string representation of the birthday.
         date (datetime.date): The birthday date.
 
     Methods:
         __init__(value): Initializes the Birthday object with the given value.
+        from_ordinal(ordinal): Creates a Birthday from the ordinal of a date.
+        format_ordinal(ordinal): Formats the ordinal of a date as 'DD.MM.YYYY'.
     """
+    __slots__ = ("ordinal",)
 
     def __init__(self, value):
         """
@@ -22,9 +31,59 @@ class Birthday(Field):
 
         Args:
             value (str): The string representation of the birthday in the format 'DD.MM.YYYY'.
+
+        Raises:
+            ValueError: If the value is not a valid date in the format 'DD.MM.YYYY'.
+        """
+        self.ordinal = parse_date(value)
+
+    @classmethod
+    def from_ordinal(cls, ordinal):
+        """
+        Creates a Birthday from the ordinal of a date.
+
+        Args:
+            ordinal (int): The ordinal of the birthday date.
+
+        Returns:
+            Birthday: The birthday.
+        """
+        birthday = cls.__new__(cls)
+        birthday.ordinal = ordinal
+        return birthday
+
+    @property
+    def value(self):
+        """
+        Returns the birthday at midnight.
+
+        Returns:
+            datetime: The birthday.
         """
-        super().__init__(datetime.strptime(value, '%d.%m.%Y'))
-        self.str_data = value
+        return datetime.fromordinal(self.ordinal)
+
+    @property
+    def str_data(self):
+        """
+        Returns the birthday in the format 'DD.MM.YYYY'.
+
+        Returns:
+            str: The birthday.
+        """
+        return self.format_ordinal(self.ordinal)
+
+    @staticmethod
+    def format_ordinal(ordinal):
+        """
+        Formats the ordinal of a date in the format 'DD.MM.YYYY'.
+
+        Args:
+            ordinal (int): The ordinal of the date.
+
+        Returns:
+            str: The date.
+        """
+        return date.fromordinal(ordinal).strftime('%d.%m.%Y')
 
     @property
     def date(self):
@@ -34,4 +93,12 @@ class Birthday(Field):
         Returns:
             datetime.date: The birthday date.
         """
-        return self.value.date()
\ No newline at end of file
+        return date.fromordinal(self.ordinal)
+
+    def __getstate__(self):
+        return self.ordinal
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            state = state["value"].toordinal()
+        self.ordinal = state
@@ -0,0 +1,148 @@
+from bisect import bisect_left, insort
+from calendar import isleap
+from datetime import date, timedelta
+
+LEAP_YEAR = 2000
+LEAP_DAY = date(LEAP_YEAR, 2, 29).timetuple().tm_yday
+MAX_DAYS = 366
+
+
+class BirthdayIndex:
+    """
+    Sorted index of birthdays by day of the year.
+
+    Birthdays are keyed by their day in a leap year, so 29 February has a
+    key of its own. A query for the next days bisects the sorted keys once
+    per calendar year the range touches, so its cost depends on the number
+    of hits, not on the number of contacts. In years without 29 February,
+    leap-day birthdays are celebrated on 28 February.
+
+    Methods:
+        add: Indexes (or re-indexes) the birthday of a contact.
+        remove: Removes a contact from the index.
+        upcoming: Returns the birthdays within a number of days, ordered by date.
+    """
+    def __init__(self):
+        """Initializes an empty BirthdayIndex."""
+        self._entries = []
+        self._keys = {}
+
+    @staticmethod
+    def day_key(birthday):
+        """
+        Returns the day of the year of a date as if it were in a leap year.
+
+        Args:
+            birthday (datetime.date): The date.
+
+        Returns:
+            int: The day of the year, 1 to 366.
+        """
+        return date(LEAP_YEAR, birthday.month, birthday.day).timetuple().tm_yday
+
+    @classmethod
+    def build(cls, birthdays):
+        """
+        Builds an index in one pass, sorting the entries once at the end.
+
+        Args:
+            birthdays (iterable of tuple): Pairs of contact name and birthday date.
+
+        Returns:
+            BirthdayIndex: The index.
+        """
+        index = cls()
+        for name, birthday in birthdays:
+            index._keys[name] = cls.day_key(birthday)
+        index._entries = sorted((key, name) for name, key in index._keys.items())
+        return index
+
+    def add(self, name, birthday):
+        """
+        Indexes the birthday of a contact, replacing what was indexed for it before.
+
+        Args:
+            name (str): The name of the contact.
+            birthday (datetime.date or None): The birthday; None only removes the contact.
+        """
+        self.remove(name)
+        if birthday is not None:
+            key = self.day_key(birthday)
+            self._keys[name] = key
+            insort(self._entries, (key, name))
+
+    def remove(self, name):
+        """
+        Removes a contact from the index.
+
+        Args:
+            name (str): The name of the contact.
+        """
+        key = self._keys.pop(name, None)
+        if key is not None:
+            del self._entries[bisect_left(self._entries, (key, name))]
+
+    def upcoming(self, today, days):
+        """
+        Returns the birthdays from today up to and including today + days.
+
+        Only the next birthday of each contact is returned, and it is always within
+        MAX_DAYS, so longer ranges are cut to MAX_DAYS.
+
+        Args:
+            today (datetime.date): The first day of the range.
+            days (int): The number of days after today to include.
+
+        Returns:
+            list of tuple: Pairs of contact name and the date of the next birthday,
+            ordered by date and then by name.
+        """
+        end = today + timedelta(days=min(max(days, -1), MAX_DAYS))
+        result = []
+        seen = set()
+        start = today
+        while start <= end:
+            stop = min(end, date(start.year, 12, 31))
+            for key, name in self._range(start, stop):
+                if name not in seen:
+                    seen.add(name)
+                    result.append((name, self._celebrated(key, start.year)))
+            start = stop + timedelta(days=1)
+        result.sort(key=lambda item: (item[1], item[0]))
+        return result
+
+    def _range(self, start, stop):
+        """
+        Returns the entries celebrated between two dates of the same year.
+
+        Args:
+            start (datetime.date): The first day.
+            stop (datetime.date): The last day, in the year of start.
+
+        Returns:
+            list of tuple: The matching (key, name) entries.
+        """
+        low = self.day_key(start)
+        high = self.day_key(stop)
+        if not isleap(start.year) and (stop.month, stop.day) == (2, 28):
+            high = LEAP_DAY
+        return self._entries[bisect_left(self._entries, (low,)):bisect_left(self._entries, (high + 1,))]
+
+    def _celebrated(self, key, year):
+        """
+        Returns the date a birthday with a day key is celebrated on in a year.
+
+        Args:
+            key (int): The day key of the birthday.
+            year (int): The year.
+
+        Returns:
+            datetime.date: The date.
+        """
+        if key == LEAP_DAY and not isleap(year):
+            return date(year, 2, 28)
+        birthday = date(LEAP_YEAR, 1, 1) + timedelta(days=key - 1)
+        return birthday.replace(year=year)
+
+    def __len__(self):
+        return len(self._keys)
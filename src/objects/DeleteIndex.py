@@ -0,0 +1,148 @@
+def levenshtein(first, second, max_distance=None):
+    """
+    Computes the edit distance between two strings.
+
+    Args:
+        first (str): The first string.
+        second (str): The second string.
+        max_distance (int, optional): Stop early once the distance is known to exceed this.
+
+    Returns:
+        int: The number of single-character insertions, deletions and substitutions
+        needed, or max_distance + 1 if it exceeds max_distance.
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    if max_distance is not None and len(first) - len(second) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (first_char != second_char)))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+class DeleteIndex:
+    """
+    Symmetric-delete index for lookups within an edit distance.
+
+    Two words within edit distance k can both be turned into a common string
+    by deleting at most k characters from each. The index maps every string
+    obtained by deleting up to max_distance characters from the prefix of a
+    word to that word, so a query only generates its own deletes, looks them
+    up, and verifies the few candidates with a real edit distance. Only the
+    first prefix_length characters are used, which bounds the number of
+    deletes per word.
+
+    Methods:
+        add: Adds a word.
+        remove: Removes a word.
+        find: Returns the words within an edit distance of a query, closest first.
+    """
+    def __init__(self, max_distance=2, prefix_length=7):
+        """
+        Initializes an empty DeleteIndex.
+
+        Args:
+            max_distance (int): The largest edit distance lookups can use.
+            prefix_length (int): The number of leading characters deletes are generated from.
+        """
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._deletes = {}
+        self._words = set()
+
+    def _variants(self, word, max_distance):
+        """
+        Returns the strings obtained by deleting up to max_distance characters from the prefix of a word.
+
+        Args:
+            word (str): The word.
+            max_distance (int): The maximum number of deleted characters.
+
+        Returns:
+            set of str: The variants, including the prefix itself.
+        """
+        variants = {word[:self.prefix_length]}
+        level = variants
+        for distance in range(max_distance):
+            level = {variant[:i] + variant[i + 1:] for variant in level for i in range(len(variant))}
+            variants |= level
+        return variants
+
+    def add(self, word):
+        """
+        Adds a word to the index.
+
+        Args:
+            word (str): The word to add.
+        """
+        if word in self._words:
+            return
+        self._words.add(word)
+        for variant in self._variants(word, self.max_distance):
+            words = self._deletes.get(variant)
+            if words is None:
+                self._deletes[variant] = word
+            elif isinstance(words, set):
+                words.add(word)
+            else:
+                self._deletes[variant] = {words, word}
+
+    def remove(self, word):
+        """
+        Removes a word from the index.
+
+        Args:
+            word (str): The word to remove.
+        """
+        if word not in self._words:
+            return
+        self._words.discard(word)
+        for variant in self._variants(word, self.max_distance):
+            words = self._deletes.get(variant)
+            if words == word:
+                del self._deletes[variant]
+            elif isinstance(words, set):
+                words.discard(word)
+                if len(words) == 1:
+                    self._deletes[variant] = words.pop()
+
+    def find(self, query, max_distance=2, limit=None):
+        """
+        Returns the words within an edit distance of a query.
+
+        Args:
+            query (str): The word to look for.
+            max_distance (int): The largest edit distance accepted; capped at the index maximum.
+            limit (int, optional): The maximum number of words returned.
+
+        Returns:
+            list of tuple: Pairs of distance and word, closest first, then alphabetically.
+        """
+        max_distance = min(max_distance, self.max_distance)
+        candidates = set()
+        for variant in self._variants(query, max_distance):
+            words = self._deletes.get(variant)
+            if isinstance(words, set):
+                candidates |= words
+            elif words is not None:
+                candidates.add(words)
+        matches = []
+        for word in candidates:
+            distance = levenshtein(query, word, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, word))
+        matches.sort()
+        return matches[:limit] if limit is not None else matches
+
+    def __contains__(self, word):
+        return word in self._words
+
+    def __len__(self):
+        return len(self._words)
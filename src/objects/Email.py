@@ -1,5 +1,5 @@
 from objects.Field import Field
-import re
+from servises.ValidationService import validate_email
 
 class Email(Field):
     """
@@ -12,7 +12,8 @@ class Email(Field):
         validate(): Validates the email address format.
         __init__(value): Initializes the Email object with the given value and validates it.
     """
-    
+    __slots__ = ()
+
     def validate(self):
         """
         Validates the email address format.
@@ -20,8 +21,7 @@ class Email(Field):
         Raises:
             ValueError: If the email address format is invalid.
         """
-        if not re.match(r"[^@]+@[^@]+\.[^@]+", self.value):
-            raise ValueError("Invalid email address.")
+        validate_email(self.value)
         
     def __init__(self, value):
         """
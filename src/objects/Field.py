@@ -2,12 +2,19 @@ class Field:
     """
     Represents a generic field.
 
+    Fields use __slots__ instead of a per-instance __dict__, which makes a
+    contact several times smaller in memory. Saves written before that
+    pickled the __dict__; __setstate__ still accepts it.
+
     Attributes:
         value: The value stored in the field.
 
     Methods:
         __init__(value): Initializes the Field object with the given value.
+        trusted(value): Creates a field from a value that was already validated.
     """
+    __slots__ = ("value",)
+
     def __init__(self, value):
         """
         Initializes the Field object with the given value.
@@ -15,4 +22,27 @@ class Field:
         Args:
             value: The value to be stored in the field.
         """
-        self.value = value
\ No newline at end of file
+        self.value = value
+
+    @classmethod
+    def trusted(cls, value):
+        """
+        Creates a field from a value that was already validated, skipping validation.
+
+        Args:
+            value: The value to be stored in the field.
+
+        Returns:
+            Field: The field.
+        """
+        field = cls.__new__(cls)
+        field.value = value
+        return field
+
+    def __getstate__(self):
+        return self.value
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            state = state["value"]
+        self.value = state
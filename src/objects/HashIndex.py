@@ -0,0 +1,168 @@
+def normalize_phone(phone):
+    """
+    Normalizes a phone number for lookups by keeping only its digits.
+
+    Args:
+        phone (str): The phone number, possibly with spaces, dashes or brackets.
+
+    Returns:
+        str: The digits of the phone number.
+    """
+    return "".join(char for char in phone if char.isdigit())
+
+
+def normalize_email(email):
+    """
+    Normalizes an email address for lookups by trimming and casefolding it.
+
+    Args:
+        email (str): The email address.
+
+    Returns:
+        str: The normalized email address.
+    """
+    return email.strip().casefold()
+
+
+class HashIndex:
+    """
+    Reverse hash index from normalized field values to the contacts they belong to.
+
+    Each value maps to the set of names of the contacts that have it, so a
+    lookup is a single dict access. The values indexed for each contact are
+    kept too, so re-indexing a changed contact only touches its own values.
+
+    Attributes:
+        normalize (callable): The function that turns a value into its index key.
+
+    Methods:
+        build: Builds an index in one pass.
+        add: Indexes (or re-indexes) the values of a contact.
+        remove: Removes a contact from the index.
+        find: Returns the names of the contacts with a value.
+        conflicts: Returns the values of a contact that other contacts already have.
+        duplicates: Returns the values shared by more than one contact.
+        verify: Compares the index with the values it should hold.
+    """
+    def __init__(self, normalize):
+        """
+        Initializes an empty HashIndex.
+
+        Args:
+            normalize (callable): The function that turns a value into its index key.
+        """
+        self.normalize = normalize
+        self._owners = {}
+        self._keys = {}
+
+    @classmethod
+    def build(cls, normalize, contacts):
+        """
+        Builds an index in one pass.
+
+        Args:
+            normalize (callable): The function that turns a value into its index key.
+            contacts (iterable of tuple): Pairs of contact name and values.
+
+        Returns:
+            HashIndex: The index.
+        """
+        index = cls(normalize)
+        for name, values in contacts:
+            index.add(name, values)
+        return index
+
+    def add(self, name, values):
+        """
+        Indexes the values of a contact, replacing what was indexed for it before.
+
+        Args:
+            name (str): The name of the contact.
+            values (iterable of str): The values of the contact.
+        """
+        keys = tuple(dict.fromkeys(self.normalize(value) for value in values))
+        if self._keys.get(name) == keys:
+            return
+        self.remove(name)
+        if not keys:
+            return
+        self._keys[name] = keys
+        for key in keys:
+            owners = self._owners.get(key)
+            if owners is None:
+                owners = self._owners[key] = set()
+            owners.add(name)
+
+    def remove(self, name):
+        """
+        Removes a contact from the index.
+
+        Args:
+            name (str): The name of the contact.
+        """
+        for key in self._keys.pop(name, ()):
+            owners = self._owners[key]
+            owners.discard(name)
+            if not owners:
+                del self._owners[key]
+
+    def find(self, value):
+        """
+        Returns the names of the contacts with a value.
+
+        Args:
+            value (str): The value, normalized before the lookup.
+
+        Returns:
+            list of str: The names, sorted.
+        """
+        return sorted(self._owners.get(self.normalize(value), ()))
+
+    def conflicts(self, name, values):
+        """
+        Returns the values of a contact that other contacts already have.
+
+        Args:
+            name (str): The name of the contact.
+            values (iterable of str): The values the contact would have.
+
+        Returns:
+            list of tuple: Pairs of value and the sorted names of the other contacts with it.
+        """
+        found = []
+        for value in values:
+            others = self._owners.get(self.normalize(value), set()) - {name}
+            if others:
+                found.append((value, sorted(others)))
+        return found
+
+    def duplicates(self):
+        """
+        Returns the values shared by more than one contact.
+
+        Returns:
+            list of tuple: Pairs of index key and the sorted names of its contacts, ordered by key.
+        """
+        return sorted((key, sorted(owners)) for key, owners in self._owners.items() if len(owners) > 1)
+
+    def verify(self, contacts):
+        """
+        Compares the index with the values it should hold.
+
+        Args:
+            contacts (iterable of tuple): Pairs of contact name and values, for every contact.
+
+        Returns:
+            list of str: The differences found; empty if the index is consistent.
+        """
+        expected = HashIndex.build(self.normalize, contacts)
+        problems = []
+        for name in sorted(set(expected._keys) | set(self._keys)):
+            if set(expected._keys.get(name, ())) != set(self._keys.get(name, ())):
+                problems.append(f"{name}: indexed {sorted(self._keys.get(name, ()))}, "
+                                f"expected {sorted(expected._keys.get(name, ()))}")
+        for key in sorted(set(expected._owners) | set(self._owners)):
+            if expected._owners.get(key, set()) != self._owners.get(key, set()):
+                problems.append(f"{key}: owners {sorted(self._owners.get(key, ()))}, "
+                                f"expected {sorted(expected._owners.get(key, ()))}")
+        return problems
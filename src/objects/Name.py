@@ -10,4 +10,4 @@ class Name(Field):
     This class represents a name field, which inherits functionality from the generic
     Field class.
     """
-    pass
\ No newline at end of file
+    __slots__ = ()
\ No newline at end of file
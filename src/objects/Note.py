@@ -0,0 +1,151 @@
+from datetime import datetime
+
+
+class Note:
+    """
+    Represents a note.
+
+    Attributes:
+        id (int): The stable ID of the note.
+        text (str or None): The text of the note, or None while it is kept compressed in a BlobStore.
+        body (tuple or None): The BlobStore reference of the compressed text.
+        title (str or None): The first line of a compressed text, kept for previews.
+        created (datetime or None): When the note was created; None for notes saved before timestamps existed.
+        updated (datetime or None): When the note was last changed.
+        tags (frozenset of str): The tags of the note.
+
+    Methods:
+        edit: Replaces the text of the note.
+        add_tags: Adds tags to the note.
+        remove_tags: Removes tags from the note.
+        compress: Moves the text of the note into a BlobStore.
+        preview: Returns the first line of the note, shortened.
+    """
+    tags = frozenset()
+    body = None
+    title = None
+    preview_width = 60
+
+    def __init__(self, note_id, text, created=None, updated=None, tags=()):
+        """
+        Initializes a Note instance.
+
+        Args:
+            note_id (int): The stable ID of the note.
+            text (str): The text of the note.
+            created (datetime, optional): When the note was created.
+            updated (datetime, optional): When the note was last changed; defaults to created.
+            tags (iterable of str, optional): The tags of the note.
+        """
+        self.id = note_id
+        self.text = text
+        self.created = created
+        self.updated = updated or created
+        self.tags = frozenset(tags)
+
+    def edit(self, text):
+        """
+        Replaces the text of the note and records the time of the change.
+
+        Args:
+            text (str): The new text.
+        """
+        self.text = text
+        self.body = None
+        self.title = None
+        self.updated = datetime.now()
+
+    def compress(self, bodies):
+        """
+        Moves the text of the note into a BlobStore, keeping only its first line.
+
+        Args:
+            bodies (BlobStore): The store the text is written to.
+        """
+        self.title = self._first_line(self.text)
+        self.body = bodies.put(self.text)
+        self.text = None
+
+    @classmethod
+    def _first_line(cls, text):
+        """Returns the first line of a text, shortened to the preview width."""
+        line = text.strip().split("\n", 1)[0]
+        if len(line) > cls.preview_width or "\n" in text.strip():
+            return line[:cls.preview_width].rstrip() + "..."
+        return line
+
+    def preview(self):
+        """
+        Returns the first line of the note, shortened, followed by its tags.
+
+        Returns:
+            str: The preview.
+        """
+        title = self.title if self.text is None else self._first_line(self.text)
+        if not self.tags:
+            return title
+        return title + " " + " ".join(f"#{tag}" for tag in sorted(self.tags))
+
+    def add_tags(self, tags):
+        """
+        Adds tags to the note.
+
+        Args:
+            tags (iterable of str): The tags, already normalized.
+        """
+        self.tags = self.tags | frozenset(tags)
+        self.updated = datetime.now()
+
+    def remove_tags(self, tags):
+        """
+        Removes tags from the note.
+
+        Args:
+            tags (iterable of str): The tags, already normalized.
+        """
+        self.tags = self.tags - frozenset(tags)
+        self.updated = datetime.now()
+
+
+class NoteMap(dict):
+    """
+    Dict of notes by ID, in insertion order, that hands out new IDs.
+
+    IDs are allocated monotonically and never reused, even after the newest
+    note is removed. The next ID is pickled along with the notes and is
+    advanced whenever a note with a higher ID is stored or removed, so
+    replaying a journal restores it as well, even when a write group
+    coalesced the creation of a removed note away.
+
+    Attributes:
+        next_id (int): The ID the next new note gets.
+    """
+    next_id = 1
+
+    def __setitem__(self, note_id, note):
+        super().__setitem__(note_id, note)
+        self._seen(note_id)
+
+    def __delitem__(self, note_id):
+        super().__delitem__(note_id)
+        self._seen(note_id)
+
+    def pop(self, note_id, *default):
+        self._seen(note_id)
+        return super().pop(note_id, *default)
+
+    def _seen(self, note_id):
+        """Advances the next ID past an ID that was handed out."""
+        if note_id >= self.next_id:
+            self.next_id = note_id + 1
+
+    def allocate(self):
+        """
+        Reserves the next note ID.
+
+        Returns:
+            int: The ID.
+        """
+        note_id = self.next_id
+        self.next_id += 1
+        return note_id
@@ -0,0 +1,216 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+TOKEN = re.compile(r"\w+")
+QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text):
+    """
+    Splits a text into lower-cased word tokens.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list of str: The tokens in text order.
+    """
+    return TOKEN.findall(text.lower())
+
+
+def parse_query(query):
+    """
+    Parses a notes query into OR-ed groups of AND-ed terms and phrases.
+
+    Words are AND-ed, "OR" (in any case) separates alternatives and text in
+    double quotes is a phrase whose words must appear next to each other.
+
+    Args:
+        query (str): The query, e.g. 'milk bread OR "shopping list"'.
+
+    Returns:
+        list of list of tuple: The groups; each part is a tuple of tokens,
+        a single token for a word and several for a phrase.
+    """
+    groups = [[]]
+    for phrase, word in QUERY_PART.findall(query):
+        if word.upper() == "OR":
+            groups.append([])
+            continue
+        tokens = tuple(tokenize(phrase if phrase else word))
+        if tokens:
+            groups[-1].append(tokens)
+    return [group for group in groups if group]
+
+
+class NoteIndex:
+    """
+    Inverted index over notes, ranking matches with BM25.
+
+    Postings map each token to the notes containing it and its frequency
+    there. A query intersects the postings of the terms of each group,
+    starting with the rarest, checks phrases against the stored token
+    sequence of the candidates and ranks the matches with BM25.
+
+    Methods:
+        add: Indexes (or re-indexes) the text of a note.
+        remove: Removes a note from the index.
+        search: Returns the best matching notes of a query.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        """Initializes an empty NoteIndex."""
+        self._postings = defaultdict(dict)
+        self._tokens = {}
+        self._total_length = 0
+
+    def add(self, key, text):
+        """
+        Indexes the text of a note, replacing what was indexed for it before.
+
+        Args:
+            key (int): The key of the note.
+            text (str): The text of the note.
+        """
+        self.remove(key)
+        tokens = tokenize(text)
+        self._tokens[key] = tokens
+        self._total_length += len(tokens)
+        postings = self._postings
+        for token, count in Counter(tokens).items():
+            postings[token][key] = count
+
+    def remove(self, key):
+        """
+        Removes a note from the index.
+
+        Args:
+            key (int): The key of the note.
+        """
+        tokens = self._tokens.pop(key, None)
+        if tokens is None:
+            return
+        self._total_length -= len(tokens)
+        for token in set(tokens):
+            notes = self._postings[token]
+            del notes[key]
+            if not notes:
+                del self._postings[token]
+
+    def search(self, query, limit=None, offset=0):
+        """
+        Finds the notes matching a query, best matches first.
+
+        Args:
+            query (str): The query, see parse_query.
+            limit (int, optional): The maximum number of notes returned; all if None.
+            offset (int): The number of best matches to skip.
+
+        Returns:
+            tuple: A list of (score, key) pairs and the total number of matches.
+        """
+        matches = set()
+        terms = set()
+        for group in parse_query(query):
+            matches |= self._match_group(group)
+            terms.update(token for part in group for token in part)
+        ranked = ((-self._score(key, terms), key) for key in matches)
+        if limit is None:
+            ranked = sorted(ranked)
+        else:
+            ranked = heapq.nsmallest(offset + limit, ranked)
+        return [(-score, key) for score, key in ranked[offset:]], len(matches)
+
+    def _match_group(self, group):
+        """
+        Finds the notes containing all terms and phrases of a group.
+
+        Args:
+            group (list of tuple): The parts of the group.
+
+        Returns:
+            set of int: The keys of the matching notes.
+        """
+        tokens = {token for part in group for token in part}
+        postings = sorted((self._postings.get(token, {}) for token in tokens), key=len)
+        result = set(postings[0])
+        for other in postings[1:]:
+            if not result:
+                break
+            result.intersection_update(other)
+        phrases = [part for part in group if len(part) > 1]
+        if phrases:
+            result = {key for key in result if all(self._has_phrase(self._tokens[key], phrase) for phrase in phrases)}
+        return result
+
+    @staticmethod
+    def _has_phrase(tokens, phrase):
+        """
+        Checks whether a token sequence contains a phrase.
+
+        Args:
+            tokens (list of str): The tokens of a note.
+            phrase (tuple of str): The tokens of the phrase.
+
+        Returns:
+            bool: True if the phrase occurs in the tokens.
+        """
+        size = len(phrase)
+        first = phrase[0]
+        return any(tokens[i:i + size] == list(phrase)
+                   for i, token in enumerate(tokens[:len(tokens) - size + 1]) if token == first)
+
+    def _score(self, key, terms):
+        """
+        Computes the BM25 score of a note for a set of query terms.
+
+        Args:
+            key (int): The key of the note.
+            terms (set of str): The query terms.
+
+        Returns:
+            float: The score.
+        """
+        count = len(self._tokens)
+        average = self._total_length / count if count else 0
+        length = len(self._tokens[key])
+        norm = self.k1 * (1 - self.b + self.b * length / average) if average else self.k1
+        score = 0.0
+        for term in terms:
+            notes = self._postings.get(term)
+            if not notes or key not in notes:
+                continue
+            frequency = notes[key]
+            idf = math.log(1 + (count - len(notes) + 0.5) / (len(notes) + 0.5))
+            score += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return score
+
+    def highlight(self, text, query, width=80):
+        """
+        Cuts a snippet around the first query term of a text and marks the terms in it.
+
+        Args:
+            text (str): The text of a note.
+            query (str): The query.
+            width (int): The approximate length of the snippet.
+
+        Returns:
+            str: The snippet with the query terms wrapped in asterisks.
+        """
+        terms = {token for group in parse_query(query) for part in group for token in part}
+        if not terms:
+            return text[:width]
+        pattern = re.compile(r"\b(" + "|".join(sorted(map(re.escape, terms), key=len, reverse=True)) + r")\b",
+                             re.IGNORECASE)
+        first = pattern.search(text)
+        start = text.rfind(" ", 0, max(0, first.start() - width // 4)) + 1 if first else 0
+        snippet = " ".join(text[start:start + width].split())
+        snippet = pattern.sub(lambda match: f"*{match.group(0)}*", snippet)
+        return ("..." if start else "") + snippet + ("..." if start + width < len(text) else "")
+
+    def __len__(self):
+        return len(self._tokens)
@@ -1,9 +1,25 @@
+from datetime import datetime
+from itertools import islice
 from servises.SaveService import SaveService
+from servises.OutputService import CommandError
+from servises.LRUCache import LRUCache
+from objects.NoteIndex import NoteIndex
+from objects.Note import Note, NoteMap
+from objects.TagIndex import TagIndex, normalize_tag
 
 class Notes:
     """
     Represents a collection of notes.
 
+    Notes are kept in a NoteMap by stable ID, so looking up, editing and
+    removing a note does not depend on the number of notes and the IDs
+    shown by "notes" stay valid after other notes are removed. Each change
+    is saved as a change of the affected note only.
+
+    With a BlobStore, texts longer than its threshold are compressed into
+    the store and only their first line stays in memory and in the saved
+    notes; full texts are read back on demand.
+
     Attributes:
         name_for_save (str): A string representing the name used for saving notes.
         
@@ -12,25 +28,153 @@ class Notes:
         add_notes: Adds a new note to the collection.
         edit_notes: Edits an existing note in the collection.
         remove_notes: Removes a note from the collection.
-        list_notes_command: Lists all notes in the collection.
-        find_notes_command: Finds notes containing a specific text.
+        list_notes_command: Lists the previews of all notes in the collection.
+        show_note_command: Shows the full text of a note.
+        find_notes_command: Finds the notes matching a query, best matches first.
+        add_tags: Adds tags to a note.
+        remove_tags: Removes tags from a note.
+        find_by_tags: Finds the notes matching a boolean tag expression.
+        tag_counts: Counts the notes of every tag.
     """
     name_for_save = "notes"
     
-    def __init__(self, save_service: SaveService):
+    def __init__(self, save_service: SaveService, bodies=None):
         """
         Initializes a Notes instance.
 
         Args:
             save_service (SaveService): An instance of the SaveService class for saving notes data.
+            bodies (BlobStore, optional): The store long note texts are compressed into.
         """
         self._save_service = save_service
+        self._bodies = bodies
         
         loaded_data = save_service.load(Notes.name_for_save)
         if loaded_data == None:
-            self.notes = []
+            self.notes = NoteMap()
+        elif isinstance(loaded_data, list):
+            self.notes = self._convert(loaded_data)
+            save_service.save(Notes.name_for_save, self.notes)
         else:
             self.notes = loaded_data
+        if bodies is not None and any(note.text is not None and bodies.accepts(note.text)
+                                      for note in self.notes.values()):
+            for note in self.notes.values():
+                if note.text is not None and bodies.accepts(note.text):
+                    note.compress(bodies)
+            save_service.save(Notes.name_for_save, self.notes)
+        self._version = 0
+        self._query_cache = LRUCache(128)
+        self._index = None
+        self._tags = None
+
+    @staticmethod
+    def _convert(texts):
+        """
+        Converts notes saved as a plain list of texts, numbering them from 1 as they were shown.
+
+        Args:
+            texts (list of str): The texts of the notes.
+
+        Returns:
+            NoteMap: The notes.
+        """
+        notes = NoteMap()
+        for note_id, text in enumerate(texts, 1):
+            notes[note_id] = Note(note_id, text)
+        return notes
+
+    def text_of(self, note):
+        """
+        Returns the full text of a note, decompressing it if needed.
+
+        Args:
+            note (Note): The note.
+
+        Returns:
+            str: The text.
+        """
+        if note.text is not None:
+            return note.text
+        return self._bodies.get(note.body)
+
+    def _compress(self, note):
+        """
+        Compresses the text of a note into the BlobStore if it is long enough.
+
+        Args:
+            note (Note): The note, just created or edited.
+        """
+        if self._bodies is not None and self._bodies.accepts(note.text):
+            note.compress(self._bodies)
+
+    def _save_changes(self, changes):
+        """
+        Persists changes made to the notes and invalidates cached search results.
+
+        Args:
+            changes (list of tuple): The changes, e.g. ("set", note_id, note) or ("del", note_id).
+        """
+        self._version += 1
+        self._update_index(changes)
+        self._save_service.update(Notes.name_for_save, self.notes, changes)
+
+    def _update_index(self, changes):
+        """
+        Keeps the full-text and tag indexes in sync with changes made to the notes.
+
+        Args:
+            changes (list of tuple): The changes, e.g. ("set", note_id, note) or ("del", note_id).
+        """
+        for change in changes:
+            if change[0] == "set":
+                if self._index is not None:
+                    self._index.add(change[1], self.text_of(change[2]))
+                if self._tags is not None:
+                    self._tags.add(change[1], change[2].tags)
+            else:
+                if self._index is not None:
+                    self._index.remove(change[1])
+                if self._tags is not None:
+                    self._tags.remove(change[1])
+
+    def _search_index(self):
+        """
+        Returns the full-text index, building it on first use.
+
+        Returns:
+            NoteIndex: The index.
+        """
+        if self._index is None:
+            self._index = NoteIndex()
+            for note_id, note in self.notes.items():
+                self._index.add(note_id, self.text_of(note))
+        return self._index
+
+    def _tag_index(self):
+        """
+        Returns the tag index, building it on first use.
+
+        Returns:
+            TagIndex: The index.
+        """
+        if self._tags is None:
+            self._tags = TagIndex()
+            for note_id, note in self.notes.items():
+                self._tags.add(note_id, note.tags)
+        return self._tags
+
+    def get_note(self, note_id):
+        """
+        Returns a note by its ID.
+
+        Args:
+            note_id (int): The ID of the note.
+
+        Returns:
+            Note or None: The note, or None if there is no note with this ID.
+        """
+        return self.notes.get(note_id)
 
     def add_notes(self, note):
         """
@@ -38,9 +182,16 @@ class Notes:
 
         Args:
             note (str): The note to add.
+
+        Returns:
+            int: The ID of the new note.
         """
-        self.notes.append(note)
-        self._save_service.save(Notes.name_for_save, self.notes)
+        with self._save_service.lock:
+            note_id = self.notes.allocate()
+            self.notes[note_id] = Note(note_id, note, datetime.now())
+            self._compress(self.notes[note_id])
+            self._save_changes([("set", note_id, self.notes[note_id])])
+            return note_id
 
     def edit_notes(self, note_id, new_note):
         """
@@ -53,12 +204,15 @@ class Notes:
         Returns:
             str: A message indicating whether the note was successfully updated or not.
         """
-        if 0 <= note_id < len(self.notes):
-            self.notes[note_id] = new_note
-            self._save_service.save(Notes.name_for_save, self.notes)
-            return "Note updated."
-        else:
-            return "Note not found."
+        with self._save_service.lock:
+            note = self.notes.get(note_id)
+            if note is not None:
+                note.edit(new_note)
+                self._compress(note)
+                self._save_changes([("set", note_id, note)])
+                return "Note updated."
+            else:
+                return CommandError("Note not found.")
 
     def remove_notes(self, note_id):
         """
@@ -70,12 +224,27 @@ class Notes:
         Returns:
             str: A message indicating whether the note was successfully removed or not.
         """
-        if 0 <= note_id < len(self.notes):
-            del self.notes[note_id]
-            self._save_service.save(Notes.name_for_save, self.notes)
-            return "Note removed."
-        else:
-            return "Note not found."
+        with self._save_service.lock:
+            if note_id in self.notes:
+                del self.notes[note_id]
+                self._save_changes([("del", note_id)])
+                return "Note removed."
+            else:
+                return CommandError("Note not found.")
+
+    def iter_notes(self, limit=None, offset=0):
+        """
+        Iterates over one page of the notes without building a list of them.
+
+        Args:
+            limit (int, optional): The maximum number of notes; all if None.
+            offset (int): The number of notes to skip.
+
+        Returns:
+            iterator: Pairs of note ID and note, in the order the notes were added.
+        """
+        stop = None if limit is None else offset + limit
+        return islice(self.notes.items(), offset, stop)
 
     def list_notes_command(self):
         """
@@ -85,22 +254,175 @@ class Notes:
             str: A string containing all notes in the collection.
         """
         if self.notes:
-            return "\n".join([f"{idx + 1}: {note}" for idx, note in enumerate(self.notes)])
+            return "\n".join([f"{note_id}: {note.preview()}" for note_id, note in self.notes.items()])
         else:
             return "No notes available."
 
-    def find_notes_command(self, search_text):
+    def show_note_command(self, note_id):
         """
-        Finds notes containing a specific text.
+        Shows the full text of a note with its tags and timestamps.
 
         Args:
-            search_text (str): The text to search for in the notes.
+            note_id (int): The ID of the note.
 
         Returns:
-            str: A string containing the matching notes, if any.
+            str: The note, or a message that it was not found.
         """
-        found_notes = [note for note in self.notes if search_text.lower() in note.lower()]
+        note = self.notes.get(note_id)
+        if note is None:
+            return CommandError("Note not found.")
+        lines = [f"Note {note_id}"]
+        if note.created:
+            lines.append(f"Created: {note.created:%d.%m.%Y %H:%M}")
+        if note.updated and note.updated != note.created:
+            lines.append(f"Updated: {note.updated:%d.%m.%Y %H:%M}")
+        if note.tags:
+            lines.append("Tags: " + " ".join(f"#{tag}" for tag in sorted(note.tags)))
+        return "\n".join(lines + ["", self.text_of(note)])
+
+    def search(self, query, limit=None, offset=0):
+        """
+        Finds one page of notes matching a query, best matches first.
+
+        Words are AND-ed, "OR" separates alternatives and text in double
+        quotes is matched as a phrase. Matches are ranked with BM25.
+        An empty query matches every note, in the order they were added.
+        Results are cached until the notes change.
+
+        Args:
+            query (str): The query.
+            limit (int, optional): The maximum number of notes returned; all if None.
+            offset (int): The number of best matches to skip.
+
+        Returns:
+            tuple: A list of (note ID, note) pairs and the total number of matches.
+        """
+        key = (self._version, query, limit, offset)
+        cached = self._query_cache.get(key)
+        if cached is None and not query.strip():
+            cached = (list(self.iter_notes(limit, offset)), len(self.notes))
+        elif cached is None:
+            index = self._search_index()
+            ranked, total = index.search(query, limit, offset)
+            found = [(note_id, self.notes[note_id]) for score, note_id in ranked]
+            cached = (found, total)
+            self._query_cache.put(key, cached)
+        return list(cached[0]), cached[1]
+
+    def find_notes_command(self, search_text, limit=None, offset=0):
+        """
+        Finds the notes matching a query, best matches first.
+
+        Args:
+            search_text (str): The query, see search.
+            limit (int, optional): The maximum number of notes returned; all if None.
+            offset (int): The number of best matches to skip.
+
+        Returns:
+            str: The IDs of the matching notes with highlighted snippets, if any.
+        """
+        found_notes, total = self.search(search_text, limit, offset)
         if found_notes:
-            return "\n".join(found_notes)
+            return "\n".join(self.format_found(found_notes, search_text))
         else:
             return "No matching notes found."
+
+    def format_found(self, found_notes, search_text):
+        """
+        Formats found notes as their IDs followed by snippets with the query terms highlighted.
+
+        Args:
+            found_notes (list of tuple): Pairs of note ID and note, as returned by search.
+            search_text (str): The query.
+
+        Returns:
+            list of str: One line per note.
+        """
+        index = self._search_index()
+        return [f"{note_id}: {index.highlight(self.text_of(note), search_text)}" for note_id, note in found_notes]
+
+    def add_tags(self, note_id, tags):
+        """
+        Adds tags to a note.
+
+        Args:
+            note_id (int): The ID of the note.
+            tags (list of str): The tags, with or without a leading "#".
+
+        Returns:
+            str: A message indicating whether the tags were added.
+
+        Raises:
+            ValueError: If a tag is not a valid tag.
+        """
+        tags = [normalize_tag(tag) for tag in tags]
+        with self._save_service.lock:
+            note = self.notes.get(note_id)
+            if note is None:
+                return CommandError("Note not found.")
+            note.add_tags(tags)
+            self._save_changes([("set", note_id, note)])
+            return "Tags added."
+
+    def remove_tags(self, note_id, tags):
+        """
+        Removes tags from a note.
+
+        Args:
+            note_id (int): The ID of the note.
+            tags (list of str): The tags, with or without a leading "#".
+
+        Returns:
+            str: A message indicating whether the tags were removed.
+
+        Raises:
+            ValueError: If a tag is not a valid tag.
+        """
+        tags = [normalize_tag(tag) for tag in tags]
+        with self._save_service.lock:
+            note = self.notes.get(note_id)
+            if note is None:
+                return CommandError("Note not found.")
+            note.remove_tags(tags)
+            self._save_changes([("set", note_id, note)])
+            return "Tags removed."
+
+    def find_by_tags(self, expression, limit=None, offset=0):
+        """
+        Finds one page of the notes matching a boolean tag expression, oldest first.
+
+        Args:
+            expression (str): The expression, e.g. "work and urgent not done".
+            limit (int, optional): The maximum number of notes returned; all if None.
+            offset (int): The number of matches to skip.
+
+        Returns:
+            tuple: A list of (note ID, note) pairs and the total number of matches.
+
+        Raises:
+            ValueError: If the expression is malformed.
+        """
+        note_ids = self._tag_index().query(expression)
+        stop = None if limit is None else offset + limit
+        return [(note_id, self.notes[note_id]) for note_id in note_ids[offset:stop]], len(note_ids)
+
+    def tag_counts(self):
+        """
+        Counts the notes of every tag.
+
+        Returns:
+            list of tuple: Pairs of tag and note count, most used first.
+        """
+        return self._tag_index().counts()
+
+    def complete_tag(self, prefix):
+        """
+        Finds the tags starting with a prefix, for autocompletion.
+
+        Args:
+            prefix (str): The beginning of a tag.
+
+        Returns:
+            list of str: The matching tags, sorted.
+        """
+        return self._tag_index().complete(prefix)
@@ -1,4 +1,5 @@
 from objects.Field import Field
+from servises.ValidationService import validate_phone
 
 class Phone(Field):
     """
@@ -8,6 +9,8 @@ class Phone(Field):
         __init__: Initializes a Phone instance with a value.
         validate: Validates the phone number format.
     """
+    __slots__ = ()
+
     def __init__(self, value):
         """
         Initializes a Phone instance with a value.
@@ -25,5 +28,4 @@ class Phone(Field):
         Raises:
             ValueError: If the phone number format is invalid.
         """
-        if not self.value.isdigit() or len(self.value) != 10:
-            raise ValueError("Phone number must consist of 10 digits.")
+        validate_phone(self.value)
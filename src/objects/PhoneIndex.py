@@ -0,0 +1,181 @@
+from bisect import bisect_left, insort
+from objects.TrigramIndex import TrigramIndex
+
+
+class PhoneIndex:
+    """
+    Reverse index from phone numbers to the contacts they belong to.
+
+    Exact lookups use a hash map. Prefix lookups bisect a sorted array of
+    the numbers and suffix lookups a sorted array of the reversed numbers,
+    both returning a contiguous range. Infix lookups intersect digit
+    trigram postings and verify the candidates.
+
+    Methods:
+        add: Indexes (or re-indexes) the phone numbers of a contact.
+        remove: Removes a contact from the index.
+        find: Returns the names of the contacts with matching phone numbers.
+        duplicates: Returns the phone numbers shared by more than one contact.
+        verify: Compares the index with the phone numbers it should hold.
+    """
+    modes = ("exact", "prefix", "suffix", "infix")
+
+    def __init__(self):
+        """Initializes an empty PhoneIndex."""
+        self._owners = {}
+        self._phones = {}
+        self._sorted = []
+        self._reversed = []
+        self._grams = TrigramIndex()
+
+    @classmethod
+    def build(cls, contacts):
+        """
+        Builds an index in one pass, sorting the number arrays once at the end.
+
+        Args:
+            contacts (iterable of tuple): Pairs of contact name and phone numbers.
+
+        Returns:
+            PhoneIndex: The index.
+        """
+        index = cls()
+        for name, phones in contacts:
+            phones = tuple(dict.fromkeys(phones))
+            index._phones[name] = phones
+            for phone in phones:
+                owners = index._owners.get(phone)
+                if owners is None:
+                    owners = index._owners[phone] = set()
+                    index._grams.add(phone, [phone])
+                owners.add(name)
+        index._sorted = sorted(index._owners)
+        index._reversed = sorted(phone[::-1] for phone in index._owners)
+        return index
+
+    def add(self, name, phones):
+        """
+        Indexes the phone numbers of a contact, replacing what was indexed for it before.
+
+        Args:
+            name (str): The name of the contact.
+            phones (iterable of str): The phone numbers of the contact.
+        """
+        self.remove(name)
+        phones = tuple(dict.fromkeys(phones))
+        self._phones[name] = phones
+        for phone in phones:
+            owners = self._owners.get(phone)
+            if owners is None:
+                owners = self._owners[phone] = set()
+                insort(self._sorted, phone)
+                insort(self._reversed, phone[::-1])
+                self._grams.add(phone, [phone])
+            owners.add(name)
+
+    def remove(self, name):
+        """
+        Removes a contact from the index.
+
+        Args:
+            name (str): The name of the contact.
+        """
+        for phone in self._phones.pop(name, ()):
+            owners = self._owners[phone]
+            owners.discard(name)
+            if not owners:
+                del self._owners[phone]
+                del self._sorted[bisect_left(self._sorted, phone)]
+                del self._reversed[bisect_left(self._reversed, phone[::-1])]
+                self._grams.remove(phone)
+
+    def owners(self, phone):
+        """
+        Returns the names of the contacts with exactly this phone number.
+
+        Args:
+            phone (str): The phone number.
+
+        Returns:
+            set of str: The names of the owners.
+        """
+        return set(self._owners.get(phone, ()))
+
+    def find(self, digits, mode="infix"):
+        """
+        Returns the names of the contacts with a phone number matching the digits.
+
+        Args:
+            digits (str): The digits to look for.
+            mode (str): "exact", "prefix", "suffix" or "infix".
+
+        Returns:
+            set of str: The names of the matching contacts.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode == "exact":
+            phones = [digits] if digits in self._owners else []
+        elif mode == "prefix":
+            phones = self._range(self._sorted, digits)
+        elif mode == "suffix":
+            phones = [phone[::-1] for phone in self._range(self._reversed, digits[::-1])]
+        elif mode == "infix":
+            candidates = self._grams.candidates(digits)
+            if candidates is None:
+                candidates = self._owners
+            phones = [phone for phone in candidates if digits in phone]
+        else:
+            raise ValueError(f"Unknown phone search mode: {mode}. Use one of: {', '.join(self.modes)}.")
+        names = set()
+        for phone in phones:
+            names |= self._owners[phone]
+        return names
+
+    def duplicates(self):
+        """
+        Returns the phone numbers shared by more than one contact.
+
+        Returns:
+            list of tuple: Pairs of phone number and the sorted names of its contacts, ordered by number.
+        """
+        return sorted((phone, sorted(owners)) for phone, owners in self._owners.items() if len(owners) > 1)
+
+    def verify(self, contacts):
+        """
+        Compares the index with the phone numbers it should hold.
+
+        Args:
+            contacts (iterable of tuple): Pairs of contact name and phone numbers, for every contact.
+
+        Returns:
+            list of str: The differences found; empty if the index is consistent.
+        """
+        expected = PhoneIndex.build(contacts)
+        problems = []
+        for name in sorted(set(expected._phones) | set(self._phones)):
+            if set(expected._phones.get(name, ())) != set(self._phones.get(name, ())):
+                problems.append(f"{name}: indexed {sorted(self._phones.get(name, ()))}, "
+                                f"expected {sorted(expected._phones.get(name, ()))}")
+        for phone in sorted(set(expected._owners) | set(self._owners)):
+            if expected._owners.get(phone, set()) != self._owners.get(phone, set()):
+                problems.append(f"{phone}: owners {sorted(self._owners.get(phone, ()))}, "
+                                f"expected {sorted(expected._owners.get(phone, ()))}")
+        if self._sorted != expected._sorted or self._reversed != expected._reversed:
+            problems.append("sorted phone arrays differ from the indexed numbers")
+        return problems
+
+    @staticmethod
+    def _range(values, prefix):
+        """
+        Returns the values of a sorted list that start with a prefix.
+
+        Args:
+            values (list of str): The sorted values.
+            prefix (str): The prefix.
+
+        Returns:
+            list of str: The matching values.
+        """
+        return values[bisect_left(values, prefix):bisect_left(values, prefix + "\U0010ffff")]
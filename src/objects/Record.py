@@ -8,9 +8,18 @@ class Record:
     """
     Represents a contact record.
 
+    To keep large books small in memory, a record holds plain values in
+    __slots__: strings, a tuple of phone numbers and the birthday ordinal.
+    The name, phones, birthday, address and email attributes return Field
+    objects built from those values on access and accept Field objects
+    when assigned. Records pickled with the former __dict__ layout still load.
+
+    The text built by get_details is cached until a field of the record changes.
+
     Attributes:
         name (Name): The name of the contact.
         phones (list of Phone): List of phone numbers associated with the contact.
+        phone_numbers (tuple of str): The phone numbers as plain strings.
         birthday (Birthday): The birthday of the contact.
         address (Address): The address of the contact.
         email (Email): The email address of the contact.
@@ -25,7 +34,12 @@ class Record:
         remove_comment: Removes the comment or note from the contact.
         show_comment: Retrieves the comment or note of the contact.
         get_details: Retrieves the details of the contact as a formatted string.
+        get_summary: Retrieves the contact as a single line.
+        as_row: Returns the searchable fields of the contact as plain values.
+        trusted: Creates a record from values that were already validated.
     """
+    __slots__ = ("_name", "_phones", "_birthday", "_address", "_email", "_comment", "_details")
+
     def __init__(self, name, phones=None, birthday=None, address=None, email=None):
         """
         Initializes a Record instance.
@@ -37,51 +51,167 @@ class Record:
             address (str, optional): The address of the contact.
             email (str, optional): The email address of the contact.
         """
-        self.name = Name(name)
-        self.phones = [Phone(phone) for phone in phones] if phones else []
-        self.birthday = Birthday(birthday) if birthday else None
-        self.address = Address(address) if address else None
-        self.email = Email(email) if email else None
-        self.comment = ""
+        self._name = name
+        self._phones = tuple(Phone(phone).value for phone in phones) if phones else ()
+        self._birthday = Birthday(birthday).ordinal if birthday else None
+        self._address = address or None
+        self._email = Email(email).value if email else None
+        self._comment = ""
+        self._details = None
+
+    @classmethod
+    def trusted(cls, name, phones=(), birthday=None, address=None, email=None, comment=""):
+        """
+        Creates a record from values that were already validated, skipping validation.
+
+        Args:
+            name (str): The name of the contact.
+            phones (tuple of str): The phone numbers.
+            birthday (int, optional): The ordinal of the birthday date.
+            address (str, optional): The address.
+            email (str, optional): The email address.
+            comment (str): The comment.
+
+        Returns:
+            Record: The record.
+        """
+        record = cls.__new__(cls)
+        record.__setstate__((name, tuple(phones), birthday, address, email, comment))
+        return record
+
+    def __getstate__(self):
+        return self._name, self._phones, self._birthday, self._address, self._email, self.comment
+
+    def __setstate__(self, state):
+        self._details = None
+        if isinstance(state, dict):
+            self.name = state["name"]
+            self.phones = state.get("phones", [])
+            self.birthday = state.get("birthday")
+            self.address = state.get("address")
+            self.email = state.get("email")
+            self.comment = state.get("comment", "")
+        else:
+            self._name, self._phones, self._birthday, self._address, self._email, self._comment = state
+
+    @property
+    def name(self):
+        return Name.trusted(self._name)
+
+    @name.setter
+    def name(self, name):
+        self._name = name.value
+        self._details = None
+
+    @property
+    def phones(self):
+        return [Phone.trusted(phone) for phone in self._phones]
+
+    @phones.setter
+    def phones(self, phones):
+        self._phones = tuple(phone.value for phone in phones)
+        self._details = None
+
+    @property
+    def phone_numbers(self):
+        return self._phones
+
+    def as_row(self):
+        """
+        Returns the searchable fields of the contact as plain values.
+
+        Returns:
+            tuple: The name, phone numbers, address, email and birthday ordinal (None if not set).
+        """
+        return self._name, self._phones, self._address, self._email, self._birthday
+
+    @property
+    def birthday(self):
+        return None if self._birthday is None else Birthday.from_ordinal(self._birthday)
+
+    @birthday.setter
+    def birthday(self, birthday):
+        self._birthday = None if birthday is None else birthday.ordinal
+        self._details = None
+
+    @property
+    def address(self):
+        return None if self._address is None else Address.trusted(self._address)
+
+    @address.setter
+    def address(self, address):
+        self._address = None if address is None else address.value
+        self._details = None
+
+    @property
+    def email(self):
+        return None if self._email is None else Email.trusted(self._email)
+
+    @email.setter
+    def email(self, email):
+        self._email = None if email is None else email.value
+        self._details = None
+
+    @property
+    def comment(self):
+        return self._comment
+
+    @comment.setter
+    def comment(self, comment):
+        self._comment = comment
+        self._details = None
 
     def add_phone(self, phone):
         """
         Adds a new phone number to the contact.
 
+        The address book's indexes only see the change once the record is saved
+        back; AddressBook.add_phone does both and checks uniqueness.
+
         Args:
             phone (str): The phone number to add.
 
         Raises:
-            ValueError: If the phone number already exists for the contact.
+            ValueError: If the phone number is invalid or already exists for the contact.
         """
-        if any(phone.value == p.value for p in self.phones):
+        if phone in self._phones:
             raise ValueError("Phone number already exists for this contact")
-        self.phones.append(Phone(phone))
+        self._phones += (Phone(phone).value,)
+        self._details = None
 
     def remove_phone(self, phone):
         """
         Removes a phone number from the contact.
 
+        AddressBook.remove_phone also re-indexes the contact.
+
         Args:
             phone (str): The phone number to remove.
         """
-        self.phones = [p for p in self.phones if p.value != phone]
+        self._phones = tuple(p for p in self._phones if p != phone)
+        self._details = None
 
     def edit_phone(self, old_phone, new_phone):
         """
         Edits an existing phone number of the contact.
 
+        AddressBook.edit_phone also checks uniqueness and re-indexes the contact.
+
         Args:
             old_phone (str): The current phone number to be edited.
             new_phone (str): The new phone number.
 
         Returns:
             str: Confirmation message indicating the phone number update status.
+
+        Raises:
+            ValueError: If the new phone number is invalid.
         """
-        for phone in self.phones:
-            if phone.value == old_phone:
-                phone.value = new_phone
-                return "Phone number updated."
+        new_phone = Phone(new_phone).value
+        if old_phone in self._phones:
+            self._phones = tuple(new_phone if p == old_phone else p for p in self._phones)
+            self._details = None
+            return "Phone number updated."
         return "Phone not found."
 
     def add_birthday(self, birthday):
@@ -123,11 +253,22 @@ class Record:
         Returns:
             str: The formatted details of the contact.
         """
-        details = f"Name: {self.name.value}\n"
-        details += f"Phone: {', '.join([p.value for p in self.phones]) if self.phones else 'No phone number.'}\n"
-        details += f"Address: {self.address.value if self.address else 'No address.'}\n"
-        details += f"Email: {self.email.value if self.email else 'No email.'}\n"
-        details += f"Birthday: {self.birthday.value.strftime('%d.%m.%Y') if self.birthday else 'Not provided'}\n"
-        details += f"Comment: {self.comment}"
-            
-        return details
+        if self._details is None:
+            birthday = Birthday.format_ordinal(self._birthday) if self._birthday else 'Not provided'
+            self._details = (f"Name: {self._name}\n"
+                             f"Phone: {', '.join(self._phones) if self._phones else 'No phone number.'}\n"
+                             f"Address: {self._address if self._address else 'No address.'}\n"
+                             f"Email: {self._email if self._email else 'No email.'}\n"
+                             f"Birthday: {birthday}\n"
+                             f"Comment: {self._comment}")
+        return self._details
+
+    def get_summary(self):
+        """
+        Retrieves the contact as a single line: name, phones, email, birthday and address.
+
+        Returns:
+            str: The contact on one line, with "-" for missing fields.
+        """
+        birthday = Birthday.format_ordinal(self._birthday) if self._birthday else "-"
+        return f"{self._name} | {', '.join(self._phones) or '-'} | {self._email or '-'} | {birthday} | {self._address or '-'}"
@@ -0,0 +1,187 @@
+import re
+
+TAG = re.compile(r"^\w[\w-]*$")
+QUERY_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+KEYWORDS = ("and", "or", "not")
+
+
+def normalize_tag(tag):
+    """
+    Validates a tag and returns it in lower case.
+
+    Args:
+        tag (str): The tag, optionally written with a leading "#".
+
+    Returns:
+        str: The tag.
+
+    Raises:
+        ValueError: If the tag is not a word or is a query keyword.
+    """
+    tag = tag.lstrip("#").lower()
+    if not TAG.match(tag) or tag in KEYWORDS:
+        raise ValueError(f"Invalid tag: {tag!r}. Tags are words like work or follow-up.")
+    return tag
+
+
+class TagIndex:
+    """
+    Index from tags to the IDs of the notes carrying them, as bitmaps.
+
+    Each tag maps to a Python int whose bit n is set if note n has the tag,
+    so boolean tag expressions are evaluated with &, | and & ~ on whole
+    bitmaps instead of scanning notes. Note IDs are allocated densely, which
+    keeps the bitmaps compact. Tag counts are population counts.
+
+    Methods:
+        add: Indexes (or re-indexes) the tags of a note.
+        remove: Removes a note from the index.
+        query: Returns the IDs of the notes matching a tag expression.
+        counts: Returns the number of notes per tag.
+        complete: Returns the tags starting with a prefix.
+    """
+    def __init__(self):
+        """Initializes an empty TagIndex."""
+        self._bitmaps = {}
+        self._tags = {}
+        self._all = 0
+
+    def add(self, note_id, tags):
+        """
+        Indexes the tags of a note, replacing what was indexed for it before.
+
+        Args:
+            note_id (int): The ID of the note.
+            tags (iterable of str): The tags of the note.
+        """
+        self.remove(note_id)
+        bit = 1 << note_id
+        tags = frozenset(tags)
+        for tag in tags:
+            self._bitmaps[tag] = self._bitmaps.get(tag, 0) | bit
+        self._tags[note_id] = tags
+        self._all |= bit
+
+    def remove(self, note_id):
+        """
+        Removes a note from the index.
+
+        Args:
+            note_id (int): The ID of the note.
+        """
+        tags = self._tags.pop(note_id, None)
+        if tags is None:
+            return
+        mask = ~(1 << note_id)
+        for tag in tags:
+            bitmap = self._bitmaps[tag] & mask
+            if bitmap:
+                self._bitmaps[tag] = bitmap
+            else:
+                del self._bitmaps[tag]
+        self._all &= mask
+
+    def query(self, expression):
+        """
+        Finds the notes matching a boolean tag expression.
+
+        Tags next to each other are AND-ed; "and", "or", "not" and
+        parentheses work as usual, e.g. "work and urgent not done" or
+        "(home or garden) not done". NOT binds tightest, OR loosest.
+
+        Args:
+            expression (str): The tag expression.
+
+        Returns:
+            list of int: The IDs of the matching notes, ascending.
+
+        Raises:
+            ValueError: If the expression is malformed.
+        """
+        tokens = [token.lower() for token in QUERY_TOKEN.findall(expression)]
+        if not tokens:
+            raise ValueError("The tag expression is empty.")
+        bitmap, position = self._parse_or(tokens, 0)
+        if position != len(tokens):
+            raise ValueError(f"Unexpected {tokens[position]!r} in the tag expression.")
+        return self._ids(bitmap)
+
+    def _parse_or(self, tokens, position):
+        """Parses alternatives separated by "or"; returns the bitmap and the next position."""
+        bitmap, position = self._parse_and(tokens, position)
+        while position < len(tokens) and tokens[position] == "or":
+            other, position = self._parse_and(tokens, position + 1)
+            bitmap |= other
+        return bitmap, position
+
+    def _parse_and(self, tokens, position):
+        """Parses factors joined by "and" or by nothing; returns the bitmap and the next position."""
+        bitmap, position = self._parse_not(tokens, position)
+        while position < len(tokens) and tokens[position] not in ("or", ")"):
+            if tokens[position] == "and":
+                position += 1
+            other, position = self._parse_not(tokens, position)
+            bitmap &= other
+        return bitmap, position
+
+    def _parse_not(self, tokens, position):
+        """Parses a tag, a negation or a parenthesized expression; returns the bitmap and the next position."""
+        if position >= len(tokens):
+            raise ValueError("The tag expression ends too early.")
+        token = tokens[position]
+        if token == "not":
+            bitmap, position = self._parse_not(tokens, position + 1)
+            return self._all & ~bitmap, position
+        if token == "(":
+            bitmap, position = self._parse_or(tokens, position + 1)
+            if position >= len(tokens) or tokens[position] != ")":
+                raise ValueError("Missing ')' in the tag expression.")
+            return bitmap, position + 1
+        if token in ("and", "or", ")"):
+            raise ValueError(f"Unexpected {token!r} in the tag expression.")
+        return self._bitmaps.get(normalize_tag(token), 0), position + 1
+
+    @staticmethod
+    def _ids(bitmap):
+        """
+        Lists the set bits of a bitmap.
+
+        Args:
+            bitmap (int): The bitmap.
+
+        Returns:
+            list of int: The positions of the set bits, ascending.
+        """
+        bits = bin(bitmap)[:1:-1]
+        ids = []
+        position = bits.find("1")
+        while position >= 0:
+            ids.append(position)
+            position = bits.find("1", position + 1)
+        return ids
+
+    def counts(self):
+        """
+        Counts the notes of every tag.
+
+        Returns:
+            list of tuple: Pairs of tag and note count, most used first.
+        """
+        counts = [(tag, bin(bitmap).count("1")) for tag, bitmap in self._bitmaps.items()]
+        return sorted(counts, key=lambda item: (-item[1], item[0]))
+
+    def complete(self, prefix):
+        """
+        Finds the tags starting with a prefix.
+
+        Args:
+            prefix (str): The beginning of a tag.
+
+        Returns:
+            list of str: The matching tags, sorted.
+        """
+        prefix = prefix.lstrip("#").lower()
+        return sorted(tag for tag in self._bitmaps if tag.startswith(prefix))
+
+    def __len__(self):
+        return len(self._bitmaps)
@@ -0,0 +1,102 @@
+class TrigramIndex:
+    """
+    Inverted index from lower-cased trigrams to the keys whose texts contain them.
+
+    A key whose texts contain a substring also contains every trigram of
+    that substring, so intersecting the postings of the query trigrams
+    gives a small superset of the matching keys. Callers verify the
+    candidates with the exact substring test.
+
+    Methods:
+        add: Indexes (or re-indexes) the texts of a key.
+        remove: Removes a key from the index.
+        candidates: Returns the keys that may contain a substring.
+    """
+    size = 3
+
+    def __init__(self):
+        """Initializes an empty TrigramIndex."""
+        self._postings = {}
+        self._grams = {}
+
+    @classmethod
+    def grams(cls, text):
+        """
+        Returns the trigrams of a text.
+
+        Args:
+            text (str): The text, already lower-cased.
+
+        Returns:
+            set of str: The trigrams.
+        """
+        return {text[i:i + cls.size] for i in range(len(text) - cls.size + 1)}
+
+    def add(self, key, texts):
+        """
+        Indexes the texts of a key, replacing what was indexed for it before.
+
+        Args:
+            key (str): The key, e.g. a contact name.
+            texts (iterable of str): The texts to index.
+        """
+        size = self.size
+        grams = frozenset(text[i:i + size] for text in map(str.lower, texts) for i in range(len(text) - size + 1))
+        old = self._grams.get(key)
+        if old is not None:
+            for gram in old - grams:
+                self._discard(gram, key)
+            new = grams - old
+        else:
+            new = grams
+        postings = self._postings
+        for gram in new:
+            keys = postings.get(gram)
+            if keys is None:
+                postings[gram] = {key}
+            else:
+                keys.add(key)
+        self._grams[key] = grams
+
+    def remove(self, key):
+        """
+        Removes a key from the index.
+
+        Args:
+            key (str): The key to remove.
+        """
+        for gram in self._grams.pop(key, ()):
+            self._discard(gram, key)
+
+    def _discard(self, gram, key):
+        """Removes a key from the postings of a trigram, dropping empty postings."""
+        postings = self._postings.get(gram)
+        if postings is not None:
+            postings.discard(key)
+            if not postings:
+                del self._postings[gram]
+
+    def candidates(self, term):
+        """
+        Returns the keys whose texts may contain a substring.
+
+        Args:
+            term (str): The substring to look for.
+
+        Returns:
+            set of str or None: The candidate keys, or None if the term is shorter
+            than a trigram and every key has to be checked.
+        """
+        grams = self.grams(term.lower())
+        if not grams:
+            return None
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for other in postings[1:]:
+            if not result:
+                break
+            result &= other
+        return result
+
+    def __len__(self):
+        return len(self._grams)
@@ -0,0 +1,115 @@
+import os
+import os.path
+import zlib
+from servises.LRUCache import LRUCache
+
+
+class BlobStore:
+    """
+    Append-only store of zlib-compressed texts in chunk files.
+
+    Every text is compressed on its own and appended to the current chunk
+    file; a new chunk is started once the current one reaches chunk_size.
+    A stored text is addressed by a (chunk, offset, length) reference that
+    the caller keeps instead of the text. Decompressed texts are kept in a
+    small LRU cache.
+
+    Replaced or removed texts are not reclaimed; the chunks only grow.
+
+    Attributes:
+        directory (str): The directory the chunk files are kept in.
+        name (str): The prefix of the chunk file names.
+        threshold (int): Texts longer than this are worth storing here; 0 stores none.
+        chunk_size (int): The size in bytes after which a new chunk file is started.
+    """
+    def __init__(self, directory="saves", name="notes", threshold=4096, chunk_size=4 * 1024 * 1024, cache_size=32):
+        """
+        Initializes a BlobStore instance.
+
+        Args:
+            directory (str): The directory the chunk files are kept in.
+            name (str): The prefix of the chunk file names.
+            threshold (int): Texts longer than this are worth storing here; 0 stores none.
+            chunk_size (int): The size in bytes after which a new chunk file is started.
+            cache_size (int): The maximum number of decompressed texts kept in memory.
+        """
+        self.directory = directory
+        self.name = name
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self._cache = LRUCache(cache_size)
+        self._chunk = 0
+        while os.path.isfile(self._path(self._chunk + 1)):
+            self._chunk += 1
+
+    def _path(self, chunk):
+        """
+        Builds the path of a chunk file.
+
+        Args:
+            chunk (int): The number of the chunk.
+
+        Returns:
+            str: The path of the chunk file.
+        """
+        return os.path.join(self.directory, f"{self.name}.bodies-{chunk:03d}")
+
+    def accepts(self, text):
+        """
+        Checks whether a text is long enough to be stored compressed.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            bool: True if the text should be stored here.
+        """
+        return 0 < self.threshold < len(text)
+
+    def put(self, text):
+        """
+        Compresses a text and appends it to the current chunk.
+
+        The chunk is synced before the reference is returned, so a change
+        that refers to the text is never saved ahead of the text itself.
+
+        Args:
+            text (str): The text to store.
+
+        Returns:
+            tuple: The (chunk, offset, length) reference of the stored text.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(self._chunk)
+        if os.path.isfile(path) and os.path.getsize(path) >= self.chunk_size:
+            self._chunk += 1
+            path = self._path(self._chunk)
+        data = zlib.compress(text.encode("utf-8"), 6)
+        with open(path, "ab") as handle:
+            offset = handle.tell()
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        ref = (self._chunk, offset, len(data))
+        self._cache.put(ref, text)
+        return ref
+
+    def get(self, ref):
+        """
+        Reads and decompresses a stored text.
+
+        Args:
+            ref (tuple): The (chunk, offset, length) reference returned by put.
+
+        Returns:
+            str: The text.
+        """
+        ref = tuple(ref)
+        text = self._cache.get(ref)
+        if text is None:
+            chunk, offset, length = ref
+            with open(self._path(chunk), "rb") as handle:
+                handle.seek(offset)
+                text = zlib.decompress(handle.read(length)).decode("utf-8")
+            self._cache.put(ref, text)
+        return text
@@ -0,0 +1,452 @@
+import os.path
+from array import array
+from collections.abc import MutableMapping
+from objects.Birthday import Birthday
+from objects.Record import Record
+from servises.PickleStorage import PickleStorage
+
+PHONE_LENGTH_SHIFT = 56
+PHONE_DIGITS_MASK = (1 << PHONE_LENGTH_SHIFT) - 1
+MAX_PHONE_DIGITS = 16
+COMPACT_MIN_GARBAGE = 1024
+
+
+def pack_phone(phone):
+    """
+    Packs a phone number into an int: the digit count in the top byte, the number below it.
+
+    Keeping the digit count preserves leading zeros.
+
+    Args:
+        phone (str): The phone number.
+
+    Returns:
+        int: The packed phone number.
+
+    Raises:
+        ValueError: If the phone number is not a string of at most 16 digits.
+    """
+    if not phone.isdigit() or len(phone) > MAX_PHONE_DIGITS:
+        raise ValueError(f"Phone number can't be stored in columns: {phone}")
+    return len(phone) << PHONE_LENGTH_SHIFT | int(phone)
+
+
+def unpack_phone(packed):
+    """
+    Unpacks a phone number packed by pack_phone.
+
+    Args:
+        packed (int): The packed phone number.
+
+    Returns:
+        str: The phone number.
+    """
+    return str(packed & PHONE_DIGITS_MASK).zfill(packed >> PHONE_LENGTH_SHIFT)
+
+
+class StringDictionary:
+    """
+    Dictionary encoding of repeated strings.
+
+    Every distinct string is kept once and referred to by its code; code 0
+    stands for None.
+
+    Attributes:
+        values (list): The strings by code.
+    """
+    def __init__(self, values=None):
+        """
+        Initializes a StringDictionary instance.
+
+        Args:
+            values (list, optional): The strings by code, with None at code 0.
+        """
+        self.values = values if values is not None else [None]
+        self._codes = {value: code for code, value in enumerate(self.values) if code}
+
+    def encode(self, value):
+        """
+        Gets the code of a string, adding the string if it is new.
+
+        Args:
+            value (str or None): The string.
+
+        Returns:
+            int: The code of the string.
+        """
+        if value is None:
+            return 0
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+
+class ColumnarRecords(MutableMapping):
+    """
+    Dict-like store of contacts kept column by column.
+
+    Each field of the contacts is held in its own column, one entry per row:
+    names, email local parts and comments in string lists, addresses and
+    email domains dictionary-encoded as array('I') codes, birthdays as
+    array('i') ordinals (0 for none) and phones as packed ints in one
+    array('Q'), with the start and count of each row's phones in two more
+    arrays. A large book therefore costs a few machine words per contact
+    instead of a Record object graph, and rows() scans the columns directly.
+
+    Looking up a name returns a Record view built from its row; changes to
+    the view are kept only when it is stored back. Rows of removed contacts
+    and replaced phones stay in the columns until enough of them pile up,
+    and are then compacted away.
+    """
+    def __init__(self, records=None):
+        """
+        Initializes a ColumnarRecords instance.
+
+        Args:
+            records (iterable of tuple, optional): Pairs of name and record to start with.
+        """
+        self._clear()
+        for name, record in records or ():
+            self[name] = record
+
+    def _clear(self):
+        """Empties all columns."""
+        self._row = {}
+        self._names = []
+        self._addresses = array("I")
+        self._address_values = StringDictionary()
+        self._email_locals = []
+        self._email_domains = array("I")
+        self._domain_values = StringDictionary()
+        self._comments = []
+        self._birthdays = array("i")
+        self._phone_starts = array("I")
+        self._phone_counts = array("H")
+        self._phones = array("Q")
+        self._garbage = 0
+
+    def __len__(self):
+        return len(self._row)
+
+    def __iter__(self):
+        return iter(self._row)
+
+    def __contains__(self, name):
+        return name in self._row
+
+    def __getitem__(self, name):
+        row = self._row[name]
+        record = Record.__new__(Record)
+        record.__setstate__((name, self._phones_of(row), self._birthdays[row] or None,
+                             self._address_values.values[self._addresses[row]], self._email_of(row),
+                             self._comments[row]))
+        return record
+
+    def __setitem__(self, name, record):
+        name, phones, address, email, birthday = record.as_row()
+        packed = [pack_phone(phone) for phone in phones]
+        local, domain = email, None
+        if email is not None and "@" in email:
+            local, domain = email.rsplit("@", 1)
+        row = self._row.get(name)
+        if row is None:
+            self._row[name] = len(self._names)
+            self._names.append(name)
+            self._addresses.append(self._address_values.encode(address))
+            self._email_locals.append(local)
+            self._email_domains.append(self._domain_values.encode(domain))
+            self._comments.append(record.comment)
+            self._birthdays.append(birthday or 0)
+            self._phone_starts.append(len(self._phones))
+            self._phone_counts.append(len(packed))
+            self._phones.extend(packed)
+            return
+        self._addresses[row] = self._address_values.encode(address)
+        self._email_locals[row] = local
+        self._email_domains[row] = self._domain_values.encode(domain)
+        self._comments[row] = record.comment
+        self._birthdays[row] = birthday or 0
+        start, count = self._phone_starts[row], self._phone_counts[row]
+        if len(packed) == count:
+            self._phones[start:start + count] = array("Q", packed)
+        else:
+            self._garbage += count
+            self._phone_starts[row] = len(self._phones)
+            self._phone_counts[row] = len(packed)
+            self._phones.extend(packed)
+            self._compact_if_needed()
+
+    def __delitem__(self, name):
+        row = self._row.pop(name)
+        self._names[row] = None
+        self._email_locals[row] = None
+        self._comments[row] = ""
+        self._garbage += 1 + self._phone_counts[row]
+        self._compact_if_needed()
+
+    def _phones_of(self, row):
+        """
+        Unpacks the phone numbers of a row.
+
+        Args:
+            row (int): The row.
+
+        Returns:
+            tuple of str: The phone numbers.
+        """
+        start = self._phone_starts[row]
+        return tuple(unpack_phone(packed) for packed in self._phones[start:start + self._phone_counts[row]])
+
+    def _email_of(self, row):
+        """
+        Joins the email of a row from its local part and domain.
+
+        Args:
+            row (int): The row.
+
+        Returns:
+            str or None: The email.
+        """
+        local = self._email_locals[row]
+        domain = self._domain_values.values[self._email_domains[row]]
+        return local if domain is None else f"{local}@{domain}"
+
+    def rows(self, names=None):
+        """
+        Scans the columns without building Record objects.
+
+        Rows are kept in insertion order, so a full scan walks the columns
+        side by side and skips the rows of removed contacts.
+
+        Args:
+            names (iterable of str, optional): The names of the rows to read; all rows if None.
+
+        Yields:
+            tuple: The name, phone numbers, address, email and birthday ordinal
+            (None if not set) of each contact, in the order of Record.as_row.
+        """
+        addresses = self._address_values.values
+        domains = self._domain_values.values
+        phones = self._phones
+        if names is None:
+            columns = zip(self._names, self._addresses, self._email_locals, self._email_domains,
+                          self._birthdays, self._phone_starts, self._phone_counts)
+        else:
+            columns = ((name, self._addresses[row], self._email_locals[row], self._email_domains[row],
+                        self._birthdays[row], self._phone_starts[row], self._phone_counts[row])
+                       for name, row in ((name, self._row[name]) for name in names))
+        for name, address, local, domain, birthday, start, count in columns:
+            if name is None:
+                continue
+            yield (name, tuple(map(unpack_phone, phones[start:start + count])), addresses[address],
+                   local if not domain else f"{local}@{domains[domain]}", birthday or None)
+
+    def birthdays(self):
+        """
+        Scans the birthday column.
+
+        Yields:
+            tuple: The name and birthday ordinal of each contact with a birthday.
+        """
+        for name, birthday in zip(self._names, self._birthdays):
+            if name is not None and birthday:
+                yield name, birthday
+
+    def columns(self):
+        """
+        Returns the raw columns for aggregate statistics.
+
+        The columns are returned as they are kept, one item per row,
+        including the rows of removed contacts; they must not be changed.
+
+        Returns:
+            dict: The names ("names", None for a removed contact), the number of
+            phone numbers ("phone_counts"), the address codes ("addresses", 0 for
+            no address), the email local parts ("email_locals", None for no email)
+            and the birthday ordinals ("birthdays", 0 for no birthday).
+        """
+        return {
+            "names": self._names,
+            "phone_counts": self._phone_counts,
+            "addresses": self._addresses,
+            "email_locals": self._email_locals,
+            "birthdays": self._birthdays,
+        }
+
+    def scores(self, search_term, weights, names=None):
+        """
+        Scores contacts against a search term column by column.
+
+        Gives the same scores as AddressBook._match_score, but each distinct
+        address, email domain and birthday is matched once instead of once
+        per contact, and phones are only unpacked for an all-digit term.
+
+        Args:
+            search_term (str): The term to search for.
+            weights (dict): The score of a match in each field, as in AddressBook.search_weights.
+            names (iterable of str, optional): The names of the contacts to score; all contacts if None.
+
+        Yields:
+            tuple: The score and name of each matching contact.
+        """
+        term = search_term.lower()
+        address_matches = [value is not None and term in value.lower() for value in self._address_values.values]
+        domains = self._domain_values.values
+        domain_matches = [value is not None and term in value.lower() for value in domains]
+        phone_term = search_term.isdigit()
+        birthday_matches = {}
+        rows = enumerate(self._names) if names is None else ((self._row[name], name) for name in names)
+        for row, name in rows:
+            if name is None:
+                continue
+            lowered = name.lower()
+            if lowered == term:
+                yield weights["name_exact"], name
+            elif lowered.startswith(term):
+                yield weights["name_prefix"], name
+            elif term in lowered:
+                yield weights["name"], name
+            elif phone_term and any(search_term in phone for phone in self._phones_of(row)):
+                yield weights["phone"], name
+            elif self._email_matches(row, term, domains, domain_matches):
+                yield weights["email"], name
+            elif address_matches[self._addresses[row]]:
+                yield weights["address"], name
+            else:
+                birthday = self._birthdays[row]
+                if not birthday:
+                    continue
+                matches = birthday_matches.get(birthday)
+                if matches is None:
+                    matches = birthday_matches[birthday] = search_term in Birthday.format_ordinal(birthday)
+                if matches:
+                    yield weights["birthday"], name
+
+    def _email_matches(self, row, term, domains, domain_matches):
+        """
+        Checks whether the email of a row contains a lower-cased term.
+
+        Args:
+            row (int): The row.
+            term (str): The lower-cased term.
+            domains (list): The email domains by code.
+            domain_matches (list of bool): Whether each domain contains the term.
+
+        Returns:
+            bool: True if the email contains the term.
+        """
+        local = self._email_locals[row]
+        if local is None:
+            return False
+        domain = self._email_domains[row]
+        if domain_matches[domain] or term in local.lower():
+            return True
+        return bool(domain) and "@" in term and term in f"{local}@{domains[domain]}".lower()
+
+    def _compact_if_needed(self):
+        """Compacts the columns once dead rows and phones make up half of them."""
+        if self._garbage > max(COMPACT_MIN_GARBAGE, (len(self._names) + len(self._phones)) // 2):
+            self.compact()
+
+    def compact(self):
+        """Rewrites the columns without the rows of removed contacts, replaced phones and unused strings."""
+        records = [(name, self[name]) for name in self._row]
+        self._clear()
+        for name, record in records:
+            self[name] = record
+
+    def __getstate__(self):
+        if self._garbage:
+            self.compact()
+        return {
+            "names": self._names,
+            "addresses": self._addresses,
+            "address_values": self._address_values.values,
+            "email_locals": self._email_locals,
+            "email_domains": self._email_domains,
+            "domain_values": self._domain_values.values,
+            "comments": self._comments,
+            "birthdays": self._birthdays,
+            "phone_starts": self._phone_starts,
+            "phone_counts": self._phone_counts,
+            "phones": self._phones,
+        }
+
+    def __setstate__(self, state):
+        self._names = state["names"]
+        self._addresses = state["addresses"]
+        self._address_values = StringDictionary(state["address_values"])
+        self._email_locals = state["email_locals"]
+        self._email_domains = state["email_domains"]
+        self._domain_values = StringDictionary(state["domain_values"])
+        self._comments = state["comments"]
+        self._birthdays = state["birthdays"]
+        self._phone_starts = state["phone_starts"]
+        self._phone_counts = state["phone_counts"]
+        self._phones = state["phones"]
+        self._row = {name: row for row, name in enumerate(self._names)}
+        self._garbage = 0
+
+
+class ColumnarStorage(PickleStorage):
+    """
+    Journaled storage engine that keeps the address book in ColumnarRecords.
+
+    Snapshots and the journal work exactly as in PickleStorage; the columns
+    pickle as a handful of arrays and string lists. The book is kept in its
+    own files, book.columns and book.columns.journal, so the files of the
+    pickle and journal engines are left untouched. A book saved by those
+    engines is converted to columns on first load.
+
+    Attributes:
+        contacts_key (str): The key the address book is saved under.
+    """
+    contacts_key = "book"
+
+    def __init__(self, directory="saves", **kwargs):
+        """
+        Initializes a ColumnarStorage instance.
+
+        Args:
+            directory (str): The directory the save files are kept in.
+            **kwargs: Compaction settings passed to PickleStorage.
+        """
+        super().__init__(directory, journal=True, **kwargs)
+
+    def _snapshot_path(self, key):
+        if key == self.contacts_key:
+            return self._path(key, "columns")
+        return super()._snapshot_path(key)
+
+    def _journal_path(self, key):
+        if key == self.contacts_key:
+            return self._path(key, "columns.journal")
+        return super()._journal_path(key)
+
+    def load(self, key):
+        """
+        Loads the data of a key, converting an old save of the book to columns first.
+
+        Args:
+            key (str): The key or identifier for the data being loaded.
+
+        Returns:
+            Any: ColumnarRecords for the address book (empty if nothing is stored yet),
+            the unpickled data for other keys, or None if nothing is stored.
+        """
+        if key != self.contacts_key:
+            return super().load(key)
+        if not os.path.isfile(self._snapshot_path(key)) and not os.path.isfile(self._journal_path(key)):
+            old = PickleStorage(self.directory, journal=True)
+            data = old.load(key)
+            if data is None:
+                return ColumnarRecords()
+            self._sequences[key] = old._sequences[key]
+            data = ColumnarRecords(data.items())
+            self.save(key, data)
+            return data
+        data = super().load(key)
+        return ColumnarRecords() if data is None else data
@@ -5,20 +5,27 @@ class MyCompleter(Completer):
     """
     Custom completer for command-line input.
 
+    Completes command names, and tags after the tag commands.
+
     Attributes:
         commands (list): List of available commands.
+        complete_tag (callable or None): Returns the tags starting with a prefix.
 
     Methods:
         get_completions: Retrieves completion suggestions for the current input.
     """
-    def __init__(self, commands):
+    tag_commands = ("add-tag", "remove-tag", "find-tag")
+
+    def __init__(self, commands, complete_tag=None):
         """
         Initializes a MyCompleter instance.
 
         Args:
             commands (list): List of available commands.
+            complete_tag (callable, optional): Returns the tags starting with a prefix.
         """
         self.commands = commands
+        self.complete_tag = complete_tag
 
     def get_completions(self, document, complete_event):
         """
@@ -35,4 +42,9 @@ class MyCompleter(Completer):
         if " " not in text:
             for command in self.commands:
                 if command.startswith(text):
-                    yield Completion(command, start_position=-len(text))
\ No newline at end of file
+                    yield Completion(command, start_position=-len(text))
+        elif self.complete_tag and text.split(" ", 1)[0] in self.tag_commands:
+            word = document.get_word_before_cursor(WORD=True)
+            if word:
+                for tag in self.complete_tag(word):
+                    yield Completion(tag, start_position=-len(word))
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections.abc import Mapping
+
+
+def coalesce(data, changes):
+    """
+    Drops changes of a dict that are overwritten by later changes of the same key.
+
+    List changes depend on their order and are returned unchanged. A key
+    that is set and then deleted within one group leaves only its "del",
+    even if the storage never saw the key: whether it existed before the
+    group is not known here, so apply_change ignores deleting a missing key.
+
+    Args:
+        data (dict or list): The data the changes belong to.
+        changes (list of tuple): The pending changes, oldest first.
+
+    Returns:
+        list of tuple: The changes that still need to be written.
+    """
+    if not isinstance(data, Mapping):
+        return changes
+    latest = {}
+    for change in changes:
+        latest.pop(change[1], None)
+        latest[change[1]] = change
+    return list(latest.values())
+
+
+class GroupCommitWriter:
+    """
+    Collects changes and writes them to a storage engine in groups.
+
+    Changes submitted within one time window (or until the batch size is
+    reached) are coalesced and written with a single storage update per key.
+    With a window the writing happens on a background thread; without one,
+    changes are only written by flush.
+
+    Attributes:
+        storage (Storage): The storage engine the changes are written to.
+        window (float or None): Seconds to wait before writing a group, or None to wait for flush.
+        max_batch (int or None): Number of pending changes that forces an immediate write.
+        lock (threading.RLock): Lock held while data is changed or written.
+    """
+    def __init__(self, storage, window=None, max_batch=1000):
+        """
+        Initializes a GroupCommitWriter instance.
+
+        Args:
+            storage (Storage): The storage engine the changes are written to.
+            window (float, optional): Seconds to wait before writing a group.
+                Changes are kept until flush if it is None.
+            max_batch (int, optional): Number of pending changes that forces an
+                immediate write. There is no limit if it is None.
+        """
+        self.storage = storage
+        self.window = window
+        self.max_batch = max_batch
+        self.lock = threading.RLock()
+        self._wakeup = threading.Condition(self.lock)
+        self._pending = {}
+        self._count = 0
+        self._error = None
+        self._closed = False
+        self._thread = None
+        if window is not None:
+            self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, key, data, changes):
+        """
+        Adds changes to the pending group.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data (dict or list): The complete, already changed data.
+            changes (list of tuple): The changes, in the format accepted by apply_change.
+
+        Raises:
+            Exception: The error of a failed background write, if there was one.
+        """
+        with self.lock:
+            self._raise_error()
+            entry = self._pending.setdefault(key, [data, []])
+            entry[0] = data
+            entry[1].extend(changes)
+            self._count += len(changes)
+            if self.max_batch is not None and self._count >= self.max_batch:
+                self._write()
+            else:
+                self._wakeup.notify()
+
+    def flush(self):
+        """
+        Writes all pending changes now.
+
+        Raises:
+            Exception: The error of a failed background write, if there was one.
+        """
+        with self.lock:
+            self._raise_error()
+            self._write()
+
+    def discard(self, key=None):
+        """
+        Drops pending changes without writing them.
+
+        Args:
+            key (str, optional): The key whose changes are dropped; all changes are dropped if it is None.
+        """
+        with self.lock:
+            if key is None:
+                self._pending, self._count = {}, 0
+            elif key in self._pending:
+                self._count -= len(self._pending.pop(key)[1])
+
+    def close(self):
+        """Writes all pending changes and stops the background thread."""
+        with self.lock:
+            self._closed = True
+            self._wakeup.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def _write(self):
+        """
+        Writes the pending changes, one storage update per key. The lock must be held.
+
+        A group is taken out of the pending ones only while it is written; if
+        the storage update fails, the group is put back with the groups not
+        written yet, so a later flush retries all of them.
+        """
+        while self._pending:
+            key = next(iter(self._pending))
+            data, changes = entry = self._pending.pop(key)
+            self._count -= len(changes)
+            try:
+                self.storage.update(key, data, coalesce(data, changes))
+            except BaseException:
+                self._pending = {key: entry, **self._pending}
+                self._count += len(changes)
+                raise
+
+    def _raise_error(self):
+        """Re-raises the error of a failed background write once."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self):
+        """Background loop writing a group once the window after its first change has passed."""
+        with self.lock:
+            while not self._closed:
+                if not self._pending:
+                    self._wakeup.wait()
+                    continue
+                deadline = time.monotonic() + self.window
+                while not self._closed and self._pending and time.monotonic() < deadline:
+                    self._wakeup.wait(deadline - time.monotonic())
+                try:
+                    self._write()
+                except Exception as e:
+                    self._error = e
@@ -0,0 +1,345 @@
+import csv
+import json
+import os
+import os.path
+from collections import deque
+from itertools import islice
+from objects.Record import Record
+from servises.ValidationService import validate_values
+
+FIELDS = ["name", "phones", "birthday", "address", "email", "comment"]
+
+
+def detect_format(path):
+    """
+    Detects the file format from the file extension.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        str: "csv", "vcard" or "jsonl".
+
+    Raises:
+        ValueError: If the extension is not supported.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".vcf", ".vcard"):
+        return "vcard"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError("Unsupported file format. Use .csv, .vcf or .jsonl.")
+
+
+def read_rows(path):
+    """
+    Reads contact rows from a CSV, vCard or JSONL file one at a time.
+
+    Args:
+        path (str): The path of the file.
+
+    Yields:
+        tuple: The line number a row starts at and the row as a dict with the
+        keys name, phones (list of str), birthday, address, email and comment.
+    """
+    readers = {"csv": _read_csv, "vcard": _read_vcard, "jsonl": _read_jsonl}
+    reader = readers[detect_format(path)]
+    with open(path, "r", encoding="utf-8", newline="") as handle:
+        yield from reader(handle)
+
+
+def _read_csv(handle):
+    """Yields the rows of a CSV file with a header line; phones are separated by spaces."""
+    reader = csv.DictReader(handle)
+    for row in reader:
+        row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+        row["phones"] = row.get("phones", "").split()
+        yield reader.line_num, row
+
+
+def _read_jsonl(handle):
+    """Yields the rows of a file with one JSON object per line."""
+    for line_number, line in enumerate(handle, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, {"error": f"Invalid JSON: {e}"}
+            continue
+        error = _jsonl_row_error(row)
+        if error:
+            yield line_number, {"error": error}
+            continue
+        phones = row.get("phones") or []
+        row["phones"] = phones.split() if isinstance(phones, str) else [str(phone) for phone in phones]
+        yield line_number, row
+
+
+def _jsonl_row_error(row):
+    """Returns why a parsed JSONL line is not a usable contact row, or None if it is."""
+    if not isinstance(row, dict):
+        return "Expected a JSON object."
+    for field in FIELDS:
+        value = row.get(field)
+        if field == "phones":
+            if value is not None and not isinstance(value, (str, list)):
+                return "Phones must be a string or a list."
+        elif value is not None and not isinstance(value, str):
+            return f"{field.capitalize()} must be a string."
+    return None
+
+
+def _unescape_vcard(value):
+    """Reverses the escaping of vCard text values."""
+    return (value.replace("\\n", "\n").replace("\\N", "\n")
+            .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def _escape_vcard(value):
+    """Escapes a text value for a vCard line."""
+    return (value.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _split_vcard(value):
+    """Splits a structured vCard value on the semicolons that are not escaped."""
+    parts = [""]
+    escaped = False
+    for char in value:
+        if escaped:
+            parts[-1] += "\\" + char
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == ";":
+            parts.append("")
+        else:
+            parts[-1] += char
+    return parts
+
+
+def _read_vcard(handle):
+    """Yields one row per BEGIN:VCARD ... END:VCARD block, unfolding continuation lines."""
+    row = None
+    start = 0
+    pending = None
+    for line_number, line in enumerate(handle, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending = (pending[0], pending[1] + line[1:])
+            continue
+        if pending is not None:
+            row, start, finished = _vcard_line(pending[1], pending[0], row, start)
+            if finished is not None:
+                yield start, finished
+        pending = (line_number, line)
+    if pending is not None:
+        row, start, finished = _vcard_line(pending[1], pending[0], row, start)
+        if finished is not None:
+            yield start, finished
+
+
+def _vcard_line(line, line_number, row, start):
+    """
+    Applies one unfolded vCard line to the row being read.
+
+    Returns:
+        tuple: The row being read, the line it started at, and the finished row or None.
+    """
+    if ":" not in line:
+        return row, start, None
+    prefix, value = line.split(":", 1)
+    prop = prefix.split(";")[0].split(".")[-1].upper()
+    if prop == "BEGIN" and value.upper() == "VCARD":
+        return {"phones": []}, line_number, None
+    if row is None:
+        return row, start, None
+    if prop == "END" and value.upper() == "VCARD":
+        return None, start, row
+    if prop == "FN":
+        row["name"] = _unescape_vcard(value).strip()
+    elif prop == "TEL":
+        row["phones"].append(value.strip())
+    elif prop == "EMAIL":
+        row["email"] = value.strip()
+    elif prop == "BDAY":
+        digits = value.strip().replace("-", "")
+        if len(digits) == 8 and digits.isdigit():
+            row["birthday"] = f"{digits[6:8]}.{digits[4:6]}.{digits[0:4]}"
+        else:
+            row["birthday"] = value.strip()
+    elif prop == "ADR":
+        parts = [_unescape_vcard(part).strip() for part in _split_vcard(value)]
+        row["address"] = ", ".join(part for part in parts if part)
+    elif prop == "NOTE":
+        row["comment"] = _unescape_vcard(value)
+    return row, start, None
+
+
+def validate_chunk(chunk):
+    """
+    Builds records from a chunk of rows, collecting errors instead of raising.
+
+    The phones, birthdays and emails of the chunk are validated column by
+    column; a row is reported with its first error, in the order the
+    Record constructor checks the fields. A row that is not a dict of
+    strings is reported instead of aborting the chunk. Runs in a worker
+    process during bulk imports.
+
+    Args:
+        chunk (list of tuple): Pairs of line number and row.
+
+    Returns:
+        tuple: A list of (line number, record) pairs for the valid rows and a list of
+        (line number, error message) pairs.
+    """
+    row_errors = {}
+    phone_rows = []
+    columns = {"phone": [], "birthday": [], "email": []}
+    for index, (line_number, row) in enumerate(chunk):
+        try:
+            if row.get("error"):
+                row_errors[index] = row["error"]
+            elif not (row.get("name") or "").strip():
+                row_errors[index] = "Name is missing."
+            phones = list(row.get("phones") or ())
+            birthday, email = row.get("birthday") or None, row.get("email") or None
+        except (ValueError, TypeError, AttributeError) as e:
+            row_errors.setdefault(index, f"Invalid row: {e}")
+            phones, birthday, email = [], None, None
+        for phone in phones:
+            phone_rows.append(index)
+            columns["phone"].append(phone)
+        columns["birthday"].append(birthday)
+        columns["email"].append(email)
+    phones, errors = validate_values("phone", columns["phone"])
+    for position, error in errors:
+        row_errors.setdefault(phone_rows[position], error)
+    optional = {}
+    for kind in ("birthday", "email"):
+        present = [index for index, value in enumerate(columns[kind]) if value is not None]
+        valid, errors = validate_values(kind, [columns[kind][index] for index in present])
+        for position, error in errors:
+            row_errors.setdefault(present[position], error)
+        optional[kind] = dict(zip(present, valid))
+    row_phones = [[] for _ in chunk]
+    for index, phone in zip(phone_rows, phones):
+        row_phones[index].append(phone)
+    records = []
+    for index, (line_number, row) in enumerate(chunk):
+        if index not in row_errors:
+            record = Record.trusted(row["name"].strip(), row_phones[index], optional["birthday"].get(index),
+                                    row.get("address") or None, optional["email"].get(index),
+                                    row.get("comment") or "")
+            records.append((line_number, record))
+    return records, [(chunk[index][0], error) for index, error in sorted(row_errors.items())]
+
+
+def validate_rows(rows, workers=None, chunk_size=1000):
+    """
+    Validates rows in chunks, using a process pool when there is more than one chunk
+    and more than one worker.
+
+    At most two chunks per worker are in flight, so rows are read from the
+    input only as fast as they are validated.
+
+    Args:
+        rows (iterable of tuple): Pairs of line number and row.
+        workers (int, optional): The number of worker processes; defaults to the CPU count.
+            With 0 or 1 everything is validated in the current process.
+        chunk_size (int): The number of rows validated per task.
+
+    Yields:
+        tuple: The (line number, record) pairs and the errors of each chunk, in input order.
+    """
+    rows = iter(rows)
+    chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    first = next(chunks, None)
+    second = next(chunks, None) if first is not None else None
+    if second is None or workers <= 1:
+        for chunk in (first, second):
+            if chunk is not None:
+                yield validate_chunk(chunk)
+        for chunk in chunks:
+            yield validate_chunk(chunk)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque([executor.submit(validate_chunk, first), executor.submit(validate_chunk, second)])
+        for chunk in chunks:
+            in_flight.append(executor.submit(validate_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def record_to_row(record):
+    """
+    Converts a record into a row dict.
+
+    Args:
+        record (Record): The record to convert.
+
+    Returns:
+        dict: The row with the keys of FIELDS.
+    """
+    return {
+        "name": record.name.value,
+        "phones": list(record.phone_numbers),
+        "birthday": record.birthday.str_data if record.birthday else "",
+        "address": record.address.value if record.address else "",
+        "email": record.email.value if record.email else "",
+        "comment": record.comment,
+    }
+
+
+def write_records(records, path):
+    """
+    Streams records to a CSV, vCard or JSONL file.
+
+    Args:
+        records (iterable of Record): The records to export.
+        path (str): The path of the file; the format follows its extension.
+
+    Returns:
+        int: The number of exported records.
+    """
+    file_format = detect_format(path)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        if file_format == "csv":
+            writer = csv.DictWriter(handle, FIELDS)
+            writer.writeheader()
+        for record in records:
+            row = record_to_row(record)
+            if file_format == "csv":
+                row["phones"] = " ".join(row["phones"])
+                writer.writerow(row)
+            elif file_format == "jsonl":
+                handle.write(json.dumps(row, ensure_ascii=False) + "\n")
+            else:
+                handle.write(_vcard(row))
+            count += 1
+    return count
+
+
+def _vcard(row):
+    """Formats a row as a vCard 3.0 block."""
+    lines = ["BEGIN:VCARD", "VERSION:3.0", f"FN:{_escape_vcard(row['name'])}"]
+    lines += [f"TEL:{phone}" for phone in row["phones"]]
+    if row["email"]:
+        lines.append(f"EMAIL:{row['email']}")
+    if row["birthday"]:
+        day, month, year = row["birthday"].split(".")
+        lines.append(f"BDAY:{year}-{month}-{day}")
+    if row["address"]:
+        lines.append(f"ADR:;;{_escape_vcard(row['address'])};;;;")
+    if row["comment"]:
+        lines.append(f"NOTE:{_escape_vcard(row['comment'])}")
+    lines.append("END:VCARD")
+    return "\r\n".join(lines) + "\r\n"
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Bounded mapping that forgets the least recently used entries.
+
+    Attributes:
+        maxsize (int): The maximum number of entries kept.
+    """
+    def __init__(self, maxsize=1024):
+        """
+        Initializes an LRUCache instance.
+
+        Args:
+            maxsize (int): The maximum number of entries kept.
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Returns a cached value and marks it as recently used.
+
+        Args:
+            key: The key of the entry.
+            default: The value returned if the key is not cached.
+
+        Returns:
+            Any: The cached value, or default.
+        """
+        value = self._entries.get(key, default)
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            pass
+        return value
+
+    def put(self, key, value):
+        """
+        Caches a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key: The key of the entry.
+            value: The value to cache.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Removes an entry.
+
+        Args:
+            key: The key of the entry.
+            default: The value returned if the key is not cached.
+
+        Returns:
+            Any: The removed value, or default.
+        """
+        return self._entries.pop(key, default)
+
+    def clear(self):
+        """Removes all entries."""
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
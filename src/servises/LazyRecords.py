@@ -0,0 +1,211 @@
+import threading
+from collections.abc import MutableMapping
+from servises.LRUCache import LRUCache
+
+
+class LazyRecords(MutableMapping):
+    """
+    Base class for dict-like views of contacts that are decoded on access.
+
+    Subclasses only know how to find and decode stored records. A decoded
+    record is kept in a bounded LRU cache; records added or changed since
+    they were stored are kept in an overlay, and removed names in a set of
+    deletions, until the storage engine writes them. Iterating over items
+    or values decodes records one at a time without caching them, so a full
+    scan never holds the whole book in memory.
+
+    The storage engine changes the overlay, the cache and the stored
+    records while it writes, possibly on a background writer thread. Every
+    lookup, and every step of an iteration, therefore holds the lock, which
+    the address book replaces with the lock of its SaveService.
+
+    Subclasses implement _read, _is_stored, _stored_names and _stored_count
+    and may override _stored_items with a faster bulk read.
+
+    Attributes:
+        lock (threading.RLock): Lock held while records are looked up.
+    """
+    def __init__(self, cache_size=1024):
+        """
+        Initializes a LazyRecords instance.
+
+        Args:
+            cache_size (int): The maximum number of decoded records kept in memory.
+        """
+        self._overlay = {}
+        self._deleted = set()
+        self._cache = LRUCache(cache_size)
+        self.lock = threading.RLock()
+
+    def _read(self, name):
+        """
+        Decodes a stored record.
+
+        Args:
+            name (str): The name of the contact.
+
+        Returns:
+            Record or None: The record, or None if it is not stored.
+        """
+        raise NotImplementedError
+
+    def _is_stored(self, name):
+        """
+        Checks whether a contact is stored.
+
+        Args:
+            name (str): The name of the contact.
+
+        Returns:
+            bool: True if the contact is stored.
+        """
+        raise NotImplementedError
+
+    def _stored_names(self):
+        """
+        Iterates over the names of the stored contacts in insertion order.
+
+        Yields:
+            str: The names of the stored contacts.
+        """
+        raise NotImplementedError
+
+    def _stored_count(self):
+        """
+        Counts the stored contacts.
+
+        Returns:
+            int: The number of stored contacts.
+        """
+        raise NotImplementedError
+
+    def _stored_items(self):
+        """
+        Decodes the stored records one at a time.
+
+        Yields:
+            tuple: Pairs of contact name and record.
+        """
+        for name in self._stored_names():
+            yield name, self._read(name)
+
+    def _written(self, names):
+        """
+        Moves records the storage engine has written from the overlay into the cache.
+
+        Args:
+            names (iterable of str): The names of the written contacts.
+        """
+        for name in names:
+            record = self._overlay.pop(name, None)
+            if record is not None:
+                self._cache.put(name, record)
+            self._deleted.discard(name)
+
+    def _locked(self, iterator):
+        """
+        Advances an iterator with the lock held for each step only.
+
+        Args:
+            iterator (iterator): The iterator to advance.
+
+        Yields:
+            Any: The items of the iterator.
+        """
+        while True:
+            with self.lock:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def __getitem__(self, name):
+        with self.lock:
+            if name in self._deleted:
+                raise KeyError(name)
+            record = self._overlay.get(name) or self._cache.get(name)
+            if record is None:
+                record = self._read(name)
+                if record is None:
+                    raise KeyError(name)
+                self._cache.put(name, record)
+            return record
+
+    def __setitem__(self, name, record):
+        self._overlay[name] = record
+        self._cache.pop(name)
+        self._deleted.discard(name)
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self._overlay.pop(name, None)
+        self._cache.pop(name)
+        self._deleted.add(name)
+
+    def __contains__(self, name):
+        with self.lock:
+            if name in self._deleted:
+                return False
+            return name in self._overlay or name in self._cache or self._is_stored(name)
+
+    def __iter__(self):
+        return self._locked(self._names())
+
+    def _added(self):
+        """Lists the names in the overlay that are not stored yet."""
+        return [name for name in self._overlay if not self._is_stored(name)]
+
+    def _names(self):
+        """
+        Iterates over the names; see __iter__.
+
+        The added names are listed up front, as the storage engine may write
+        them between two steps.
+        """
+        added = self._added()
+        for name in self._stored_names():
+            if name not in self._deleted:
+                yield name
+        for name in added:
+            if name not in self._deleted:
+                yield name
+
+    def __len__(self):
+        with self.lock:
+            count = self._stored_count()
+            count += sum(1 for name in self._overlay if not self._is_stored(name))
+            count -= sum(1 for name in self._deleted if self._is_stored(name))
+            return count
+
+    def items(self):
+        """
+        Streams all records without keeping them in memory.
+
+        Yields:
+            tuple: Pairs of contact name and record.
+        """
+        return self._locked(self._items())
+
+    def _items(self):
+        """Iterates over the names and records; see items and _names."""
+        added = self._added()
+        for name, record in self._stored_items():
+            if name in self._deleted:
+                continue
+            yield name, self._overlay.get(name) or self._cache.get(name) or record
+        for name in added:
+            record = self._overlay.get(name) or self._cache.get(name) or self._read(name)
+            if name not in self._deleted and record is not None:
+                yield name, record
+
+    def values(self):
+        """
+        Streams all records without keeping them in memory.
+
+        Yields:
+            Record: The records of the address book.
+        """
+        for name, record in self.items():
+            yield record
@@ -0,0 +1,100 @@
+import os
+import sys
+
+CHUNK_SIZE = 64 * 1024
+
+
+class CommandError(str):
+    """
+    The error message of a command that failed.
+
+    It prints like any other result; batch mode uses the type to count the command as failed.
+    """
+
+
+class StreamedOutput:
+    """
+    Command output that is produced piece by piece instead of as one string.
+
+    The pieces are written as soon as a chunk of them is ready, so long
+    listings start printing at once and never exist as a whole in memory.
+
+    Attributes:
+        pieces (iterable of str): The text pieces, written as they are.
+        pager (bool): Whether the output should go through a pager.
+    """
+    def __init__(self, pieces, pager=False):
+        """
+        Initializes a StreamedOutput instance.
+
+        Args:
+            pieces (iterable of str): The text pieces, written as they are.
+            pager (bool): Whether the output should go through a pager.
+        """
+        self.pieces = pieces
+        self.pager = pager
+
+
+def pager_command():
+    """
+    Gets the pager to use from BOT_PAGER, then PAGER, falling back to "less".
+
+    Returns:
+        list of str: The pager command line.
+    """
+    import shlex
+    return shlex.split(os.environ.get("BOT_PAGER") or os.environ.get("PAGER") or "less")
+
+
+def write_chunks(pieces, stream, chunk_size=CHUNK_SIZE):
+    """
+    Writes text pieces to a stream in chunks of about chunk_size characters.
+
+    Args:
+        pieces (iterable of str): The text pieces.
+        stream (file): The text stream to write to.
+        chunk_size (int): The number of characters collected before a write.
+    """
+    chunk = []
+    size = 0
+    for piece in pieces:
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            stream.write("".join(chunk))
+            stream.flush()
+            chunk = []
+            size = 0
+    chunk.append("\n")
+    stream.write("".join(chunk))
+    stream.flush()
+
+
+def show(result):
+    """
+    Prints the result of a command, streaming it or sending it to a pager if it is a StreamedOutput.
+
+    Falls back to printing when the pager can't be started, and stops
+    quietly when the pager is closed before the output ends.
+
+    Args:
+        result (str or StreamedOutput): The result of the command.
+    """
+    if not isinstance(result, StreamedOutput):
+        print(result)
+        return
+    if result.pager:
+        import subprocess
+        try:
+            pager = subprocess.Popen(pager_command(), stdin=subprocess.PIPE, text=True)
+        except OSError:
+            pager = None
+        if pager is not None:
+            try:
+                write_chunks(result.pieces, pager.stdin)
+                pager.stdin.close()
+            except BrokenPipeError:
+                pass
+            pager.wait()
+            return
+    write_chunks(result.pieces, sys.stdout)
@@ -0,0 +1,263 @@
+import pickle
+import os.path
+from servises.Storage import Storage, apply_change
+
+
+class PickleStorage(Storage):
+    """
+    Storage engine that keeps every key in its own pickle file.
+
+    In journal mode every mutation is appended to a small write-ahead journal
+    next to the snapshot instead of re-pickling the whole data set. Loading
+    replays the journal over the snapshot, and once the journal grows past
+    the compaction threshold it is folded into a new snapshot.
+
+    Methods:
+        save: Saves data to a file using pickle serialization.
+        load: Loads data from a file using pickle deserialization.
+        update: Persists a list of changes made to previously loaded data.
+        compact: Folds the journal of a key into a new snapshot.
+    """
+    def __init__(self, directory="saves", journal=False, compact_ratio=0.5, compact_min_bytes=64 * 1024):
+        """
+        Initializes a PickleStorage instance.
+
+        Args:
+            directory (str): The directory the save files are kept in.
+            journal (bool): Whether mutations are appended to a journal instead of rewriting the snapshot.
+            compact_ratio (float): Journal size, relative to the snapshot size, that triggers compaction.
+            compact_min_bytes (int): Journal size below which compaction never happens.
+        """
+        self.directory = directory
+        self.journal = journal
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self._sequences = {}
+
+    def _path(self, key, extension="pickle"):
+        """
+        Builds the path of a save file.
+
+        Args:
+            key (str): The key or identifier for the data.
+            extension (str): The file extension.
+
+        Returns:
+            str: The path of the file.
+        """
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def save(self, key, data):
+        """
+        Saves data to a file using pickle serialization.
+
+        The file is written to a temporary file first and then renamed, so a
+        crash never leaves a half-written snapshot behind. In journal mode the
+        journal is emptied afterwards because the snapshot now contains it.
+
+        Args:
+            key (str): The key or identifier for the data being saved.
+            data: The data to be saved.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._snapshot_path(key)
+        with open(path + ".tmp", 'wb') as handle:
+            self._write_snapshot(handle, key, data, self._sequences.get(key, 0))
+            handle.flush()
+            os.fsync(handle.fileno())
+        self._release(key, data)
+        os.replace(path + ".tmp", path)
+        if self.journal and os.path.isfile(self._journal_path(key)):
+            os.remove(self._journal_path(key))
+
+    def _snapshot_path(self, key):
+        """
+        Builds the path of the snapshot file of a key.
+
+        Args:
+            key (str): The key or identifier for the data.
+
+        Returns:
+            str: The path of the snapshot.
+        """
+        return self._path(key)
+
+    def _journal_path(self, key):
+        """
+        Builds the path of the journal file of a key.
+
+        Args:
+            key (str): The key or identifier for the data.
+
+        Returns:
+            str: The path of the journal.
+        """
+        return self._path(key, "journal")
+
+    def _release(self, key, data):
+        """
+        Releases what still uses the old snapshot of a key, right before the new one replaces it.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data: The data being saved.
+        """
+
+    def _write_snapshot(self, handle, key, data, sequence):
+        """
+        Writes the snapshot of a key to an open file.
+
+        In journal mode the journal sequence number is pickled after the data,
+        which keeps the file readable by a plain pickle.load.
+
+        Args:
+            handle (file): The binary file to write to.
+            key (str): The key or identifier for the data.
+            data: The data to be saved.
+            sequence (int): The last journal entry contained in the data.
+        """
+        pickle.dump(data, handle)
+        if self.journal:
+            pickle.dump(sequence, handle)
+
+    def _read_snapshot(self, key, path):
+        """
+        Reads the snapshot of a key.
+
+        Args:
+            key (str): The key or identifier for the data.
+            path (str): The path of the snapshot.
+
+        Returns:
+            tuple: The data and the journal sequence number it was taken at.
+        """
+        sequence = 0
+        with open(path, 'rb') as handle:
+            data = pickle.load(handle)
+            try:
+                sequence = pickle.load(handle)
+            except EOFError:
+                pass
+        return data, sequence
+
+    def load(self, key):
+        """
+        Loads data from a file using pickle deserialization.
+
+        In journal mode the changes journaled after the snapshot was taken
+        are replayed on top of it.
+
+        Args:
+            key (str): The key or identifier for the data being loaded.
+
+        Returns:
+            Any: The loaded data, or None if the file does not exist.
+        """
+        data = None
+        sequence = 0
+        path = self._snapshot_path(key)
+        if os.path.isfile(path):
+            data, sequence = self._read_snapshot(key, path)
+        if self.journal:
+            sequence = self._replay(key, data, sequence)
+        self._sequences[key] = sequence
+        return data
+
+    def _replay(self, key, data, sequence):
+        """
+        Replays the journal of a key over the loaded snapshot.
+
+        Entries already contained in the snapshot are skipped. Reading stops
+        at the first entry that can't be read (a torn entry from a crash
+        mid-append, or garbage), and the journal is cut back to the last good
+        entry, so later appends are not written behind it.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data (dict or list): The snapshot data to apply the journal to.
+            sequence (int): The sequence number the snapshot was taken at.
+
+        Returns:
+            int: The sequence number of the last applied entry.
+        """
+        path = self._journal_path(key)
+        if data is None or not os.path.isfile(path):
+            return sequence
+        good = 0
+        with open(path, 'rb') as handle:
+            while True:
+                try:
+                    entry_sequence, changes = pickle.load(handle)
+                    entry_sequence = int(entry_sequence)
+                    changes = list(changes)
+                except Exception:
+                    break
+                good = handle.tell()
+                if entry_sequence <= sequence:
+                    continue
+                for change in changes:
+                    apply_change(data, change)
+                sequence = entry_sequence
+        if os.path.getsize(path) > good:
+            self._truncate_journal(path, good)
+        return sequence
+
+    @staticmethod
+    def _truncate_journal(path, size):
+        """
+        Cuts a journal back to its last good entry.
+
+        Args:
+            path (str): The path of the journal.
+            size (int): The size of the good entries, in bytes.
+        """
+        with open(path, 'r+b') as handle:
+            handle.truncate(size)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def update(self, key, data, changes):
+        """
+        Persists changes that were already applied to the data in memory.
+
+        Without journal mode the whole data is saved again. In journal mode
+        only the changes are appended to the journal, and the journal is
+        compacted into a new snapshot once it grows too large.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data (dict or list): The complete, already changed data.
+            changes (list of tuple): The changes, in the format accepted by apply_change.
+        """
+        if not self.journal:
+            self.save(key, data)
+            return
+        if not os.path.isfile(self._snapshot_path(key)):
+            self.save(key, data)
+            return
+        sequence = self._sequences.get(key, 0) + 1
+        self._sequences[key] = sequence
+        path = self._journal_path(key)
+        with open(path, 'ab') as handle:
+            size = handle.tell()
+            try:
+                pickle.dump((sequence, changes), handle)
+                handle.flush()
+                os.fsync(handle.fileno())
+            except BaseException:
+                handle.truncate(size)
+                self._sequences[key] = sequence - 1
+                raise
+        journal_size = os.path.getsize(path)
+        if journal_size > max(self.compact_min_bytes, self.compact_ratio * os.path.getsize(self._snapshot_path(key))):
+            self.compact(key, data)
+
+    def compact(self, key, data):
+        """
+        Folds the journal of a key into a new snapshot.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data: The current data, including all journaled changes.
+        """
+        self.save(key, data)
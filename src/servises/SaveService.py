@@ -1,42 +1,178 @@
-import pickle
-import os.path
+import threading
+from servises.PickleStorage import PickleStorage
+from servises.GroupCommitWriter import GroupCommitWriter
+
+
+def parse_durability(policy):
+    """
+    Parses a durability policy.
+
+    Args:
+        policy (str): "always", "on-exit", "batched" or "batched(ms)".
+
+    Returns:
+        tuple: The policy name and the batching window in seconds (None unless batched).
+
+    Raises:
+        ValueError: If the policy is unknown.
+    """
+    policy = policy.strip().lower()
+    if policy in ("always", "on-exit"):
+        return policy, None
+    if policy == "batched":
+        return policy, 0.1
+    if policy.startswith("batched(") and policy.endswith(")"):
+        milliseconds = policy[len("batched("):-1]
+        if milliseconds.isdigit():
+            return "batched", int(milliseconds) / 1000
+    raise ValueError(f"Unknown durability policy: {policy}")
 
 
 class SaveService:
     """
-    Service class for saving and loading data using pickle serialization.
+    Service class for saving and loading data through a storage engine.
+
+    The storage engine decides how data is kept on disk: plain pickle files,
+    pickle snapshots with a mutation journal, a memory-mapped binary snapshot
+    with a journal, contacts in columns with a journal, hash-sharded pickle
+    files, or an SQLite database.
+
+    The durability policy decides when changes reach the storage engine:
+    "always" writes every change before update returns, "batched(ms)" lets a
+    background writer group the changes of each time window into one write,
+    and "on-exit" keeps changes in memory until flush or close.
+
+    Attributes:
+        storage (Storage): The storage engine the data is saved with.
+        durability (str): The durability policy.
+        lock (threading.RLock): Lock to hold while changing data passed to update.
 
     Methods:
-        save: Saves data to a file using pickle serialization.
-        load: Loads data from a file using pickle deserialization.
+        create: Creates a SaveService for a storage engine given by name.
+        save: Saves data under a key.
+        load: Loads the data of a key.
+        update: Persists changes made to previously loaded data.
+        flush: Writes all pending changes.
+        discard: Drops the changes that have not been written yet.
+        close: Writes all pending changes and releases the storage engine.
     """
+    def __init__(self, storage=None, durability="always"):
+        """
+        Initializes a SaveService instance.
+
+        Args:
+            storage (Storage, optional): The storage engine. Plain pickle files in
+                the "saves" directory are used if it is not given.
+            durability (str): "always", "batched(ms)" or "on-exit".
+        """
+        self.storage = storage if storage is not None else PickleStorage()
+        self.durability, window = parse_durability(durability)
+        self._writer = None
+        if self.durability == "always":
+            self.lock = threading.RLock()
+        else:
+            max_batch = None if self.durability == "on-exit" else 1000
+            self._writer = GroupCommitWriter(self.storage, window, max_batch)
+            self.lock = self._writer.lock
+
+    @staticmethod
+    def create(kind="pickle", directory="saves", durability="always", shards=16, cache_size=1024):
+        """
+        Creates a SaveService for a storage engine given by name.
+
+        Args:
+            kind (str): "pickle", "journal", "snapshot", "columnar", "sharded" or "sqlite".
+            directory (str): The directory the save files are kept in.
+            durability (str): "always", "batched(ms)" or "on-exit".
+            shards (int): The shard count of a new sharded address book.
+            cache_size (int): The number of decoded contacts the snapshot and sqlite engines keep in memory.
+
+        Returns:
+            SaveService: The service using the requested storage engine.
+
+        Raises:
+            ValueError: If the storage engine is unknown.
+        """
+        if kind == "pickle":
+            return SaveService(PickleStorage(directory), durability)
+        if kind == "journal":
+            return SaveService(PickleStorage(directory, journal=True), durability)
+        if kind == "snapshot":
+            from servises.SnapshotStorage import SnapshotStorage
+            return SaveService(SnapshotStorage(directory, cache_size), durability)
+        if kind == "columnar":
+            from servises.ColumnarStorage import ColumnarStorage
+            return SaveService(ColumnarStorage(directory), durability)
+        if kind == "sharded":
+            from servises.ShardedStorage import ShardedStorage
+            return SaveService(ShardedStorage(directory, shards), durability)
+        if kind == "sqlite":
+            from servises.SqliteStorage import SqliteStorage
+            return SaveService(SqliteStorage(directory, cache_size=cache_size), durability)
+        raise ValueError(f"Unknown storage: {kind}")
+
     def save(self, key, data):
         """
-        Saves data to a file using pickle serialization.
+        Saves data under a key, replacing what was stored before.
+
+        Pending changes of the key are dropped, as the data already contains them;
+        pending changes of other keys stay pending, so discard can still drop them.
 
         Args:
             key (str): The key or identifier for the data being saved.
             data: The data to be saved.
         """
-        with open(f'saves\\{key}.pickle', 'wb') as handle:
-            pickle.dump(data, handle)
-            
-    
+        with self.lock:
+            if self._writer is not None:
+                self._writer.discard(key)
+            self.storage.save(key, data)
+
     def load(self, key):
         """
-        Loads data from a file using pickle deserialization.
+        Loads the data of a key.
 
         Args:
             key (str): The key or identifier for the data being loaded.
 
         Returns:
-            Any: The loaded data, or None if the file does not exist.
+            Any: The loaded data, or None if nothing is stored under the key.
+        """
+        return self.storage.load(key)
+
+    def update(self, key, data, changes):
+        """
+        Persists changes that were already applied to the data in memory.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data (dict or list): The complete, already changed data.
+            changes (list of tuple): The changes, e.g. ("set", key, value) or ("del", key).
+        """
+        if self._writer is None:
+            self.storage.update(key, data, changes)
+        else:
+            self._writer.submit(key, data, changes)
+
+    def flush(self):
+        """Writes all pending changes to the storage engine."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def discard(self):
+        """
+        Drops the changes that have not been written yet, e.g. to roll back a failed batch.
+
+        Returns:
+            bool: True if pending changes could be dropped, False with the "always" policy,
+            which has already written every change.
         """
-        path = f'saves\\{key}.pickle'
-        if not os.path.isfile(path):
-            return None
-        with open(f'saves\\{key}.pickle', 'rb') as handle:
-            return pickle.load(handle)
-   
-            
+        if self._writer is None:
+            return False
+        self._writer.discard()
+        return True
 
+    def close(self):
+        """Writes all pending changes and releases the resources held by the storage engine."""
+        if self._writer is not None:
+            self._writer.close()
+        self.storage.close()
@@ -0,0 +1,228 @@
+import os.path
+import pickle
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from servises.Storage import Storage
+from servises.PickleStorage import PickleStorage
+
+
+def shard_of(name, count):
+    """
+    Returns the shard a contact belongs to.
+
+    The shard is derived from a CRC32 of the name, which, unlike hash(),
+    stays the same between runs.
+
+    Args:
+        name (str): The name of the contact.
+        count (int): The number of shards.
+
+    Returns:
+        int: The shard number.
+    """
+    return zlib.crc32(name.encode()) % count
+
+
+class ShardedStorage(Storage):
+    """
+    Storage engine that splits the address book over several pickle files.
+
+    Every contact belongs to one shard chosen by a hash of its name, so a
+    change rewrites only the shard of the changed contact. The shard count
+    is recorded in a manifest next to the shards and can be changed offline
+    with reshard. Other keys are kept in plain pickle files.
+
+    Attributes:
+        contacts_key (str): The key the address book is saved under.
+        directory (str): The directory the save files are kept in.
+        shards (int): The shard count used for a new address book.
+        workers (int): The number of threads shards are read with.
+    """
+    contacts_key = "book"
+
+    def __init__(self, directory="saves", shards=16, workers=4):
+        """
+        Initializes a ShardedStorage instance.
+
+        Args:
+            directory (str): The directory the save files are kept in.
+            shards (int): The shard count used for a new address book.
+            workers (int): The number of threads shards are read with.
+        """
+        self.directory = directory
+        self.shards = shards
+        self.workers = workers
+        self._files = PickleStorage(directory)
+        self._members = None
+
+    def _manifest_path(self):
+        """
+        Builds the path of the manifest holding the shard count.
+
+        Returns:
+            str: The path of the manifest.
+        """
+        return os.path.join(self.directory, f"{self.contacts_key}.shards")
+
+    def _shard_path(self, shard):
+        """
+        Builds the path of a shard file.
+
+        Args:
+            shard (int): The shard number.
+
+        Returns:
+            str: The path of the shard.
+        """
+        return os.path.join(self.directory, f"{self.contacts_key}.shard-{shard:03d}.pickle")
+
+    def _read_manifest(self):
+        """
+        Reads the shard count of the stored address book.
+
+        Returns:
+            int or None: The shard count, or None if no sharded book is stored.
+        """
+        if not os.path.isfile(self._manifest_path()):
+            return None
+        with open(self._manifest_path(), "r") as handle:
+            return int(handle.read().strip())
+
+    def _write_file(self, path, write):
+        """
+        Writes a file atomically through a temporary file.
+
+        Args:
+            path (str): The path of the file.
+            write (callable): Called with the open temporary file.
+        """
+        with open(path + ".tmp", "wb") as handle:
+            write(handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(path + ".tmp", path)
+
+    def _read_shard(self, shard):
+        """
+        Reads one shard file.
+
+        Args:
+            shard (int): The shard number.
+
+        Returns:
+            dict: The records of the shard.
+        """
+        path = self._shard_path(shard)
+        if not os.path.isfile(path):
+            return {}
+        with open(path, "rb") as handle:
+            return pickle.load(handle)
+
+    def _write_shard(self, shard, data):
+        """
+        Rewrites one shard file from the current records.
+
+        Args:
+            shard (int): The shard number.
+            data (dict): All records of the address book.
+        """
+        records = {name: data[name] for name in self._members[shard]}
+        self._write_file(self._shard_path(shard), lambda handle: pickle.dump(records, handle))
+
+    def load(self, key):
+        """
+        Loads the data of a key, reading the shards of the book in parallel.
+
+        An existing unsharded book.pickle is split into shards on first load.
+
+        Args:
+            key (str): The key or identifier for the data being loaded.
+
+        Returns:
+            Any: The loaded data, or None if nothing is stored.
+        """
+        if key != self.contacts_key:
+            return self._files.load(key)
+        count = self._read_manifest()
+        if count is None:
+            data = PickleStorage(self.directory, journal=True).load(key)
+            if data is not None:
+                self.save(key, data)
+            return data
+        self.shards = count
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            parts = list(executor.map(self._read_shard, range(count)))
+        self._members = [set(part) for part in parts]
+        data = {}
+        for part in parts:
+            data.update(part)
+        return data
+
+    def save(self, key, data):
+        """
+        Rewrites all shards of the book, or the pickle file of another key.
+
+        Args:
+            key (str): The key or identifier for the data being saved.
+            data: The data to be saved.
+        """
+        if key != self.contacts_key:
+            self._files.save(key, data)
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._members = [set() for shard in range(self.shards)]
+        for name in data:
+            self._members[shard_of(name, self.shards)].add(name)
+        for shard in range(self.shards):
+            self._write_shard(shard, data)
+        self._write_file(self._manifest_path(), lambda handle: handle.write(str(self.shards).encode()))
+
+    def update(self, key, data, changes):
+        """
+        Rewrites only the shards touched by the changes.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data (dict): The complete, already changed data.
+            changes (list of tuple): The changes, in the format accepted by apply_change.
+        """
+        if key != self.contacts_key:
+            self._files.update(key, data, changes)
+            return
+        if self._members is None:
+            self.save(key, data)
+            return
+        dirty = set()
+        for change in changes:
+            shard = shard_of(change[1], self.shards)
+            if change[0] == "del":
+                self._members[shard].discard(change[1])
+            else:
+                self._members[shard].add(change[1])
+            dirty.add(shard)
+        for shard in dirty:
+            self._write_shard(shard, data)
+
+    def reshard(self, count):
+        """
+        Redistributes the stored book over a new number of shards.
+
+        Must be run while the bot is not running.
+
+        Args:
+            count (int): The new shard count.
+        """
+        old_count = self._read_manifest() or 0
+        data = self.load(self.contacts_key) or {}
+        self.shards = count
+        self.save(self.contacts_key, data)
+        for shard in range(count, old_count):
+            os.remove(self._shard_path(shard))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or not sys.argv[1].isdigit() or int(sys.argv[1]) < 1:
+        print("Usage: python -m servises.ShardedStorage [shard_count]")
+        sys.exit(1)
+    ShardedStorage().reshard(int(sys.argv[1]))
@@ -0,0 +1,329 @@
+import mmap
+import os.path
+import struct
+from objects.Record import Record
+from servises.PickleStorage import PickleStorage
+from servises.LazyRecords import LazyRecords
+
+# Snapshot layout (all integers little-endian):
+#   header   magic, version, record count, journal sequence, table offset, order offset
+#   heap     per record: name bytes, then a field-length prefix and the field bytes
+#   table    one fixed-width entry per record in insertion order: heap offset, name length, body length
+#   order    the table positions sorted by name, for binary search
+MAGIC = b"BOTSNAP\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+ENTRY = struct.Struct("<QII")
+POSITION = struct.Struct("<I")
+FIELDS = struct.Struct("<5I")
+
+
+def encode_record(record):
+    """
+    Encodes the fields of a record, except its name, into bytes.
+
+    Args:
+        record (Record): The record to encode.
+
+    Returns:
+        bytes: The encoded fields.
+    """
+    fields = [
+        " ".join(record.phone_numbers).encode(),
+        record.birthday.str_data.encode() if record.birthday else b"",
+        record.address.value.encode() if record.address else b"",
+        record.email.value.encode() if record.email else b"",
+        record.comment.encode(),
+    ]
+    return FIELDS.pack(*map(len, fields)) + b"".join(fields)
+
+
+def decode_record(name, body):
+    """
+    Creates a record from its name and encoded fields.
+
+    Args:
+        name (str): The name of the contact.
+        body (bytes): The fields encoded by encode_record.
+
+    Returns:
+        Record: The decoded record.
+    """
+    lengths = FIELDS.unpack_from(body)
+    values = []
+    position = FIELDS.size
+    for length in lengths:
+        values.append(bytes(body[position:position + length]).decode())
+        position += length
+    phones, birthday, address, email, comment = values
+    record = Record(name, phones=phones.split(), birthday=birthday or None,
+                    address=address or None, email=email or None)
+    record.comment = comment
+    return record
+
+
+class MappedRecords(LazyRecords):
+    """
+    Dict-like view of the contacts in a memory-mapped binary snapshot.
+
+    Opening the view only reads the header, so it takes the same time for
+    any book size; the offset table serves as the name index. A record is
+    decoded from the mapped buffer when it is accessed, and records added,
+    changed or removed since the snapshot was written are kept in the
+    overlay until the next compaction.
+    """
+    def __init__(self, path=None, cache_size=1024):
+        """
+        Initializes a MappedRecords instance.
+
+        Args:
+            path (str, optional): The snapshot to map. The view is empty without it.
+            cache_size (int): The maximum number of decoded records kept in memory.
+        """
+        super().__init__(cache_size)
+        self._map = None
+        self._count = 0
+        self.sequence = 0
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path):
+        """
+        Maps a snapshot file and reads its header.
+
+        Args:
+            path (str): The path of the snapshot.
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version.
+        """
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size < HEADER.size:
+                raise ValueError(f"Invalid snapshot: {path}")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, sequence, table, order = HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported snapshot: {path}")
+        self._map, self._count, self.sequence, self._table, self._order = mapped, count, sequence, table, order
+
+    def _close(self):
+        """
+        Closes the mapping of the snapshot.
+
+        The snapshot file can't be replaced while it is mapped on Windows, so
+        the mapping is closed right before a new snapshot is moved into place
+        and _remap is called right after.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _remap(self, path):
+        """
+        Switches the view to a freshly written snapshot of the same data.
+
+        The new mapping is swapped in before the overlay is cleared, so
+        the changes since the old snapshot stay visible throughout.
+
+        Args:
+            path (str): The path of the new snapshot.
+        """
+        self._open(path)
+        self._written(list(self._overlay) + list(self._deleted))
+
+    def _entry(self, position):
+        """
+        Reads an entry of the offset table.
+
+        Args:
+            position (int): The position of the entry in insertion order.
+
+        Returns:
+            tuple: The heap offset, the name length and the body length.
+        """
+        return ENTRY.unpack_from(self._map, self._table + position * ENTRY.size)
+
+    def _name(self, position):
+        """
+        Reads the name of the record at a position.
+
+        Args:
+            position (int): The position of the entry in insertion order.
+
+        Returns:
+            bytes: The encoded name.
+        """
+        offset, name_length, body_length = self._entry(position)
+        return self._map[offset:offset + name_length]
+
+    def _find(self, name):
+        """
+        Finds a name in the snapshot by binary search over the sorted positions.
+
+        Args:
+            name (str): The name of the contact.
+
+        Returns:
+            int or None: The position of the entry, or None if it is not in the snapshot.
+        """
+        if self._map is None:
+            return None
+        key = name.encode()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            position = POSITION.unpack_from(self._map, self._order + middle * POSITION.size)[0]
+            current = self._name(position)
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                return position
+        return None
+
+    def raw_body(self, name):
+        """
+        Returns the encoded fields of an unchanged record straight from the snapshot.
+
+        Args:
+            name (str): The name of the contact.
+
+        Returns:
+            bytes or None: The encoded fields, or None if the record changed since the snapshot.
+        """
+        if name in self._overlay or name in self._deleted:
+            return None
+        position = self._find(name)
+        if position is None:
+            return None
+        offset, name_length, body_length = self._entry(position)
+        start = offset + name_length
+        return self._map[start:start + body_length]
+
+    def _read(self, name):
+        body = self.raw_body(name)
+        return decode_record(name, body) if body is not None else None
+
+    def _is_stored(self, name):
+        return self._find(name) is not None
+
+    def _stored_names(self):
+        for position in range(self._count):
+            yield self._name(position).decode()
+
+    def _stored_count(self):
+        return self._count
+
+    def _stored_items(self):
+        for position in range(self._count):
+            offset, name_length, body_length = self._entry(position)
+            name = self._map[offset:offset + name_length].decode()
+            start = offset + name_length
+            yield name, decode_record(name, self._map[start:start + body_length])
+
+
+class SnapshotStorage(PickleStorage):
+    """
+    Journaled storage engine that keeps the address book in a binary snapshot.
+
+    The contacts are written in a versioned format with a fixed-width
+    offset table and a string heap, which is memory-mapped on load so the
+    book is available without decoding any record. Changes are journaled
+    exactly as in PickleStorage, but to a journal of its own, so the journal
+    of the "journal" engine is left alone; other keys use pickle snapshots.
+
+    Attributes:
+        contacts_key (str): The key the address book is saved under.
+    """
+    contacts_key = "book"
+
+    def __init__(self, directory="saves", cache_size=1024, **kwargs):
+        """
+        Initializes a SnapshotStorage instance.
+
+        Args:
+            directory (str): The directory the save files are kept in.
+            cache_size (int): The maximum number of decoded contacts kept in memory.
+            **kwargs: Compaction settings passed to PickleStorage.
+        """
+        super().__init__(directory, journal=True, **kwargs)
+        self.cache_size = cache_size
+
+    def _snapshot_path(self, key):
+        if key == self.contacts_key:
+            return self._path(key, "snapshot")
+        return super()._snapshot_path(key)
+
+    def _journal_path(self, key):
+        if key == self.contacts_key:
+            return self._path(key, "snapshot.journal")
+        return super()._journal_path(key)
+
+    def _release(self, key, data):
+        if key == self.contacts_key and isinstance(data, MappedRecords):
+            data._close()
+
+    def _write_snapshot(self, handle, key, data, sequence):
+        if key != self.contacts_key:
+            super()._write_snapshot(handle, key, data, sequence)
+            return
+        handle.write(b"\0" * HEADER.size)
+        entries = []
+        offset = HEADER.size
+        for name in data:
+            body = data.raw_body(name) if isinstance(data, MappedRecords) else None
+            if body is None:
+                body = encode_record(data[name])
+            encoded = name.encode()
+            handle.write(encoded)
+            handle.write(body)
+            entries.append((encoded, offset, len(encoded), len(body)))
+            offset += len(encoded) + len(body)
+        table = offset
+        for encoded, *entry in entries:
+            handle.write(ENTRY.pack(*entry))
+        order = table + len(entries) * ENTRY.size
+        for position in sorted(range(len(entries)), key=lambda index: entries[index][0]):
+            handle.write(POSITION.pack(position))
+        handle.seek(0)
+        handle.write(HEADER.pack(MAGIC, VERSION, len(entries), sequence, table, order))
+        handle.seek(0, os.SEEK_END)
+
+    def _read_snapshot(self, key, path):
+        if key != self.contacts_key:
+            return super()._read_snapshot(key, path)
+        records = MappedRecords(path, self.cache_size)
+        return records, records.sequence
+
+    def save(self, key, data):
+        """
+        Saves data under a key and remaps the address book to the new snapshot.
+
+        Args:
+            key (str): The key or identifier for the data being saved.
+            data: The data to be saved.
+        """
+        super().save(key, data)
+        if key == self.contacts_key and isinstance(data, MappedRecords):
+            data._remap(self._snapshot_path(key))
+
+    def load(self, key):
+        """
+        Loads the data of a key, converting an old pickle save of the book first.
+
+        Args:
+            key (str): The key or identifier for the data being loaded.
+
+        Returns:
+            Any: MappedRecords for the address book, the unpickled data for
+            other keys, or None if nothing is stored.
+        """
+        if key == self.contacts_key and not os.path.isfile(self._snapshot_path(key)):
+            old = PickleStorage(self.directory, journal=True)
+            data = old.load(key)
+            if data is None:
+                return None
+            self._sequences[key] = old._sequences[key]
+            self.save(key, data)
+        return super().load(key)
@@ -0,0 +1,360 @@
+import os.path
+import pickle
+import sqlite3
+from datetime import datetime
+from objects.Record import Record
+from objects.Note import Note, NoteMap
+from servises.Storage import Storage
+from servises.LazyRecords import LazyRecords
+from servises.PickleStorage import PickleStorage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    name TEXT PRIMARY KEY,
+    address TEXT,
+    email TEXT,
+    birthday TEXT
+);
+CREATE TABLE IF NOT EXISTS phones (
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    PRIMARY KEY (name, position)
+);
+CREATE TABLE IF NOT EXISTS comments (
+    name TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    text TEXT NOT NULL,
+    created TEXT,
+    updated TEXT,
+    body TEXT,
+    title TEXT
+);
+CREATE TABLE IF NOT EXISTS note_tags (
+    note_id INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (note_id, tag)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS migrations (
+    key TEXT PRIMARY KEY
+);
+CREATE INDEX IF NOT EXISTS contacts_email ON contacts (email);
+CREATE INDEX IF NOT EXISTS phones_phone ON phones (phone);
+CREATE INDEX IF NOT EXISTS note_tags_tag ON note_tags (tag);
+"""
+
+
+class SqliteRecords(LazyRecords):
+    """
+    Dict-like view of the contacts stored in an SQLite database.
+
+    Records are read row by row when they are accessed and kept in a bounded
+    cache. Changes made through the mapping stay pending until the storage
+    writes them with SqliteStorage.update.
+
+    Attributes:
+        connection (sqlite3.Connection): The database connection.
+    """
+    def __init__(self, connection, cache_size=1024):
+        """
+        Initializes an SqliteRecords instance.
+
+        Args:
+            connection (sqlite3.Connection): The database connection.
+            cache_size (int): The maximum number of decoded records kept in memory.
+        """
+        super().__init__(cache_size)
+        self.connection = connection
+
+    def _is_stored(self, name):
+        row = self.connection.execute("SELECT 1 FROM contacts WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def _stored_names(self):
+        for name, in self.connection.execute("SELECT name FROM contacts ORDER BY rowid"):
+            yield name
+
+    def _stored_count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def _read(self, name):
+        row = self.connection.execute(
+            "SELECT address, email, birthday FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        phones = [phone for phone, in self.connection.execute(
+            "SELECT phone FROM phones WHERE name = ? ORDER BY position", (name,))]
+        comment = self.connection.execute("SELECT text FROM comments WHERE name = ?", (name,)).fetchone()
+        return self._build(name, row[0], row[1], row[2], phones, comment[0] if comment else "")
+
+    def _stored_items(self):
+        rows = self.connection.execute(
+            "SELECT c.name, c.address, c.email, c.birthday, "
+            "(SELECT group_concat(phone, ' ') FROM "
+            "(SELECT phone FROM phones p WHERE p.name = c.name ORDER BY position)), "
+            "(SELECT text FROM comments m WHERE m.name = c.name) "
+            "FROM contacts c ORDER BY c.rowid")
+        for name, address, email, birthday, phones, comment in rows:
+            yield name, self._build(name, address, email, birthday, phones.split() if phones else [], comment or "")
+
+    @staticmethod
+    def _build(name, address, email, birthday, phones, comment):
+        """
+        Creates a record from column values.
+
+        Returns:
+            Record: The record.
+        """
+        record = Record(name, phones=phones, birthday=birthday, address=address, email=email)
+        record.comment = comment
+        return record
+
+
+class SqliteStorage(Storage):
+    """
+    Storage engine that keeps contacts and notes in an SQLite database.
+
+    Contacts, their phones and comments and the notes live in separate,
+    indexed tables, so reading or changing one contact touches only its rows.
+    Keys other than the address book and the notes are stored as pickled
+    blobs. Existing pickle saves are imported the first time a key is loaded.
+
+    Attributes:
+        contacts_key (str): The key the address book is saved under.
+        notes_key (str): The key the notes are saved under.
+    """
+    contacts_key = "book"
+    notes_key = "notes"
+
+    def __init__(self, directory="saves", filename="bot.sqlite3", cache_size=1024):
+        """
+        Initializes an SqliteStorage instance.
+
+        Args:
+            directory (str): The directory the database and the old pickle saves are kept in.
+            filename (str): The file name of the database.
+            cache_size (int): The maximum number of decoded contacts kept in memory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.cache_size = cache_size
+        self.connection = sqlite3.connect(os.path.join(directory, filename), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(notes)")}
+        for column in ("created", "updated", "body", "title"):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE notes ADD COLUMN {column} TEXT")
+
+    def load(self, key):
+        """
+        Loads the data of a key, importing an old pickle save first if needed.
+
+        Args:
+            key (str): The key or identifier for the data being loaded.
+
+        Returns:
+            Any: SqliteRecords for the address book, a NoteMap for the notes,
+            the unpickled blob for other keys, or None if nothing is stored.
+        """
+        self._migrate(key)
+        if key == self.contacts_key:
+            return SqliteRecords(self.connection, self.cache_size)
+        if key == self.notes_key:
+            return self._load_notes()
+        row = self.connection.execute("SELECT data FROM blobs WHERE key = ?", (key,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def _load_notes(self):
+        """
+        Reads all notes, keeping the next ID of the AUTOINCREMENT sequence.
+
+        Returns:
+            NoteMap: The notes by ID.
+        """
+        notes = NoteMap()
+        tags = {}
+        for note_id, tag in self.connection.execute("SELECT note_id, tag FROM note_tags"):
+            tags.setdefault(note_id, []).append(tag)
+        rows = self.connection.execute("SELECT id, text, created, updated, body, title FROM notes ORDER BY id")
+        for note_id, text, created, updated, body, title in rows:
+            note = Note(note_id, None if body else text,
+                        datetime.fromisoformat(created) if created else None,
+                        datetime.fromisoformat(updated) if updated else None,
+                        tags.get(note_id, ()))
+            if body:
+                note.body = tuple(int(part) for part in body.split(","))
+                note.title = title
+            notes[note_id] = note
+        row = self.connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'notes'").fetchone()
+        if row:
+            notes.next_id = max(notes.next_id, row[0] + 1)
+        return notes
+
+    def _migrate(self, key):
+        """
+        Imports the pickle save of a key into the database once.
+
+        Args:
+            key (str): The key or identifier for the data.
+        """
+        if self.connection.execute("SELECT 1 FROM migrations WHERE key = ?", (key,)).fetchone():
+            return
+        data = PickleStorage(self.directory, journal=True).load(key)
+        with self.connection:
+            if data is not None:
+                self._write_all(key, data)
+            self.connection.execute("INSERT INTO migrations (key) VALUES (?)", (key,))
+
+    def save(self, key, data):
+        """
+        Replaces the stored data of a key.
+
+        Args:
+            key (str): The key or identifier for the data being saved.
+            data: The data to be saved.
+        """
+        with self.connection:
+            self._write_all(key, data)
+        if isinstance(data, SqliteRecords):
+            data._written(list(data._overlay) + list(data._deleted))
+
+    def _write_all(self, key, data):
+        """
+        Rewrites all rows of a key inside the current transaction.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data: The data to be written.
+        """
+        if key == self.contacts_key:
+            records = list(data.items())
+            self.connection.execute("DELETE FROM contacts")
+            self.connection.execute("DELETE FROM phones")
+            self.connection.execute("DELETE FROM comments")
+            for name, record in records:
+                self._write_record(name, record)
+        elif key == self.notes_key:
+            self.connection.execute("DELETE FROM notes")
+            self.connection.execute("DELETE FROM note_tags")
+            if isinstance(data, list):
+                self.connection.executemany("INSERT INTO notes (text) VALUES (?)", [(note,) for note in data])
+            else:
+                for note in data.values():
+                    self._write_note(note)
+        else:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO blobs (key, data) VALUES (?, ?)", (key, pickle.dumps(data)))
+
+    def _write_record(self, name, record):
+        """
+        Writes the rows of one contact.
+
+        Args:
+            name (str): The name of the contact.
+            record (Record): The record to write.
+        """
+        self.connection.execute(
+            "INSERT INTO contacts (name, address, email, birthday) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET address = excluded.address, "
+            "email = excluded.email, birthday = excluded.birthday",
+            (name,
+             record.address.value if record.address else None,
+             record.email.value if record.email else None,
+             record.birthday.str_data if record.birthday else None))
+        self.connection.execute("DELETE FROM phones WHERE name = ?", (name,))
+        self.connection.executemany(
+            "INSERT INTO phones (name, position, phone) VALUES (?, ?, ?)",
+            [(name, position, phone) for position, phone in enumerate(record.phone_numbers)])
+        if record.comment:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO comments (name, text) VALUES (?, ?)", (name, record.comment))
+        else:
+            self.connection.execute("DELETE FROM comments WHERE name = ?", (name,))
+
+    def _delete_record(self, name):
+        """
+        Deletes the rows of one contact.
+
+        Args:
+            name (str): The name of the contact.
+        """
+        for table in ("contacts", "phones", "comments"):
+            self.connection.execute(f"DELETE FROM {table} WHERE name = ?", (name,))
+
+    def _write_note(self, note):
+        """
+        Writes the rows of one note and its tags.
+
+        A text kept in a BlobStore is stored as its reference and first line.
+
+        Args:
+            note (Note): The note to write.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO notes (id, text, created, updated, body, title) VALUES (?, ?, ?, ?, ?, ?)",
+            (note.id, note.text if note.text is not None else "",
+             note.created.isoformat() if note.created else None,
+             note.updated.isoformat() if note.updated else None,
+             ",".join(map(str, note.body)) if note.body else None,
+             note.title))
+        self.connection.execute("DELETE FROM note_tags WHERE note_id = ?", (note.id,))
+        self.connection.executemany(
+            "INSERT INTO note_tags (note_id, tag) VALUES (?, ?)", [(note.id, tag) for tag in note.tags])
+
+    def _delete_note(self, note_id):
+        """
+        Deletes the rows of one note and its tags.
+
+        The AUTOINCREMENT sequence is advanced past the ID as well, because
+        the note may have been removed before its row was ever written.
+
+        Args:
+            note_id (int): The ID of the note.
+        """
+        self.connection.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+        self.connection.execute("DELETE FROM note_tags WHERE note_id = ?", (note_id,))
+        advanced = self.connection.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'notes'", (note_id,)).rowcount
+        if not advanced:
+            self.connection.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('notes', ?)", (note_id,))
+
+    def update(self, key, data, changes):
+        """
+        Writes only the rows touched by the changes, in one transaction.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data (dict or list): The complete, already changed data.
+            changes (list of tuple): The changes, in the format accepted by apply_change.
+        """
+        if key not in (self.contacts_key, self.notes_key):
+            self.save(key, data)
+            return
+        with self.connection:
+            for change in changes:
+                op = change[0]
+                if key == self.contacts_key and op == "set":
+                    self._write_record(change[1], change[2])
+                elif key == self.contacts_key and op == "del":
+                    self._delete_record(change[1])
+                elif op == "set":
+                    self._write_note(change[2])
+                elif op == "del":
+                    self._delete_note(change[1])
+                else:
+                    raise ValueError(f"Unknown change: {op}")
+        if isinstance(data, SqliteRecords):
+            data._written(change[1] for change in changes)
+
+    def close(self):
+        """Closes the database connection."""
+        self.connection.close()
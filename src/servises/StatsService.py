@@ -0,0 +1,210 @@
+from calendar import month_abbr
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EPOCH_ORDINAL = 719163
+MONTH_STARTS = [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]
+AGE_BUCKET = 10
+AGE_BUCKETS = 10
+
+
+def require_numpy():
+    """
+    Checks that NumPy is installed.
+
+    Raises:
+        RuntimeError: If NumPy is not installed.
+    """
+    if np is None:
+        raise RuntimeError('Contact statistics need NumPy. Install it with: pip install numpy (or pip install ".[stats]")')
+
+
+class ContactColumns:
+    """
+    Column arrays extracted from the contacts of an address book.
+
+    Every attribute holds one value per contact, in the same order. The
+    contacts are scanned once as plain values (or their columns are read
+    directly from a columnar book); all aggregates are then computed on the
+    arrays without touching the records again.
+
+    Attributes:
+        count (int): The number of contacts.
+        phones (numpy.ndarray): The number of phone numbers of each contact.
+        has_email (numpy.ndarray): Whether each contact has an email.
+        has_address (numpy.ndarray): Whether each contact has an address.
+        has_birthday (numpy.ndarray): Whether each contact has a birthday.
+        year, month, day (numpy.ndarray): The birthdays of the contacts that have one.
+    """
+    def __init__(self, phones, has_email, has_address, ordinals):
+        """
+        Builds the columns from one value per contact.
+
+        Args:
+            phones (array-like of int): The number of phone numbers of each contact.
+            has_email (array-like of bool): Whether each contact has an email.
+            has_address (array-like of bool): Whether each contact has an address.
+            ordinals (array-like of int): The birthday ordinal of each contact, 0 if it has none.
+
+        Raises:
+            RuntimeError: If NumPy is not installed.
+        """
+        require_numpy()
+        self.phones = np.asarray(phones, dtype=np.int32)
+        self.count = len(self.phones)
+        self.has_email = np.asarray(has_email, dtype=bool)
+        self.has_address = np.asarray(has_address, dtype=bool)
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        self.has_birthday = ordinals > 0
+        dates = (ordinals[self.has_birthday] - EPOCH_ORDINAL).astype("datetime64[D]")
+        months = dates.astype("datetime64[M]")
+        years = months.astype("datetime64[Y]")
+        self.year = years.astype(np.int64) + 1970
+        self.month = (months - years).astype(np.int64) + 1
+        self.day = (dates - months).astype(np.int64) + 1
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Extracts the columns from contacts scanned as plain values.
+
+        Args:
+            rows (iterable of tuple): The contacts in the format of Record.as_row.
+
+        Returns:
+            ContactColumns: The columns.
+
+        Raises:
+            RuntimeError: If NumPy is not installed.
+        """
+        require_numpy()
+        phones = []
+        emails = []
+        addresses = []
+        ordinals = []
+        for name, phone_numbers, address, email, ordinal in rows:
+            phones.append(len(phone_numbers))
+            emails.append(email is not None)
+            addresses.append(address is not None)
+            ordinals.append(ordinal or 0)
+        return cls(phones, emails, addresses, ordinals)
+
+    @classmethod
+    def from_columnar(cls, columns):
+        """
+        Extracts the columns from the raw columns of a columnar book without scanning its rows.
+
+        Args:
+            columns (dict): The columns, as returned by ColumnarRecords.columns.
+
+        Returns:
+            ContactColumns: The columns.
+
+        Raises:
+            RuntimeError: If NumPy is not installed.
+        """
+        require_numpy()
+        names = columns["names"]
+        live = np.fromiter((name is not None for name in names), dtype=bool, count=len(names))
+        has_email = np.fromiter((local is not None for local in columns["email_locals"]),
+                                dtype=bool, count=len(names))
+        return cls(np.asarray(columns["phone_counts"])[live], has_email[live],
+                   np.asarray(columns["addresses"])[live] != 0, np.asarray(columns["birthdays"])[live])
+
+    def birthdays_per_month(self):
+        """
+        Counts the birthdays in each month.
+
+        Returns:
+            numpy.ndarray: 12 counts, January first.
+        """
+        return np.bincount(self.month - 1, minlength=12)
+
+    def birthdays_per_week(self):
+        """
+        Counts the birthdays in each week of the year.
+
+        Weeks are counted from 1 January, so week 1 is 1-7 January and
+        week 53 holds 30 and 31 December.
+
+        Returns:
+            numpy.ndarray: 53 counts, week 1 first.
+        """
+        day_of_year = np.array(MONTH_STARTS)[self.month - 1] + self.day
+        return np.bincount((day_of_year - 1) // 7, minlength=53)
+
+    def ages(self, today):
+        """
+        Computes the ages of the contacts with a birthday.
+
+        Args:
+            today (datetime.date): The date the ages are computed for.
+
+        Returns:
+            numpy.ndarray: The ages in whole years.
+        """
+        before_birthday = self.month * 100 + self.day > today.month * 100 + today.day
+        return today.year - self.year - before_birthday
+
+    def age_distribution(self, today):
+        """
+        Counts the contacts with a birthday in age buckets of ten years.
+
+        Args:
+            today (datetime.date): The date the ages are computed for.
+
+        Returns:
+            numpy.ndarray: 10 counts for 0-9, 10-19, ... and 90 and older.
+            Birthdays in the future are left out.
+        """
+        ages = self.ages(today)
+        ages = ages[ages >= 0]
+        return np.bincount(np.minimum(ages // AGE_BUCKET, AGE_BUCKETS - 1), minlength=AGE_BUCKETS)
+
+    def missing(self):
+        """
+        Counts the contacts without each field.
+
+        Returns:
+            dict: The number of contacts without a phone, email, address and birthday.
+        """
+        return {
+            "phone": int(np.count_nonzero(self.phones == 0)),
+            "email": int(self.count - np.count_nonzero(self.has_email)),
+            "address": int(self.count - np.count_nonzero(self.has_address)),
+            "birthday": int(self.count - np.count_nonzero(self.has_birthday)),
+        }
+
+
+def format_stats(columns, today):
+    """
+    Formats the birthday calendar, the age distribution and the field coverage.
+
+    Args:
+        columns (ContactColumns): The columns of the address book.
+        today (datetime.date): The date the ages are computed for.
+
+    Returns:
+        str: The report.
+    """
+    if not columns.count:
+        return "No contacts available."
+    lines = [f"Contacts: {columns.count}", "", "Birthdays per month:"]
+    for month, count in enumerate(columns.birthdays_per_month(), 1):
+        lines.append(f"  {month_abbr[month]}: {count}")
+    weeks = columns.birthdays_per_week()
+    busiest = [week for week in np.argsort(-weeks, kind="stable")[:3] if weeks[week]]
+    if busiest:
+        lines.append("Busiest weeks: " + ", ".join(f"week {week + 1} ({weeks[week]})" for week in busiest))
+    lines += ["", "Ages:"]
+    for bucket, count in enumerate(columns.age_distribution(today)):
+        low = bucket * AGE_BUCKET
+        label = f"{low}+" if bucket == AGE_BUCKETS - 1 else f"{low}-{low + AGE_BUCKET - 1}"
+        lines.append(f"  {label}: {count}")
+    lines += ["", "Missing fields:"]
+    for field, count in columns.missing().items():
+        lines.append(f"  {field}: {count} ({count / columns.count:.1%})")
+    return "\n".join(lines)
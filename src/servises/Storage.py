@@ -0,0 +1,73 @@
+def apply_change(data, change):
+    """
+    Applies a single change to a dict or list in place.
+
+    Deleting a missing dict key is not an error: a write group may have
+    coalesced the change that created the key away.
+
+    Args:
+        data (dict or list): The data the change belongs to.
+        change (tuple): One of ("set", key, value), ("del", key) or ("append", value).
+    """
+    op = change[0]
+    if op == "set":
+        data[change[1]] = change[2]
+    elif op == "del":
+        if isinstance(data, list):
+            del data[change[1]]
+        else:
+            data.pop(change[1], None)
+    elif op == "append":
+        data.append(change[1])
+    else:
+        raise ValueError(f"Unknown change: {op}")
+
+
+class Storage:
+    """
+    Base class for the storage engines used by SaveService.
+
+    A storage engine persists the data of a key (the contacts dict of the
+    address book, the notes of the notebook) and the changes made to it.
+
+    Methods:
+        load: Loads the data of a key.
+        save: Replaces the stored data of a key.
+        update: Persists changes that were already applied to the data in memory.
+        close: Releases the resources held by the storage.
+    """
+    def load(self, key):
+        """
+        Loads the data of a key.
+
+        Args:
+            key (str): The key or identifier for the data being loaded.
+
+        Returns:
+            Any: The loaded data, or None if nothing is stored under the key.
+        """
+        raise NotImplementedError
+
+    def save(self, key, data):
+        """
+        Replaces the stored data of a key.
+
+        Args:
+            key (str): The key or identifier for the data being saved.
+            data: The data to be saved.
+        """
+        raise NotImplementedError
+
+    def update(self, key, data, changes):
+        """
+        Persists changes that were already applied to the data in memory.
+
+        Args:
+            key (str): The key or identifier for the data.
+            data (dict or list): The complete, already changed data.
+            changes (list of tuple): The changes, in the format accepted by apply_change.
+        """
+        self.save(key, data)
+
+    def close(self):
+        """Releases the resources held by the storage."""
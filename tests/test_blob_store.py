@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from objects.Notes import Notes
+from servises.BlobStore import BlobStore
+from servises.SaveService import SaveService
+
+
+def random_text(rng, length):
+    return "".join(rng.choice("abc \n") for _ in range(length))
+
+
+def test_texts_read_back_from_every_chunk(tmp_path):
+    rng = random.Random(8)
+    store = BlobStore(str(tmp_path), chunk_size=2000)
+    texts = [random_text(rng, rng.randint(0, 3000)) + "ü€" for _ in range(50)]
+    refs = [store.put(text) for text in texts]
+    assert len({ref[0] for ref in refs}) > 1
+
+    reopened = BlobStore(str(tmp_path), chunk_size=2000, cache_size=1)
+    assert [reopened.get(ref) for ref in refs] == texts
+    ref = reopened.put("after reopening")
+    assert ref[0] >= refs[-1][0]
+    assert [reopened.get(ref) for ref in refs] == texts and reopened.get(ref) == "after reopening"
+
+
+@pytest.mark.parametrize("threshold, text, accepted", [(10, "x" * 10, False), (10, "x" * 11, True), (0, "x" * 10 ** 5, False)])
+def test_accepts_only_texts_above_the_threshold(tmp_path, threshold, text, accepted):
+    assert BlobStore(str(tmp_path), threshold=threshold).accepts(text) == accepted
+
+
+def test_long_notes_are_kept_compressed(tmp_path):
+    long_text = "shopping list\n" + "milk and bread " * 100
+    service = SaveService.create("journal", directory=str(tmp_path))
+    notes = Notes(service)
+    plain = notes.add_notes(long_text)
+    service.close()
+
+    service = SaveService.create("journal", directory=str(tmp_path))
+    notes = Notes(service, BlobStore(str(tmp_path), threshold=100))
+    assert notes.notes[plain].text is None
+    long = notes.add_notes(long_text)
+    short = notes.add_notes("short note")
+    assert notes.notes[long].text is None and notes.notes[short].text == "short note"
+    assert notes.notes[long].preview() == "shopping list..."
+    assert [note_id for note_id, note in notes.search("bread")[0]] == [plain, long]
+    notes.edit_notes(long, "now short")
+    service.close()
+
+    service = SaveService.create("journal", directory=str(tmp_path))
+    notes = Notes(service, BlobStore(str(tmp_path), threshold=100, cache_size=1))
+    assert {note_id: notes.text_of(note) for note_id, note in notes.notes.items()} == \
+        {plain: long_text, long: "now short", short: "short note"}
+    assert notes.notes[long].text == "now short"
+    service.close()
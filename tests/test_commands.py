@@ -0,0 +1,118 @@
+import pytest
+
+import main
+from servises.SaveService import SaveService
+
+
+@pytest.fixture
+def commands(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = SaveService.create("journal", directory=str(tmp_path / "saves"))
+    commands, notes = main.create_commands(service)
+    yield commands
+    service.close()
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("ADD Anna 1234567890", ["add", "Anna", "1234567890"]),
+    ('export "/tmp/my dir/Out.CSV"', ["export", "/tmp/my dir/Out.CSV"]),
+    ("import 'a b.csv'", ["import", "a b.csv"]),
+    ("add-note don't forget it's", ["add-note", "don't", "forget", "it's"]),
+    (r"import C:\Users\Me\contacts.csv", ["import", r"C:\Users\Me\contacts.csv"]),
+    ("   ", []),
+])
+def test_split_input(line, expected):
+    assert main.split_input(line) == expected
+
+
+def test_file_paths_keep_their_case_and_spaces(tmp_path, commands):
+    commands["add"](["Anna", "1234567890"])
+    path = str(tmp_path / "My Dir" / "Out.CSV")
+    (tmp_path / "My Dir").mkdir()
+    assert commands["export"]([path]) == "Exported 1 contacts."
+    assert (tmp_path / "My Dir" / "Out.CSV").is_file()
+    commands["remove"](["ANNA"])
+    assert commands["import"]([path]).startswith("Imported 1 contacts.")
+    assert "anna" in "".join(commands["search"](["anna"]).pieces)
+
+
+def contact_names(directory):
+    service = SaveService.create("journal", directory=directory)
+    commands, notes = main.create_commands(service)
+    listing = commands["all"](["--compact"])
+    names = [] if isinstance(listing, str) else \
+        sorted(line.split(" | ")[0] for line in "".join(listing.pieces).splitlines() if " | " in line)
+    service.close()
+    return names
+
+
+@pytest.mark.parametrize("failing_line", ["remove", "search", "birthdays x", "remove-note", "remove-note x",
+                                          "add-phone anna", "edit-phone anna 1", "nonsense", "remove nobody"])
+@pytest.mark.parametrize("atomic", [False, True])
+def test_batch_counts_usage_and_validation_errors_as_failures(tmp_path, capsys, failing_line, atomic):
+    directory = str(tmp_path / "saves")
+    service = SaveService.create("journal", directory=directory, durability="on-exit")
+    commands, notes = main.create_commands(service)
+    lines = ["add anna 1234567890", "# a comment", "", failing_line, "add bob 0987654321"]
+    assert main.run_batch(commands, service, lines, atomic) == 1
+    service.close()
+
+    output = capsys.readouterr().out
+    assert "4: error:" in output
+    assert contact_names(directory) == ([] if atomic else ["anna", "bob"])
+
+
+def test_successful_atomic_batch_is_saved(tmp_path, capsys):
+    directory = str(tmp_path / "saves")
+    service = SaveService.create("journal", directory=directory, durability="on-exit")
+    commands, notes = main.create_commands(service)
+    lines = ["add anna 1234567890", "birthdays 7", "search anna", "add-note hello", "remove-note 1",
+             "add bob 0987654321", "exit", "add never 1111111111"]
+    assert main.run_batch(commands, service, lines, atomic=True) == 0
+    service.close()
+
+    assert "6 succeeded, 0 failed; changes saved" in capsys.readouterr().out
+    assert contact_names(directory) == ["anna", "bob"]
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BOT_STORAGE", "journal")
+    monkeypatch.setattr(main.signal, "signal", lambda signum, handler: None)
+    return main.main
+
+
+def test_one_shot_commands_save_before_exiting(bot, capsys):
+    assert bot(["ADD", "Anna", "1234567890"]) == 0
+    assert bot(["add-note", "Don't", "forget"]) == 0
+    capsys.readouterr()
+    assert bot(["search", "anna", "--compact"]) == 0
+    assert bot(["notes"]) == 0
+    assert capsys.readouterr().out == "anna | 1234567890 | - | - | -\n1: Don't forget\n"
+
+
+def test_unknown_one_shot_command(bot, capsys):
+    assert bot(["nonsense"]) == 2
+    assert "Invalid command: nonsense" in capsys.readouterr().err
+
+
+def test_batch_mode_from_a_file(bot, tmp_path, capsys):
+    (tmp_path / "commands.txt").write_text("add anna 1234567890\nsearch\n", encoding="utf-8")
+    assert bot(["--batch", "commands.txt", "--atomic"]) == 1
+    assert bot(["--batch", "missing.txt"]) == 2
+    assert bot(["--batch", "a", "b"]) == 2
+    capsys.readouterr()
+    assert bot(["all"]) == 0
+    assert capsys.readouterr().out == "No contacts available.\n"
+
+
+def test_one_shot_mode_loads_only_what_the_command_needs(tmp_path):
+    import subprocess
+    import sys
+    script = ("import sys, main; main.signal.signal = lambda *args: None; status = main.main(['hello']); "
+              "print(status, sorted(name for name in ('objects.AddressBook', 'objects.Notes', 'prompt_toolkit') "
+              "if name in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, capture_output=True, text=True,
+                            env={"PYTHONPATH": main.__file__.rsplit("main.py", 1)[0], "PATH": ""})
+    assert result.stdout.splitlines()[-1] == "0 []", result.stderr
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from objects.AddressBook import AddressBook
+from objects.Record import Record
+from servises.ImportExportService import read_rows, validate_chunk, write_records
+from servises.SaveService import SaveService
+
+
+@pytest.fixture
+def book(tmp_path):
+    service = SaveService.create("journal", directory=str(tmp_path / "saves"))
+    yield AddressBook(service)
+    service.close()
+
+
+@pytest.mark.parametrize("extension", [".csv", ".vcf", ".jsonl"])
+def test_export_then_import_keeps_every_field(tmp_path, book, extension):
+    book.add_record(Record("anna", phones=["1234567890", "0987654321"], birthday="29.02.2000",
+                           address="kyiv; main st, 1", email="anna@mail.com"))
+    book.add_comment("anna", "line one\nline two")
+    book.add_record(Record("bob", phones=["1111111111"]))
+    expected = {name: book.get_record(name).get_details() for name in book._records}
+    path = str(tmp_path / f"contacts{extension}")
+    assert write_records(book.iter_records(), path) == 2
+
+    for name in list(book._records):
+        book.remove_record(name)
+    assert book.bulk_add(read_rows(path), workers=0) == (2, [])
+    assert {name: book.get_record(name).get_details() for name in book._records} == expected
+
+
+def test_bad_jsonl_rows_are_skipped_without_aborting_the_import(tmp_path, book):
+    lines = [
+        {"name": "good", "phones": ["1234567890"], "birthday": "01.02.1990"},
+        [1, 2],
+        {"name": 5},
+        {"name": "bad birthday", "birthday": 19900201},
+        {"name": "bad phones", "phones": 1234567890},
+        {"name": "bad email", "email": "nope"},
+        None,
+        {"name": "numbers", "phones": [1234567899]},
+    ]
+    path = tmp_path / "contacts.jsonl"
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n{broken\n", encoding="utf-8")
+
+    added, errors = book.bulk_add(read_rows(str(path)), workers=0)
+    assert added == 2
+    assert sorted(book._records) == ["good", "numbers"]
+    assert [line_number for line_number, message in errors] == [2, 3, 4, 5, 6, 7, 9]
+
+
+def test_validate_chunk_reports_rows_of_the_wrong_shape():
+    chunk = [(1, {"name": "ok", "phones": ["1234567890"]}), (2, {"name": ["x"]}), (3, {"name": "p", "phones": 5}),
+             (4, {"name": "b", "birthday": 3}), (5, {"name": "ok2"})]
+    records, errors = validate_chunk(chunk)
+    assert [(line_number, record.name.value) for line_number, record in records] == [(1, "ok"), (5, "ok2")]
+    assert [line_number for line_number, message in errors] == [2, 3, 4]
@@ -0,0 +1,184 @@
+import random
+from datetime import date, timedelta
+from calendar import isleap
+
+import pytest
+
+from objects.AddressBook import AddressBook
+from objects.BirthdayIndex import BirthdayIndex
+from objects.DeleteIndex import DeleteIndex
+from objects.PhoneIndex import PhoneIndex
+from objects.Record import Record
+from servises.SaveService import SaveService
+
+
+def edit_distance(first, second):
+    """Plain dynamic-programming edit distance, without any cutoff."""
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (first_char != second_char)))
+        previous = current
+    return previous[-1]
+
+
+def random_phone(rng):
+    # Few distinct digits, so numbers share prefixes, suffixes and infixes.
+    return "".join(rng.choice("0127") for _ in range(10))
+
+
+def random_book(rng, kind, directory, count=300):
+    book = AddressBook(SaveService.create(kind, directory=str(directory), durability="on-exit"))
+    for i in range(count):
+        book.add_record(Record(
+            rng.choice(["anna", "andrew", "bob", "bobby", "carol", "karl"]) + str(i),
+            phones=[random_phone(rng) for _ in range(rng.randrange(3))],
+            birthday=f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1950, 2010)}" if rng.random() < 0.7 else None,
+            address=rng.choice([None, "kyiv main st", "lviv old town", "odesa port"]),
+            email=rng.choice([None, f"user{i}@mail.com", f"boss{i}@work.org"])))
+    return book
+
+
+def mutate(rng, book):
+    names = list(book._records)
+    for name in rng.sample(names, 40):
+        book.remove_record(name)
+    for name in rng.sample(list(book._records), 40):
+        book.edit_record(name, [random_phone(rng)], rng.choice(["new place", "kyiv"]), f"{name}@edited.net")
+    for i in range(40):
+        book.add_record(Record(f"late{i}", phones=[random_phone(rng)], address="late street"))
+
+
+@pytest.mark.parametrize("kind", ["journal", "columnar", "snapshot", "sqlite"])
+def test_search_matches_a_full_scan(tmp_path, kind):
+    rng = random.Random(1)
+    book = random_book(rng, kind, tmp_path)
+    terms = ["an", "ann", "bob", "ob", "kyiv", "main", "mail.com", "work", "201", "0127", "7", ".05.", "1980", "zzz", "late"]
+    book.search_names(terms[0])
+    mutate(rng, book)
+    for term in terms:
+        expected = sorted(((book._match_score(row, term), row[0]) for row in book._rows()
+                           if book._match_score(row, term)), key=lambda match: (-match[0], match[1]))
+        names, total = book.search_names(term)
+        assert names == [name for score, name in expected], term
+        assert total == len(expected)
+
+
+def test_phone_index_matches_a_full_scan():
+    rng = random.Random(2)
+    contacts = {f"c{i}": [random_phone(rng) for _ in range(rng.randrange(4))] for i in range(500)}
+    index = PhoneIndex.build(contacts.items())
+    for name in rng.sample(list(contacts), 100):
+        if rng.random() < 0.5:
+            del contacts[name]
+            index.remove(name)
+        else:
+            contacts[name] = [random_phone(rng)]
+            index.add(name, contacts[name])
+
+    checks = {
+        "exact": lambda phone, digits: phone == digits,
+        "prefix": str.startswith,
+        "suffix": str.endswith,
+        "infix": lambda phone, digits: digits in phone,
+    }
+    all_phones = [phone for phones in contacts.values() for phone in phones]
+    queries = ["".join(rng.choice("0127") for _ in range(length)) for length in range(1, 11) for _ in range(5)]
+    queries += [phone[start:start + length] for phone in rng.sample(all_phones, 30)
+                for start, length in [(0, 10), (0, 4), (6, 4), (3, 5)]]
+    for mode, check in checks.items():
+        for digits in queries:
+            expected = {name for name, phones in contacts.items() if any(check(phone, digits) for phone in phones)}
+            assert index.find(digits, mode) == expected, (mode, digits)
+
+
+def test_fuzzy_index_matches_a_full_scan():
+    rng = random.Random(3)
+    words = {"".join(rng.choice("abcde") for _ in range(rng.randint(1, 12))) for _ in range(800)}
+    index = DeleteIndex(max_distance=2)
+    for word in words:
+        index.add(word)
+    for word in rng.sample(sorted(words), 200):
+        words.discard(word)
+        index.remove(word)
+
+    queries = ["".join(rng.choice("abcdef") for _ in range(rng.randint(1, 13))) for _ in range(80)]
+    queries += rng.sample(sorted(words), 20)
+    for query in queries:
+        distances = sorted((edit_distance(query, word), word) for word in words)
+        for max_distance in (0, 1, 2):
+            expected = [match for match in distances if match[0] <= max_distance]
+            assert index.find(query, max_distance) == expected, (query, max_distance)
+
+
+def next_birthday(birthday, today):
+    for year in (today.year, today.year + 1):
+        if (birthday.month, birthday.day) == (2, 29) and not isleap(year):
+            celebrated = date(year, 2, 28)
+        else:
+            celebrated = birthday.replace(year=year)
+        if celebrated >= today:
+            return celebrated
+
+
+def test_birthday_index_matches_a_full_scan():
+    rng = random.Random(4)
+    birthdays = {f"c{i}": date(rng.randint(1950, 2010), 1, 1) + timedelta(days=rng.randrange(365)) for i in range(400)}
+    birthdays.update({f"leap{i}": date(2000, 2, 29) for i in range(5)})
+    index = BirthdayIndex.build(birthdays.items())
+    for name in rng.sample(sorted(birthdays), 80):
+        if rng.random() < 0.5:
+            del birthdays[name]
+            index.remove(name)
+        else:
+            birthdays[name] = date(1990, 12, 31)
+            index.add(name, birthdays[name])
+
+    todays = [date(2023, 2, 27), date(2023, 12, 30), date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1),
+              date(2025, 1, 1)] + [date(2022, 1, 1) + timedelta(days=rng.randrange(1500)) for _ in range(10)]
+    for today in todays:
+        for days in (0, 1, 6, 7, 30, 59, 365, 366, 800, 10 ** 8):
+            end = today + timedelta(days=min(days, 366))
+            expected = sorted(((name, celebrated) for name, celebrated in
+                               ((name, next_birthday(birthday, today)) for name, birthday in birthdays.items())
+                               if celebrated <= end), key=lambda item: (item[1], item[0]))
+            assert index.upcoming(today, days) == expected, (today, days)
+
+
+@pytest.mark.parametrize("kind", ["journal", "columnar"])
+def test_owner_indexes_follow_phone_edits(tmp_path, kind):
+    rng = random.Random(5)
+    book = random_book(rng, kind, tmp_path, count=100)
+    book.find_owners("0000000000")
+    mutate(rng, book)
+    for name in rng.sample(list(book._records), 30):
+        phones = book.get_record(name).phone_numbers
+        if phones and rng.random() < 0.5:
+            book.edit_phone(name, phones[0], random_phone(rng))
+        elif phones:
+            book.remove_phone(name, phones[0])
+        else:
+            book.add_phone(name, random_phone(rng))
+    assert book.verify_indexes() == []
+    for phone in {phone for row in book._rows() for phone in row[1]}:
+        assert [record.name.value for record in book.find_owners(phone)] == \
+            sorted(row[0] for row in book._rows() if phone in row[1])
+    shared = {}
+    for row in book._rows():
+        for phone in set(row[1]):
+            shared.setdefault(phone, []).append(row[0])
+    assert [(key, names) for field, key, names in book.find_duplicates() if field == "phone"] == \
+        sorted((phone, sorted(names)) for phone, names in shared.items() if len(names) > 1)
+
+
+def test_unique_phones_are_checked_with_the_phone_index(tmp_path):
+    book = AddressBook(SaveService.create("journal", directory=str(tmp_path)), unique=("phone",))
+    book.add_record(Record("ann", phones=["1111111111"]))
+    book.add_record(Record("bob", phones=["2222222222"]))
+    with pytest.raises(ValueError, match="already belongs to ann"):
+        book.add_phone("bob", "1111111111")
+    book.remove_phone("ann", "1111111111")
+    book.add_phone("bob", "1111111111")
+    assert [record.name.value for record in book.find_owners("(111) 111-1111")] == ["bob"]
+    assert book.verify_indexes() == []
@@ -0,0 +1,143 @@
+import random
+
+import pytest
+
+from objects.NoteIndex import parse_query, tokenize
+from objects.Notes import Notes
+from servises.SaveService import SaveService
+
+
+@pytest.fixture
+def notes(tmp_path):
+    service = SaveService.create("journal", directory=str(tmp_path))
+    yield Notes(service)
+    service.close()
+
+
+def matches(text, query):
+    """Full-scan version of the note query semantics."""
+    tokens = tokenize(text)
+    return any(all(any(tuple(tokens[i:i + len(part)]) == part for i in range(len(tokens))) for part in group)
+               for group in parse_query(query))
+
+
+def test_search_matches_a_full_scan(notes):
+    rng = random.Random(6)
+    words = ["milk", "bread", "shopping", "list", "call", "mom", "meeting", "monday", "project", "review"]
+    for _ in range(200):
+        notes.add_notes(" ".join(rng.choice(words) for _ in range(rng.randint(1, 12))))
+    for note_id in rng.sample(sorted(notes.notes), 30):
+        notes.remove_notes(note_id)
+    for note_id in rng.sample(sorted(notes.notes), 30):
+        notes.edit_notes(note_id, " ".join(rng.choice(words) for _ in range(5)))
+
+    queries = ["milk", "MILK bread", "milk OR mom", '"shopping list"', '"list shopping" OR review monday',
+               "nothing", "milk nothing", "call or mom"]
+    for query in queries:
+        expected = {note_id for note_id, note in notes.notes.items() if matches(notes.text_of(note), query)}
+        found, total = notes.search(query)
+        assert {note_id for note_id, note in found} == expected, query
+        assert total == len(expected)
+        page, page_total = notes.search(query, limit=3, offset=2)
+        assert page == found[2:5] and page_total == total
+
+
+def test_more_frequent_terms_rank_first(notes):
+    notes.add_notes("milk and some bread and more words here")
+    best = notes.add_notes("milk milk milk")
+    found, total = notes.search("milk")
+    assert found[0][0] == best and total == 2
+
+
+def test_empty_query_lists_every_note(notes):
+    first = notes.add_notes("first note")
+    second = notes.add_notes("second note")
+    assert notes.search("") == ([(first, notes.notes[first]), (second, notes.notes[second])], 2)
+    assert notes.search("  ", limit=1, offset=1) == ([(second, notes.notes[second])], 2)
+    assert notes.find_notes_command("") == f"{first}: first note\n{second}: second note"
+
+
+@pytest.mark.parametrize("kind", ["pickle", "journal", "snapshot", "columnar", "sharded", "sqlite"])
+def test_note_ids_stay_stable_across_removals_and_reloads(tmp_path, kind):
+    service = SaveService.create(kind, directory=str(tmp_path))
+    notes = Notes(service)
+    ids = [notes.add_notes(f"note {i}") for i in range(5)]
+    notes.remove_notes(ids[1])
+    notes.remove_notes(ids[4])
+    assert notes.edit_notes(ids[3], "note 3, edited") == "Note updated."
+    service.close()
+
+    service = SaveService.create(kind, directory=str(tmp_path))
+    notes = Notes(service)
+    assert {note_id: notes.text_of(note) for note_id, note in notes.notes.items()} == \
+        {ids[0]: "note 0", ids[2]: "note 2", ids[3]: "note 3, edited"}
+    assert notes.add_notes("new") == ids[4] + 1
+    assert notes.remove_notes(ids[1]) == "Note not found."
+    service.close()
+
+
+def test_notes_saved_as_a_list_are_numbered_as_they_were_shown(tmp_path):
+    service = SaveService.create("journal", directory=str(tmp_path))
+    service.save(Notes.name_for_save, ["first", "second"])
+    notes = Notes(service)
+    assert [(note_id, notes.text_of(note)) for note_id, note in notes.notes.items()] == [(1, "first"), (2, "second")]
+    assert notes.add_notes("third") == 3
+    service.close()
+
+
+def test_each_change_saves_only_the_changed_note(tmp_path):
+    service = SaveService.create("journal", directory=str(tmp_path))
+    notes = Notes(service)
+    for i in range(10):
+        notes.add_notes(f"note {i}")
+    saved = []
+    update = service.update
+    service.update = lambda key, data, changes: (saved.append(list(changes)), update(key, data, changes))
+    notes.edit_notes(5, "edited")
+    notes.remove_notes(6)
+    assert [[change[:2] for change in changes] for changes in saved] == [[("set", 5)], [("del", 6)]]
+    service.close()
+
+
+def test_tag_queries_match_a_full_scan(notes):
+    rng = random.Random(7)
+    tags = ["work", "home", "urgent", "done", "follow-up"]
+    for i in range(150):
+        note_id = notes.add_notes(f"note {i}")
+        notes.add_tags(note_id, rng.sample(tags, rng.randint(0, 3)))
+    for note_id in rng.sample(sorted(notes.notes), 30):
+        notes.remove_notes(note_id)
+    for note_id in rng.sample(sorted(notes.notes), 30):
+        notes.remove_tags(note_id, rng.sample(tags, 2))
+
+    expressions = ["work", "#Work and urgent", "work or home", "not done", "work and not done",
+                   "(home or work) and not (urgent or done)", "not not follow-up", "home or work and urgent",
+                   "missing or work"]
+    for expression in expressions:
+        python = expression.replace("#", "").replace("(", " ( ").replace(")", " ) ")
+        python = " ".join(word if word in ("and", "or", "not", "(", ")") else f"({word.lower()!r} in tags)"
+                          for word in python.split())
+        expected = [note_id for note_id, note in notes.notes.items() if eval(python, {"tags": note.tags})]
+        found, total = notes.find_by_tags(expression)
+        assert [note_id for note_id, note in found] == sorted(expected), expression
+        assert total == len(expected)
+    assert notes.find_by_tags("work urgent not done") == notes.find_by_tags("work and urgent and not done")
+
+    counts = {}
+    for note in notes.notes.values():
+        for tag in note.tags:
+            counts[tag] = counts.get(tag, 0) + 1
+    assert dict(notes.tag_counts()) == counts
+
+
+@pytest.mark.parametrize("expression", ["", "work and", "(work", "work)", "or work", "bad!tag"])
+def test_malformed_tag_queries_are_rejected(notes, expression):
+    notes.add_tags(notes.add_notes("note"), ["work"])
+    with pytest.raises(ValueError):
+        notes.find_by_tags(expression)
+
+
+@pytest.mark.parametrize("tag", ["", "#", "two words", "and", "-dash"])
+def test_invalid_tags_are_rejected(notes, tag):
+    with pytest.raises(ValueError):
+        notes.add_tags(notes.add_notes("note"), [tag])
@@ -0,0 +1,69 @@
+import io
+import sys
+
+import pytest
+
+import bot_functions
+from objects.AddressBook import AddressBook
+from objects.Record import Record
+from servises.OutputService import StreamedOutput, show, write_chunks
+from servises.SaveService import SaveService
+
+
+class CountingStream(io.StringIO):
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+@pytest.fixture
+def book(tmp_path):
+    service = SaveService.create("journal", directory=str(tmp_path))
+    book = AddressBook(service)
+    for i in range(25):
+        book.add_record(Record(f"contact{i:02d}", phones=[f"{1000000000 + i}"], email=f"c{i}@mail.com"))
+    yield book
+    service.close()
+
+
+def test_write_chunks_groups_pieces_into_few_writes():
+    pieces = [f"line {i}\n" for i in range(10000)]
+    stream = CountingStream()
+    write_chunks(iter(pieces), stream, chunk_size=1000)
+    assert stream.getvalue() == "".join(pieces) + "\n"
+    assert 1 < stream.writes <= len("".join(pieces)) // 1000 + 2
+
+
+def test_listing_is_rendered_lazily_and_paged(book):
+    result = bot_functions.show_all_contacts_command(["--limit", "10", "--offset", "20"], book)
+    assert isinstance(result, StreamedOutput) and not result.pager
+    first = next(iter(result.pieces))
+    assert first == book.get_record("contact20").get_details()
+    rest = "".join(result.pieces)
+    assert rest.endswith("Showing 21-25 of 25.")
+    assert "contact24" in rest and "contact19" not in rest
+
+    compact = "".join(bot_functions.show_all_contacts_command(["--compact", "--pager"], book).pieces)
+    assert compact.splitlines() == [book.get_record(f"contact{i:02d}").get_summary() for i in range(25)]
+
+
+def test_cached_details_follow_changes(book):
+    details = book.get_record("contact01").get_details()
+    book.edit_record("contact01", ["5555555555"], "new street", "new@mail.com", "01.02.1990")
+    book.add_comment("contact01", "a comment")
+    changed = book.get_record("contact01").get_details()
+    assert changed != details
+    for value in ("5555555555", "new street", "new@mail.com", "01.02.1990", "a comment"):
+        assert value in changed
+
+
+def test_show_uses_the_pager_and_falls_back_to_stdout(capfd, monkeypatch):
+    monkeypatch.setenv("BOT_PAGER", f'"{sys.executable}" -c "import sys; sys.stdout.write(sys.stdin.read().upper())"')
+    show(StreamedOutput(iter(["piped", " text"]), pager=True))
+    assert capfd.readouterr().out == "PIPED TEXT\n"
+
+    monkeypatch.setenv("BOT_PAGER", "no-such-pager-command")
+    show(StreamedOutput(iter(["plain"]), pager=True))
+    assert capfd.readouterr().out == "plain\n"
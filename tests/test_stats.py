@@ -0,0 +1,65 @@
+import random
+from datetime import date
+
+import pytest
+
+from objects.AddressBook import AddressBook
+from objects.Record import Record
+from servises.SaveService import SaveService
+
+np = pytest.importorskip("numpy")
+from servises.StatsService import format_stats  # noqa: E402
+
+TODAY = date(2024, 3, 1)
+
+
+def build_book(kind, directory):
+    rng = random.Random(9)
+    book = AddressBook(SaveService.create(kind, directory=str(directory), durability="on-exit"))
+    for i in range(300):
+        birthday = date(rng.randint(1920, 2024), 1, 1).toordinal() + rng.randrange(365)
+        book.add_record(Record(f"c{i}", phones=[f"{1000000000 + i}"] * rng.randint(0, 1),
+                               birthday=date.fromordinal(birthday).strftime("%d.%m.%Y") if rng.random() < 0.8 else None,
+                               address="street" if rng.random() < 0.5 else None,
+                               email=f"c{i}@mail.com" if rng.random() < 0.3 else None))
+    book.add_record(Record("leap", birthday="29.02.2000"))
+    for i in range(0, 300, 7):
+        book.remove_record(f"c{i}")
+    return book
+
+
+@pytest.mark.parametrize("kind", ["journal", "columnar"])
+def test_aggregates_match_a_full_scan(tmp_path, kind):
+    book = build_book(kind, tmp_path)
+    columns = book.get_columns()
+    records = [book.get_record(name) for name in book._records]
+    birthdays = [record.birthday.value for record in records if record.birthday]
+
+    assert columns.count == len(records)
+    assert columns.birthdays_per_month().tolist() == [sum(day.month == month for day in birthdays)
+                                                      for month in range(1, 13)]
+    weeks = [0] * 53
+    for day in birthdays:
+        weeks[(date(2000, day.month, day.day).timetuple().tm_yday - 1) // 7] += 1
+    assert columns.birthdays_per_week().tolist() == weeks
+    ages = [TODAY.year - day.year - ((day.month, day.day) > (TODAY.month, TODAY.day)) for day in birthdays]
+    assert sorted(columns.ages(TODAY).tolist()) == sorted(ages)
+    assert columns.age_distribution(TODAY).tolist() == [sum(min(age // 10, 9) == bucket for age in ages if age >= 0)
+                                                        for bucket in range(10)]
+    assert columns.missing() == {
+        "phone": sum(not record.phone_numbers for record in records),
+        "email": sum(record.email is None for record in records),
+        "address": sum(record.address is None for record in records),
+        "birthday": sum(record.birthday is None for record in records),
+    }
+
+
+def test_columnar_and_row_extraction_agree(tmp_path):
+    columnar = build_book("columnar", tmp_path / "columnar")
+    journal = build_book("journal", tmp_path / "journal")
+    assert format_stats(columnar.get_columns(), TODAY) == format_stats(journal.get_columns(), TODAY)
+
+
+def test_empty_book(tmp_path):
+    book = AddressBook(SaveService.create("journal", directory=str(tmp_path)))
+    assert format_stats(book.get_columns(), TODAY) == "No contacts available."
@@ -0,0 +1,221 @@
+import random
+import shutil
+import threading
+
+import pytest
+
+from objects.AddressBook import AddressBook
+from objects.Notes import Notes
+from objects.Record import Record
+from servises.BlobStore import BlobStore
+from servises.ColumnarStorage import ColumnarStorage
+from servises.GroupCommitWriter import GroupCommitWriter
+from servises.PickleStorage import PickleStorage
+from servises.SaveService import SaveService
+from servises.SnapshotStorage import SnapshotStorage
+from servises.SqliteStorage import SqliteStorage
+
+ENGINES = ["pickle", "journal", "snapshot", "columnar", "sharded", "sqlite"]
+DURABILITIES = ["always", "batched(5)", "on-exit"]
+
+
+def open_service(kind, directory, durability="always"):
+    return SaveService.create(kind, directory=str(directory), durability=durability, shards=4, cache_size=8)
+
+
+def fill(book, notes):
+    """Makes every kind of change the bot makes, so a reload has to replay all of them."""
+    for i in range(40):
+        book.add_record(Record(f"contact{i}", phones=[f"{1000000000 + i * 7919}"],
+                               birthday=f"{i % 28 + 1:02d}.{i % 12 + 1:02d}.{1950 + i}" if i % 3 else None,
+                               address=f"street {i % 5}" if i % 2 else None,
+                               email=f"user{i}@mail{i % 3}.com" if i % 4 else None))
+    book.edit_record("contact1", ["5555555555", "6666666666"], "new street", "new@mail.com", "29.02.2000")
+    book.add_phone("contact2", "7777777777")
+    book.edit_phone("contact3", book.get_record("contact3").phone_numbers[0], "8888888888")
+    book.add_comment("contact4", "a comment")
+    for i in range(10, 40, 3):
+        book.remove_record(f"contact{i}")
+    book.add_record(Record("contact10", phones=["9999999999"]))
+
+    first = notes.add_notes("first note")
+    second = notes.add_notes("second note " + "long text " * 50)
+    third = notes.add_notes("third note")
+    notes.edit_notes(first, "first note, edited")
+    notes.add_tags(second, ["work", "urgent"])
+    notes.remove_notes(third)
+
+
+def contents(book, notes):
+    contacts = {name: book.get_record(name).get_details() for name in book._records}
+    note_texts = [(note_id, notes.text_of(note), sorted(note.tags)) for note_id, note in notes.notes.items()]
+    return contacts, note_texts
+
+
+@pytest.mark.parametrize("durability", DURABILITIES)
+@pytest.mark.parametrize("kind", ENGINES)
+def test_round_trip(tmp_path, kind, durability):
+    service = open_service(kind, tmp_path, durability)
+    book = AddressBook(service)
+    notes = Notes(service, BlobStore(str(tmp_path), threshold=100))
+    fill(book, notes)
+    expected = contents(book, notes)
+    service.close()
+
+    service = open_service(kind, tmp_path)
+    assert contents(AddressBook(service), Notes(service, BlobStore(str(tmp_path), threshold=100))) == expected
+    service.close()
+
+
+@pytest.mark.parametrize("storage", [PickleStorage, SnapshotStorage, ColumnarStorage])
+def test_round_trip_through_compaction(tmp_path, storage):
+    kwargs = {"journal": True} if storage is PickleStorage else {}
+    service = SaveService(storage(str(tmp_path), compact_ratio=0, compact_min_bytes=0, **kwargs))
+    book = AddressBook(service)
+    notes = Notes(service)
+    fill(book, notes)
+    expected = contents(book, notes)
+    service.close()
+
+    service = SaveService(storage(str(tmp_path), **kwargs))
+    assert contents(AddressBook(service), Notes(service)) == expected
+    service.close()
+
+
+def test_discarded_changes_are_not_saved(tmp_path):
+    service = open_service("journal", tmp_path, "on-exit")
+    book = AddressBook(service)
+    book.add_record(Record("kept", phones=["1234567890"]))
+    service.flush()
+    book.add_record(Record("dropped", phones=["1234567890"]))
+    assert service.discard()
+    service.close()
+
+    service = open_service("journal", tmp_path)
+    assert list(AddressBook(service)._records) == ["kept"]
+    service.close()
+
+
+@pytest.mark.parametrize("kind", ["snapshot", "columnar"])
+def test_conversion_keeps_the_journal_engine_data(tmp_path, kind):
+    service = open_service("journal", tmp_path)
+    book = AddressBook(service)
+    book.add_record(Record("ann", phones=["1111111111"]))
+    book.add_record(Record("bob", phones=["2222222222"]))
+    service.close()
+    journal_files = {path.name: path.read_bytes() for path in tmp_path.iterdir()}
+
+    service = open_service(kind, tmp_path)
+    book = AddressBook(service)
+    assert sorted(book._records) == ["ann", "bob"]
+    book.add_record(Record("cat", phones=["3333333333"]))
+    service.close()
+
+    assert {name: (tmp_path / name).read_bytes() for name in journal_files} == journal_files
+    service = open_service("journal", tmp_path)
+    assert sorted(AddressBook(service)._records) == ["ann", "bob"]
+    service.close()
+    service = open_service(kind, tmp_path)
+    assert sorted(AddressBook(service)._records) == ["ann", "bob", "cat"]
+    service.close()
+
+
+@pytest.mark.parametrize("kind", ["journal", "snapshot", "columnar"])
+def test_torn_journal_tail_is_cut_before_the_next_append(tmp_path, kind):
+    garbage = random.Random(0).randbytes(64)
+    directory = tmp_path / "saves"
+    service = open_service(kind, directory)
+    book = AddressBook(service)
+    book.add_record(Record("base", phones=["1000000000"]))
+    service.flush()
+    for i in range(3):
+        book.add_record(Record(f"journaled{i}", phones=["2000000000"]))
+    service.close()
+    journal = [path for path in directory.iterdir() if path.name.startswith("book.") and "journal" in path.name]
+    assert len(journal) == 1
+    size = journal[0].stat().st_size
+
+    for number, cut in enumerate(list(range(0, size, max(1, size // 40))) + [size]):
+        copy = tmp_path / f"cut{cut}"
+        shutil.copytree(directory, copy)
+        torn = copy / journal[0].name
+        with open(torn, "r+b") as handle:
+            handle.truncate(cut)
+        if number % 5 == 0:
+            with open(torn, "ab") as handle:
+                handle.write(garbage)
+
+        service = open_service(kind, copy)
+        book = AddressBook(service)
+        survivors = sorted(book._records)
+        book.add_record(Record("after", phones=["3000000000"]))
+        service.close()
+
+        service = open_service(kind, copy)
+        assert sorted(AddressBook(service)._records) == sorted(survivors + ["after"]), cut
+        service.close()
+
+
+class FailingStorage(PickleStorage):
+    """Journal storage whose updates of one key fail while `failing` is set."""
+    failing = None
+
+    def update(self, key, data, changes):
+        if key == self.failing:
+            raise OSError("disk full")
+        super().update(key, data, changes)
+
+
+def test_failed_group_write_keeps_the_unwritten_groups(tmp_path):
+    storage = FailingStorage(str(tmp_path), journal=True)
+    writer = GroupCommitWriter(storage)
+    books = {key: {} for key in ("a", "b", "c")}
+    for key, book in books.items():
+        for i in range(3):
+            book[f"{key}{i}"] = i
+            writer.submit(key, book, [("set", f"{key}{i}", i)])
+
+    storage.failing = "b"
+    with pytest.raises(OSError):
+        writer.flush()
+    storage.failing = None
+    writer.flush()
+    writer.close()
+    storage.close()
+
+    storage = PickleStorage(str(tmp_path), journal=True)
+    assert {key: storage.load(key) for key in books} == books
+    storage.close()
+
+
+@pytest.mark.parametrize("kind", ["snapshot", "sqlite"])
+def test_lazy_records_can_be_read_while_the_writer_runs(tmp_path, kind):
+    if kind == "snapshot":
+        storage = SnapshotStorage(str(tmp_path), cache_size=4, compact_ratio=0, compact_min_bytes=0)
+    else:
+        storage = SqliteStorage(str(tmp_path), cache_size=4)
+    service = SaveService(storage, "batched(1)")
+    book = AddressBook(service)
+    errors = []
+    done = threading.Event()
+
+    def read():
+        try:
+            while not done.is_set():
+                for name in list(book._records)[-20:]:
+                    assert book._records[name].name.value == name
+                for name, record in book._records.items():
+                    assert record.name.value == name
+        except Exception as e:
+            errors.append(e)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for i in range(300):
+            book.add_record(Record(f"contact{i}", phones=[f"{1000000000 + i}"]))
+    finally:
+        done.set()
+        reader.join()
+    service.close()
+    assert errors == []
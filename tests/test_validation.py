@@ -0,0 +1,57 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from objects.Birthday import Birthday
+from objects.Email import Email
+from objects.Phone import Phone
+from servises.ValidationService import parse_date, validate_columns, validate_values
+
+
+def strptime_ordinal(value):
+    try:
+        return datetime.strptime(value, "%d.%m.%Y").date().toordinal()
+    except ValueError:
+        return None
+
+
+def parse_or_none(value):
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+def test_parse_date_agrees_with_strptime():
+    rng = random.Random(10)
+    values = ["29.02.2000", "29.02.2001", "31.04.2024", "1.1.2000", "01.01.0001", "00.01.2000", "01.13.2000",
+              "001.01.2000", "01.01.200", "01.01.20000", "01-01-2000", "01.01.2000.", "", ".."]
+    values += [".".join("".join(rng.choice("0123456789") for _ in range(rng.randint(0, length)))
+                        for length in (3, 3, 5)) for _ in range(3000)]
+    for value in values:
+        assert parse_or_none(value) == strptime_ordinal(value), value
+
+
+def test_validate_values_reports_each_invalid_value():
+    valid, errors = validate_values("phone", ["1234567890", "123", "abcdefghij", "0987654321", 5], start=10)
+    assert valid == ["1234567890", None, None, "0987654321", None]
+    assert [index for index, message in errors] == [11, 12, 14]
+    valid, errors = validate_values("email", ["a@b.com", "nope", "a@b"])
+    assert valid == ["a@b.com", None, None] and len(errors) == 2
+
+
+def test_validate_columns_is_the_same_in_a_process_pool():
+    rng = random.Random(11)
+    columns = {
+        "phone": ["".join(rng.choice("0123456789x") for _ in range(rng.choice([9, 10, 10]))) for _ in range(500)],
+        "email": [rng.choice(["a@b.com", "bad", "x@y.org", "@"]) for _ in range(500)],
+        "birthday": [f"{rng.randint(0, 32):02d}.{rng.randint(1, 13):02d}.{rng.randint(1900, 2024)}" for _ in range(500)],
+    }
+    assert validate_columns(columns, workers=2, chunk_size=64) == validate_columns(columns, workers=0)
+
+
+@pytest.mark.parametrize("field, value", [(Phone, "12345"), (Email, "nope"), (Birthday, "31.02.2000")])
+def test_fields_use_the_validators(field, value):
+    with pytest.raises(ValueError):
+        field(value)